@@ -1,8 +1,119 @@
 import math
 
 import numpy as np
+import scipy.sparse
 from fractions import Fraction
 
+from numberbackends import number_backend
+
+# Upper bound on the number of entries in the temporary buffer used by the floating point rank-1 pivot update and the
+# integer pivot.
+PIVOT_BLOCK_ENTRIES = 1 << 16
+
+# Integer dictionaries are stored as np.int64 while the products in the integer pivot have at most this many bits.
+INT64_PIVOT_BITS = 62
+
+# Number of pivots of a 'RationalRows' dictionary between the reductions of its rows (see 'Dictionary.rational_pivot')
+RATIONAL_REDUCE_PIVOTS = 2
+
+
+# Checks if the input of an integer dictionary can be stored as np.int64, i.e. if it is numeric and every entry
+# (truncated to an integer as done by int()) has at most INT64_PIVOT_BITS bits.
+def fits_int64(c, A, b):
+    for values in [A, b] if c is None else [c, A, b]:
+        values = np.asarray(values)
+        if values.dtype.kind not in 'biuf':
+            return False
+        if values.size > 0 and not np.abs(values).max() < 2 ** INT64_PIVOT_BITS:
+            return False
+    return True
+
+
+# Converts the array 'values' (negated if 'negate' is True) to the dtype of a dictionary and stores it in 'out'.
+# The conversion is done for whole arrays:
+# - NumPy dtypes (and integer pivoting stored as np.int64, see 'Dictionary') are negated and cast in one operation.
+# - For 'int' and 'Fraction' integral numeric input is first cast to Python ints in bulk. Every distinct value is
+#   then converted by the dtype only once, and the entries with that value share the converted object (int and
+#   Fraction objects are immutable). For 'int' the Python ints are used directly.
+def convert_array(values, dtype, out, negate=False):
+    values = np.asarray(values)
+    if out.dtype != object:
+        if negate:
+            np.negative(values, out=out, casting='unsafe')
+        else:
+            out[...] = values
+        return
+    if negate:
+        values = -values
+    if values.dtype.kind in 'biu' or (values.dtype.kind == 'f' and fits_int64(None, values, [])
+                                       and (values == np.round(values)).all()):
+        values = values.astype(np.int64)
+        if dtype == int:
+            out[...] = values.astype(object)
+            return
+    flat = values.ravel()
+    try:
+        unique, inverse = np.unique(flat, return_inverse=True)
+    except TypeError:
+        unique, inverse = flat, np.arange(flat.size)
+    converted = np.empty(unique.size, dtype=object)
+    converted[:] = [dtype(value) for value in unique.tolist()]
+    out[...] = converted[inverse.ravel()].reshape(values.shape)
+
+
+# Checks if every entry of the input is an integer, so a 'RationalRows' dictionary can be stored with the
+# denominators 1 (see 'Dictionary').
+def integral_input(c, A, b):
+    for values in [A, b] if c is None else [c, A, b]:
+        values = np.asarray(values)
+        if values.dtype.kind == 'f' and not (values == np.round(values)).all():
+            return False
+        if values.dtype.kind not in 'biuf':
+            return False
+    return True
+
+
+# Writes the rational numbers of the object array 'values' (a row for each row of a dictionary) as integer numerators
+# over the least common denominator of each row. Returns the numerators and the denominators as object arrays.
+def common_denominators(values):
+    values = np.array([[Fraction(value) for value in row] for row in values], dtype=object).reshape(values.shape)
+    denominators = np.array([math.lcm(*[value.denominator for value in row]) for row in values], dtype=object)
+    numerators = np.empty(values.shape, dtype=object)
+    for i, row in enumerate(values):
+        numerators[i, :] = [value.numerator * (denominators[i] // value.denominator) for value in row]
+    return numerators, denominators
+
+
+# An array of 'size' zeros with 'deltas' at the indices 'indices' (of the dtype of 'deltas')
+def scattered(size, indices, deltas):
+    deltas = np.asarray(deltas)
+    values = np.zeros(size, dtype=deltas.dtype if deltas.dtype.kind in 'biuf' else object)
+    values[np.asarray(indices, dtype=int)] = deltas
+    return values
+
+
+# Elementwise Fraction(numerators, denominators) of integers (np.int64 entries are converted to Python ints)
+exact_fractions = np.frompyfunc(lambda numerator, denominator: Fraction(int(numerator), int(denominator)), 2, 1)
+
+
+class RationalRows:
+    # dtype of a rational dictionary where the entries of each row are
+    # stored as integer numerators over a common denominator of the
+    # row (see 'Dictionary'). It only marks the dtype, the numerators
+    # and denominators are np.int64 or Python ints.
+    pass
+
+
+# The names of the variables of a dictionary with 'n' original variables and 'm' constraints (see 'Dictionary')
+def variable_names(n, m, auxiliary):
+    varnames = np.empty(n + 1 + auxiliary + m, dtype=object)
+    varnames[0] = 'z'
+    varnames[1:n + 1] = ['x{}'.format(i) for i in range(1, n + 1)]
+    if auxiliary:
+        varnames[n + 1] = 'x0'
+    varnames[n + 1 + auxiliary:] = ['x{}'.format(i) for i in range(n + 1, n + m + 1)]
+    return varnames
+
 
 class Dictionary:
     # Simplex dictionary as defined by Vanderbei
@@ -20,6 +131,31 @@ class Dictionary:
     # entries of the integer dictionary by 'lastpivot' results in the
     # normal dictionary.
     #
+    # An integer dictionary is stored in a native np.int64 array as
+    # long as every entry of the input fits in INT64_PIVOT_BITS bits.
+    # Before each pivot the bit lengths of the pivot coefficient, the
+    # entries of the pivot row and column and the largest entry of the
+    # dictionary bound the intermediate products of the update. If the
+    # bound could overflow np.int64 the dictionary is promoted to an
+    # object array of Python ints (or the integers of the number
+    # backend, see 'NumberBackend'), which is used from then on.
+    #
+    # dtype 'RationalRows' is used for rational pivoting with a common
+    # denominator per row. Row i of 'C' is the integer numerators of
+    # the row and 'denominators[i]' is the positive denominator of the
+    # row. A pivot only changes the rows with a non-zero coefficient of
+    # the entering variable, and the rows are reduced by the gcd of their
+    # numerators and denominator every RATIONAL_REDUCE_PIVOTS pivots
+    # ('unreduced_pivots' counts the pivots since). Like for integer
+    # pivoting the numerators are stored as np.int64 until the bound of
+    # 'may_overflow' (for the changed rows) is exceeded. Unlike integer
+    # pivoting the rows which are not changed keep their small entries
+    # and cost nothing, so it is the fastest exact dtype for LPs with
+    # constraints which form blocks (see 'random_lp_blocks'). For dense
+    # LPs every row changes in every pivot and integer pivoting, which
+    # divides by the known last pivot instead of a gcd, is faster (see
+    # 'experiment_exact_dtypes').
+    #
     # Variables are indexed from 0 to n+m. Variable 0 is the objective
     # z. Variables 1 to n are the original variables. Variables n+1 to
     # n+m are the slack variables. An exception is when creating an
@@ -30,9 +166,10 @@ class Dictionary:
     # 'B' and 'N' are arrays that contain the *indices* of the basic and
     # nonbasic variables.
     #
-    # 'varnames' is an array of the names of the variables.
+    # 'varnames' is an array of the names of the variables. It is
+    # generated the first time it is used.
 
-    def __init__(self, c, A, b, dtype=Fraction):
+    def __init__(self, c, A, b, dtype=Fraction, backend='python'):
         # Initializes the dictionary based on linear program in
         # standard form given by vectors and matrices 'c','A','b'.
         # Dimensions are inferred from 'A'
@@ -40,63 +177,95 @@ class Dictionary:
         # If 'c' is None it generates the auxillary dictionary for the
         # use in the standard two-phase simplex algorithm
         #
-        # Every entry of the input is individually converted to the
-        # given dtype.
+        # 'A' may be a scipy.sparse matrix, which is converted to a
+        # dense array (see 'SparseDictionary' for a sparse dictionary).
+        #
+        # The input is converted to the given dtype as whole arrays
+        # (see 'convert_array').
+        #
+        # 'backend' selects the number types of the Python int and
+        # Fraction entries, 'python' or 'gmpy2' (see 'number_backend').
+        # It is not used for 'RationalRows'.
+        if scipy.sparse.issparse(A):
+            A = A.toarray()
         m, n = A.shape
         self.dtype = dtype
         if dtype == int:
             self.lastpivot = 1
-        if dtype in [int, Fraction]:
-            dtype = object
-            if c is not None:
-                c = np.array(c, object)
-            A = np.array(A, object)
-            b = np.array(b, object)
-        self.C = np.empty([m + 1, n + 1 + (c is None)], dtype=dtype)
-        self.C[0, 0] = self.dtype(0)
+        # The type the input is converted to. The entries of 'RationalRows' dictionaries are converted to Fraction
+        # unless the input is integral (then all denominators are 1). The numerators and denominators of the rows are
+        # stored as np.int64 if they fit.
+        if dtype == RationalRows:
+            element = int if integral_input(c, A, b) else Fraction
+        else:
+            element = dtype
+        if element == int and fits_int64(c, A, b):
+            storage = np.int64
+        elif element in [int, Fraction]:
+            storage = object
+        else:
+            storage = dtype
+        self.backend = number_backend(backend)
+        if storage == object and dtype != RationalRows:
+            element = self.backend.element(element)
+        self.C = np.empty([m + 1, n + 1 + (c is None)], dtype=storage)
+        self.C[0, 0] = element(0)
         if c is None:
-            self.C[0, 1:] = self.dtype(0)
-            self.C[0, n + 1] = self.dtype(-1)
-            self.C[1:, n + 1] = self.dtype(1)
+            self.C[0, 1:] = element(0)
+            self.C[0, n + 1] = element(-1)
+            self.C[1:, n + 1] = element(1)
         else:
-            for j in range(0, n):
-                self.C[0, j + 1] = self.dtype(c[j])
-        for i in range(0, m):
-            self.C[i + 1, 0] = self.dtype(b[i])
-            for j in range(0, n):
-                self.C[i + 1, j + 1] = self.dtype(-A[i, j])
+            convert_array(c, element, self.C[0, 1:])
+        convert_array(b, element, self.C[1:, 0])
+        convert_array(A, element, self.C[1:, 1:n + 1], negate=True)
+        if dtype == RationalRows and element == Fraction:
+            self.C, self.denominators = common_denominators(self.C)
+            if max(int(np.abs(self.C).max()), int(self.denominators.max())).bit_length() <= INT64_PIVOT_BITS:
+                self.C = self.C.astype(np.int64)
+                self.denominators = self.denominators.astype(np.int64)
+        elif dtype == RationalRows:
+            self.denominators = np.ones(m + 1, dtype=storage)
+        if dtype == RationalRows:
+            self.unreduced_pivots = 0
         self.N = np.array(range(1, n + 1 + (c is None)))
         self.B = np.array(range(n + 1 + (c is None), n + 1 + (c is None) + m))
-        self.varnames = np.empty(n + 1 + (c is None) + m, dtype=object)
-        self.varnames[0] = 'z'
-        for i in range(1, n + 1):
-            self.varnames[i] = 'x{}'.format(i)
-        if c is None:
-            self.varnames[n + 1] = 'x0'
-        for i in range(n + 1, n + m + 1):
-            self.varnames[i + (c is None)] = 'x{}'.format(i)
+        self.variables = (n, m, c is None)
+        self._varnames = None
         if self.dtype == int:
             self.basic_multiplier = 1
 
+    # The names of the variables are only generated when they are used
+    @property
+    def varnames(self):
+        if self._varnames is None:
+            self._varnames = variable_names(*self.variables)
+        return self._varnames
+
+    @varnames.setter
+    def varnames(self, varnames):
+        self._varnames = varnames
+
     def __str__(self):
         # String representation of the dictionary in equation form as
         # used in Vanderbei.
-        m, n = self.C.shape
+        # A 'RationalRows' dictionary is shown like the Fraction dictionary.
+        C = self.rational_entries() if self.dtype == RationalRows else self.C
+        m, n = C.shape
         varlen = len(max(self.varnames, key=len))
         coeflen = 0
         for i in range(0, m):
-            coeflen = max(coeflen, len(str(self.C[i, 0])))
+            coeflen = max(coeflen, len(str(C[i, 0])))
             for j in range(1, n):
-                coeflen = max(coeflen, len(str(abs(self.C[i, j]))))
+                coeflen = max(coeflen, len(str(abs(C[i, j]))))
         tmp = []
         if self.dtype == int and self.lastpivot != 1:
             tmp.append(str(self.lastpivot))
             tmp.append('*')
         tmp.append('{} = '.format(self.varnames[0]).rjust(varlen + 3))
-        tmp.append(str(self.C[0, 0]).rjust(coeflen))
+        tmp.append(str(C[0, 0]).rjust(coeflen))
         for j in range(0, n - 1):
-            tmp.append(' + ' if self.C[0, j + 1] > 0 else ' - ')
-            tmp.append(str(abs(self.C[0, j + 1])).rjust(coeflen))
+            tmp.append(' + ' if C[0, j + 1] > 0 else ' - ')
+            tmp.append(str(abs(C[0, j + 1])).rjust(coeflen))
             tmp.append('*')
             tmp.append('{}'.format(self.varnames[self.N[j]]).rjust(varlen))
         for i in range(0, m - 1):
@@ -105,77 +274,515 @@ class Dictionary:
                 tmp.append(str(self.lastpivot))
                 tmp.append('*')
             tmp.append('{} = '.format(self.varnames[self.B[i]]).rjust(varlen + 3))
-            tmp.append(str(self.C[i + 1, 0]).rjust(coeflen))
+            tmp.append(str(C[i + 1, 0]).rjust(coeflen))
             for j in range(0, n - 1):
-                tmp.append(' + ' if self.C[i + 1, j + 1] > 0 else ' - ')
-                tmp.append(str(abs(self.C[i + 1, j + 1])).rjust(coeflen))
+                tmp.append(' + ' if C[i + 1, j + 1] > 0 else ' - ')
+                tmp.append(str(abs(C[i + 1, j + 1])).rjust(coeflen))
                 tmp.append('*')
                 tmp.append('{}'.format(self.varnames[self.N[j]]).rjust(varlen))
         return ''.join(tmp)
 
     def basic_solution(self):
         # Extracts the basic solution defined by a dictionary D
+        # The constants of the rows of the basic original variables are read at once (see 'entry_values').
         m, n = self.C.shape
-        if self.dtype == int:
+        if self.dtype in [int, RationalRows]:
             x_dtype = Fraction
         else:
             x_dtype = self.dtype
         x = np.empty(n - 1, x_dtype)
         x[:] = x_dtype(0)
-        for i in range(0, m - 1):
-            if self.B[i] < n:
-                if self.dtype == int:
-                    x[self.B[i] - 1] = Fraction(self.C[i + 1, 0], self.lastpivot)
-                else:
-                    x[self.B[i] - 1] = self.C[i + 1, 0]
+        rows = np.flatnonzero(self.B < n)
+        x[self.B[rows] - 1] = self.entry_values(rows + 1, [0])[:, 0]
         return x
 
+    # The entries C[rows, columns] as the numbers they represent: Python Fractions for the exact dtypes (divided by
+    # the last pivot coefficient for integer pivoting and by the denominators of the rows for 'RationalRows'), and
+    # the entries themselves for floating point dtypes. 'rows' and 'columns' are slices or arrays of indices.
+    def entry_values(self, rows, columns):
+        entries = self.C[rows][:, columns]
+        if self.dtype == int:
+            return exact_fractions(entries.astype(object), self.lastpivot)
+        if self.dtype == RationalRows:
+            return exact_fractions(entries.astype(object), self.denominators[rows][:, np.newaxis].astype(object))
+        if self.dtype == Fraction and self.backend.rational != Fraction:
+            return np.frompyfunc(self.backend.fraction, 1, 1)(entries)
+        return entries
+
     def value(self):
         # Extracts the value of the basic solution defined by a dictionary D
         if self.dtype == int:
-            return Fraction(self.C[0, 0], self.lastpivot)
+            return Fraction(int(self.C[0, 0]), self.lastpivot)
+        elif self.dtype == RationalRows:
+            return Fraction(int(self.C[0, 0]), int(self.denominators[0]))
+        elif self.dtype == Fraction:
+            return self.backend.fraction(self.C[0, 0])
         else:
             return self.C[0, 0]
 
+    # Removes the auxillary variable x0 from an auxillary dictionary
+    # where x0 is non-basic and uses the objective function 'c' instead
+    # of the auxillary objective (see 'lp_solve').
+    # 1) Identify location of auxiliary variable in the non-basis
+    # 2) Move the last column (and the last element of N) to the location of the auxiliary variable, and drop the
+    #    last column with a view of C (and N), so the tableau is not copied
+    # 3) Set the OF to 'c' (see 'set_objective')
+    def remove_auxiliary(self, c):
+        rows, cols = self.C.shape
+        position = int(np.flatnonzero(self.N == cols - 1)[0])
+        self.N[position] = self.N[-1]
+        self.N = self.N[:-1]
+        self.C[:, position + 1] = self.C[:, -1]
+        self.C = self.C[:, :-1]
+        self.set_objective(c)
+
+    # Uses the objective function 'c' of the original variables instead of the OF of the dictionary.
+    # The OF is the coefficients of the non-basic original variables plus the rows of the basic original variables
+    # multiplied by their coefficients, computed as one product of the coefficients with the rows.
+    # For integer pivoting the OF is multiplied by the last pivot coefficient like the other rows, and a np.int64
+    # dictionary is promoted to Python ints before 'c' is converted if 'c' does not fit (the auxiliary dictionary is
+    # stored as np.int64 without looking at 'c', see 'fits_int64').
+    # For 'RationalRows' the OF is computed with Fractions and written over its common denominator.
+    def set_objective(self, c):
+        n = len(c)
+        if self.dtype == RationalRows:
+            self.rational_objective(c)
+            return
+        if self.C.dtype == np.int64 and not fits_int64(None, c, []):
+            self.C = self.backend.integers(self.C)
+        costs = np.empty(self.variable_count() + 1, dtype=self.C.dtype)
+        element = self.backend.element(self.dtype)
+        costs[:] = element(0)
+        convert_array(c, element, costs[1:n + 1])
+        basic_costs = costs[self.B]
+        basic_rows = np.flatnonzero(basic_costs != 0)
+        if self.C.dtype == np.int64 and self.objective_may_overflow(costs, basic_costs[basic_rows]):
+            self.C = self.backend.integers(self.C)
+            costs = self.backend.integers(costs)
+            basic_costs = self.backend.integers(basic_costs)
+        self.C[0, 0] = element(0)
+        self.C[0, 1:] = costs[self.N] * (self.lastpivot if self.dtype == int else 1)
+        self.C[0, :] += basic_costs[basic_rows] @ self.C[basic_rows + 1, :]
+
+    # Replaces the positive coefficients of the OF by -1, which makes the dictionary dual feasible. The new OF is the OF
+    # minus (1 + d_j) x_j for each non-basic variable x_j with a positive coefficient d_j, so after 'set_objective' in
+    # the dictionary of the LP it is the coefficients of 'c' where they are negative and -1 elsewhere.
+    # For integer pivoting -1 is multiplied by the last pivot coefficient, and for 'RationalRows' it is written over the
+    # denominator of the OF.
+    def clip_objective(self):
+        if self.dtype == int:
+            unit = self.lastpivot
+        elif self.dtype == RationalRows:
+            unit = self.denominators[0]
+        else:
+            unit = self.backend.element(self.dtype)(1)
+        positive = self.C[0, 1:] > 0
+        self.C[0, 1:][positive] = -unit
+        self.pricing_state = None
+
+    # The largest index of a variable of the dictionary (the slack variables of an auxillary dictionary are numbered
+    # after x0, also when x0 has been removed)
+    def variable_count(self):
+        n, m, auxiliary = self.variables
+        return n + m + auxiliary
+
+    # Adds the constraint 'a' x <= 'b' of the original variables (like a row of A and b) to the dictionary, with a new
+    # slack variable (numbered after the other variables) which is basic.
+    # The row of the slack variable is 'b' minus 'a' of the non-basic original variables, minus the rows of the basic
+    # original variables multiplied by their coefficients in 'a' (as for the OF in 'set_objective'). For integer
+    # pivoting the row is multiplied by the last pivot coefficient like the other rows, which keeps the division of
+    # the integer pivot exact as the basis matrix of the new constraint has the same determinant.
+    # The OF is not changed, so an optimal dictionary stays dual feasible (see 'reoptimize').
+    def add_constraint(self, a, b):
+        n, m, auxiliary = self.variables
+        values = self.exact_values(b, a, negate=True)
+        basic_rows = np.flatnonzero(values[self.B] != 0)
+        if self.dtype == RationalRows:
+            rows = self.rational_entries(basic_rows + 1)
+        else:
+            rows = self.C[basic_rows + 1, :].astype(values.dtype)
+        multiplier = self.lastpivot if self.dtype == int else 1
+        row = np.empty(self.C.shape[1], dtype=values.dtype)
+        row[0] = values[0] * multiplier
+        row[1:] = values[self.N] * multiplier
+        row += values[self.B[basic_rows]] @ rows
+        self.B = np.append(self.B, self.variable_count() + 1)
+        self.variables = (n, m + 1, auxiliary)
+        if self.dtype == RationalRows:
+            self.rational_row(row)
+        else:
+            self.store_entries(row, 0)
+
+    # Adds an original variable with the coefficient 'c' in the OF and the coefficients 'a' in the constraints (like a
+    # column of A) to the dictionary, as a non-basic variable. The variable is numbered n+1, so the variables after
+    # the original variables move one up.
+    # With y_i the coefficients of the slack variable of constraint i in a row of the dictionary (-1 in its own row if it
+    # is basic), the entry of the variable in the row is the sum of y_i * a_i, plus 'c' in the OF (the entries of the
+    # non-basic slack variables are the negative rows of the inverse basis matrix, and in the OF the negative dual
+    # values). For integer pivoting the column is multiplied by the last pivot coefficient like the other entries.
+    # The constraint constants are not changed, so an optimal dictionary stays primal feasible (see 'reoptimize').
+    def add_column(self, c, a):
+        n, m, auxiliary = self.variables
+        values = self.exact_values(c, a)
+        positions = np.flatnonzero(self.N > n + auxiliary)
+        rows = np.flatnonzero(self.B > n + auxiliary)
+        coefficients = values[1:][self.N[positions] - n - auxiliary - 1]
+        if self.dtype == RationalRows:
+            entries = np.array([Fraction(entry) / int(denominator) for entry, denominator in
+                                zip(self.C[:, positions + 1].astype(object) @ coefficients, self.denominators)],
+                               dtype=object)
+        else:
+            entries = self.C[:, positions + 1].astype(values.dtype) @ coefficients
+        multiplier = self.lastpivot if self.dtype == int else 1
+        entries[rows + 1] -= values[1:][self.B[rows] - n - auxiliary - 1] * multiplier
+        entries[0] += values[0] * multiplier
+        self.N[self.N > n] += 1
+        self.B[self.B > n] += 1
+        self.N = np.append(self.N, n + 1)
+        self.variables = (n + 1, m, auxiliary)
+        if self.dtype == RationalRows:
+            self.rational_column(entries)
+        else:
+            self.store_entries(entries, 1)
+
+    # Changes the coefficients of the original variables 'variables' (indices of 'c') in the OF by 'deltas', through the
+    # current basis: the coefficient of a non-basic variable changes by its delta, and the row of a basic variable
+    # multiplied by its delta is added to the OF. The constraint constants are not changed, so an optimal dictionary
+    # stays primal feasible (see 'reoptimize').
+    def change_objective(self, variables, deltas):
+        n, m, auxiliary = self.variables
+        values = self.exact_values(0, scattered(n, variables, deltas))
+        positions = np.flatnonzero(values[self.N] != 0)
+        basic_rows = np.flatnonzero(values[self.B] != 0)
+        if self.dtype == RationalRows:
+            objective = self.rational_entries(slice(0, 1))[0]
+            rows = self.rational_entries(basic_rows + 1)
+        else:
+            objective = self.C[0, :].astype(values.dtype)
+            rows = self.C[basic_rows + 1, :].astype(values.dtype)
+        multiplier = self.lastpivot if self.dtype == int else 1
+        objective[positions + 1] += values[self.N[positions]] * multiplier
+        objective += values[self.B[basic_rows]] @ rows
+        if self.dtype == RationalRows:
+            self.rational_row(objective, 0)
+        else:
+            self.store_entries(objective, 0, 0)
+
+    # Changes the constants of the constraints 'constraints' (indices of 'b') by 'deltas', through the current basis:
+    # the constants change by the inverse basis matrix times the deltas, whose columns are the negative columns of the
+    # non-basic slack variables (and the unit column of a basic slack variable). The OF value changes by the dual
+    # values times the deltas. The other coefficients are not changed, so an optimal dictionary stays dual feasible
+    # (see 'reoptimize').
+    def change_rhs(self, constraints, deltas):
+        n, m, auxiliary = self.variables
+        values = self.exact_values(0, scattered(m, constraints, deltas))
+        positions = np.flatnonzero(self.N > n + auxiliary)
+        positions = positions[values[1:][self.N[positions] - n - auxiliary - 1] != 0]
+        basic_rows = np.flatnonzero(self.B > n + auxiliary)
+        basic_rows = basic_rows[values[1:][self.B[basic_rows] - n - auxiliary - 1] != 0]
+        changes = self.C[:, positions + 1].astype(values.dtype) @ values[1:][self.N[positions] - n - auxiliary - 1]
+        if self.dtype == RationalRows:
+            constants = np.array([Fraction(int(constant) - change, int(denominator)) for constant, change, denominator
+                                  in zip(self.C[:, 0], changes, self.denominators)], dtype=object)
+        else:
+            constants = self.C[:, 0].astype(values.dtype) - changes
+        multiplier = self.lastpivot if self.dtype == int else 1
+        constants[basic_rows + 1] += values[1:][self.B[basic_rows] - n - auxiliary - 1] * multiplier
+        if self.dtype == RationalRows:
+            self.rational_column(constants, 0)
+        else:
+            self.store_entries(constants, 1, 0)
+
+    # A copy of the dictionary, which can be pivoted and changed independently of the dictionary
+    def copy(self):
+        d = Dictionary.__new__(Dictionary)
+        d.__dict__.update(self.__dict__)
+        d.C = self.C.copy()
+        d.N = self.N.copy()
+        d.B = self.B.copy()
+        if self.dtype == RationalRows:
+            d.denominators = self.denominators.copy()
+        d.pricing_state = None
+        return d
+
+    # Turns the dictionary of integer pivoting of the LP scaled by 'scale' (i.e. of scale*c, scale*A, scale*b, see
+    # 'lp_solve' with dtype 'auto') into the 'RationalRows' dictionary of the LP in the same basis, without pivots.
+    # The slack variables and the OF of the scaled LP are 'scale' times those of the LP, so the rows of the basic slack
+    # variables and the OF are divided by scale, and the columns of the non-basic slack variables are multiplied by
+    # it. Every row is divided by the last pivot coefficient, and written over its denominator reduced by the gcd of
+    # the row (np.int64 if the numerators and denominators fit).
+    def unscale(self, scale):
+        n, m, auxiliary = self.variables
+        numerators = self.C.astype(object) if self.C.dtype == np.int64 else np.frompyfunc(int, 1, 1)(self.C)
+        numerators[:, np.flatnonzero(self.N > n + auxiliary) + 1] *= scale
+        denominators = np.full(numerators.shape[0], int(self.lastpivot), dtype=object)
+        denominators[np.flatnonzero(self.B > n + auxiliary) + 1] *= scale
+        denominators[0] *= scale
+        for i, (row, denominator) in enumerate(zip(numerators, denominators)):
+            divisor = math.gcd(int(np.gcd.reduce(row)), denominator) * (1 if denominator > 0 else -1)
+            numerators[i, :] = row // divisor
+            denominators[i] = denominator // divisor
+        if max(int(np.abs(numerators).max()), int(denominators.max())).bit_length() <= INT64_PIVOT_BITS:
+            numerators = numerators.astype(np.int64)
+            denominators = denominators.astype(np.int64)
+        self.dtype = RationalRows
+        self.C = numerators
+        self.denominators = denominators
+        self.unreduced_pivots = 0
+        del self.lastpivot
+        self.pricing_state = None
+
+    # The values 'constant' and 'coefficients' (of the original variables, or of the constraints for 'add_column') as
+    # an array with 'constant' first, converted exactly to Python objects of the dtype (Python ints for integer
+    # pivoting and Fractions for 'RationalRows'), or to the floating point dtype. The array has an entry for each
+    # variable of the dictionary (0 for the other variables).
+    def exact_values(self, constant, coefficients, negate=False):
+        if self.dtype == RationalRows:
+            element, storage = Fraction, object
+        else:
+            element = self.backend.element(self.dtype)
+            storage = object if self.C.dtype in [np.int64, object] else self.C.dtype
+        values = np.empty(max(self.variable_count() + 1, len(coefficients) + 1), dtype=storage)
+        values[:] = element(0)
+        convert_array(np.asarray([constant]), element, values[:1])
+        convert_array(coefficients, element, values[1:len(coefficients) + 1], negate=negate)
+        return values
+
+    # Stores the row (axis 0) or column (axis 1) 'entries' of the dictionary at 'index', or appends it if index is None
+    # (with the denominator 'denominator' of a row of 'RationalRows'). A np.int64 dictionary is promoted to Python ints
+    # if the entries do not fit.
+    def store_entries(self, entries, axis, index=None, denominator=None):
+        self.pricing_state = None
+        self._varnames = None
+        if self.C.dtype == np.int64:
+            largest = max(int(np.abs(entries).max(initial=0)), int(denominator or 0))
+            if largest.bit_length() > INT64_PIVOT_BITS:
+                self.C = self.backend.integers(self.C) if self.dtype == int else self.C.astype(object)
+                if self.dtype == RationalRows:
+                    self.denominators = self.denominators.astype(object)
+            else:
+                entries = entries.astype(np.int64)
+        elif self.dtype == int:
+            entries = self.backend.integers(entries)
+        if index is None:
+            if axis == 0:
+                self.C = np.vstack([self.C, entries[np.newaxis, :]])
+            else:
+                self.C = np.hstack([self.C, entries[:, np.newaxis]])
+            if denominator is not None:
+                self.denominators = np.append(self.denominators, denominator)
+            return
+        if axis == 0:
+            self.C[index, :] = entries
+        else:
+            self.C[:, index] = entries
+        if denominator is not None:
+            self.denominators[index] = denominator
+
+    # Stores the row of Fractions 'entries' of a 'RationalRows' dictionary at 'index' (appended if index is None), as
+    # numerators over their least common denominator.
+    def rational_row(self, entries, index=None):
+        numerators, denominators = common_denominators(entries[np.newaxis, :])
+        self.store_entries(numerators[0], 0, index, denominators[0])
+
+    # Stores the column of Fractions 'entries' of a 'RationalRows' dictionary at 'index' (appended if index is None).
+    # The rows whose denominator is not a multiple of the denominator of their new entry are multiplied by the least
+    # common multiple of the two.
+    def rational_column(self, entries, index=None):
+        denominators = np.array([math.lcm(int(denominator), entry.denominator)
+                                 for denominator, entry in zip(self.denominators, entries)], dtype=object)
+        factors = denominators // self.denominators.astype(object)
+        scaled = np.flatnonzero(factors != 1)
+        if scaled.size > 0:
+            rows = self.C[scaled, :].astype(object) * factors[scaled, np.newaxis]
+            if self.C.dtype == np.int64 and max(int(np.abs(rows).max()),
+                                                int(denominators.max())).bit_length() > INT64_PIVOT_BITS:
+                self.C = self.C.astype(object)
+                self.denominators = self.denominators.astype(object)
+            self.C[scaled, :] = rows
+            self.denominators[scaled] = denominators[scaled]
+        self.store_entries(np.array([entry.numerator * (denominator // entry.denominator)
+                                     for entry, denominator in zip(entries, denominators)], dtype=object), 1, index)
+
+    # Checks if computing the OF in 'set_objective' could overflow the np.int64 dictionary.
+    def objective_may_overflow(self, costs, basic_costs):
+        bound = int(np.abs(costs).max()) * self.lastpivot + int(np.abs(basic_costs).sum()) * int(np.abs(self.C).max())
+        return bound.bit_length() > INT64_PIVOT_BITS
+
+    # The OF of 'set_objective' for 'RationalRows': the costs of the non-basic original variables plus the rows of
+    # the basic original variables (divided by their denominators) multiplied by their costs.
+    # 1) Find the least common denominator of the costs of the non-basic variables and the costs of the basic
+    #    variables times the denominators of their rows
+    # 2) Write the costs of the non-basic variables over the common denominator, and add the rows of the basic
+    #    variables multiplied by their costs over the common denominator, as one integer product
+    # 3) Divide the OF and the denominator by their gcd, and promote the np.int64 numerators to Python ints if the OF
+    #    does not fit
+    def rational_objective(self, c):
+        rows, cols = self.C.shape
+        costs = np.full(self.variable_count() + 1, Fraction(0), dtype=object)
+        convert_array(c, Fraction, costs[1:len(c) + 1])
+        basic_rows = np.flatnonzero(costs[self.B] != 0)
+        basic_costs = costs[self.B[basic_rows]]
+        basic_denominators = [cost.denominator * int(denominator)
+                              for cost, denominator in zip(basic_costs, self.denominators[basic_rows + 1])]
+        denominator = math.lcm(*[cost.denominator for cost in costs[self.N]], *basic_denominators)
+        objective = np.empty(cols, dtype=object)
+        objective[0] = 0
+        objective[1:] = [cost.numerator * (denominator // cost.denominator) for cost in costs[self.N]]
+        if basic_rows.size > 0:
+            multipliers = np.array([cost.numerator * (denominator // basic_denominator)
+                                    for cost, basic_denominator in zip(basic_costs, basic_denominators)], dtype=object)
+            objective += multipliers @ self.C[basic_rows + 1, :].astype(object)
+        divisor = math.gcd(int(np.gcd.reduce(objective)), denominator)
+        objective //= divisor
+        denominator //= divisor
+        if self.C.dtype == np.int64 and max(int(np.abs(objective).max()), denominator).bit_length() > \
+                INT64_PIVOT_BITS:
+            self.C = self.C.astype(object)
+            self.denominators = self.denominators.astype(object)
+        self.C[0, :] = objective
+        self.denominators[0] = denominator
+
+    # The entries of the rows 'rows' of a 'RationalRows' dictionary as Fractions
+    def rational_entries(self, rows=slice(None)):
+        numerators = self.C[rows]
+        entries = np.empty(numerators.shape, dtype=object)
+        for i, (row, denominator) in enumerate(zip(numerators, self.denominators[rows])):
+            entries[i, :] = [Fraction(int(numerator), int(denominator)) for numerator in row]
+        return entries
+
     # Pivot Dictionary with N[k] entering and B[l] leaving
-    # Performs integer pivoting if self.dtype==int
+    # Performs integer pivoting if self.dtype==int and rational pivoting if self.dtype==RationalRows
     def pivot(self, entering, leaving, verbose=False):
         if self.dtype == int:
             self.integer_pivot(entering, leaving)
+        elif self.dtype == RationalRows:
+            self.rational_pivot(entering, leaving)
         else:
             self.float_fraction_pivot(entering, leaving)
 
     # Note that the last pivot coefficient variable is initialized to 1.
+    # With a the pivot coefficient, s the sign of a and c_i the coefficient of the entering variable in row i, every
+    # non-pivot entry becomes (|a|*c_ij - s*c_i*c_lj) // lastpivot. This is the fraction-free (Bareiss) update and
+    # the division is exact.
     # 0) Shift the names of the variables N[entering] <--> B[leaving]
-    # 1) Save pivot coefficient
-    # 2) Move the pivot coefficient value to the rhs
-    # 3) If the pivot coefficient is positive then multiply pivot row by -1 to make the entering variable coefficient
-    #    positive when moved to the lhs when entering the basis
-    # 4) Multiply all non-pivot rows by the absolute value of the pivot coefficient
-    # 5) Input new expression for the leaving variable into all none-pivot rows
-    # 6) Divide all non-pivot rows by the negative absolute value of the last pivot coefficient
-    # 7) Save the absolute value of the pivot coefficient as last pivot coefficient, preparing for the next pivot.
+    # 1) Save pivot coefficient, its sign, the pivot row and the column of the entering variable (multiplied by the
+    #    sign of the pivot coefficient and with the pivot row entry set to 0)
+    # 2) For each block of consecutive non-pivot rows (the rows above and below the pivot row), compute the new values
+    #    in place: multiply by |a|, subtract the outer product of the block of the column and the pivot row (computed
+    #    into a reusable buffer) and divide by the last pivot coefficient (the division is skipped when it is 1).
+    #    The blocks are bounded by PIVOT_BLOCK_ENTRIES as in 'rank_one_update', so the update stays in cache and no
+    #    temporary of the size of the tableau is allocated.
+    # 3) Correct the coefficients of the 'leaving variable' in all non-pivot rows, which is s*c_i
+    # 4) Restore the pivot row multiplied by -s, with the negative last pivot coefficient (times -s) as the
+    #    coefficient of the leaving variable
+    # 5) Save the absolute value of the pivot coefficient as last pivot coefficient, preparing for the next pivot.
     def integer_pivot(self, entering, leaving):
+        if self.C.dtype == np.int64 and self.may_overflow(entering, leaving):
+            self.C = self.backend.integers(self.C)
         temp = self.N[entering]
         self.N[entering] = self.B[leaving]
         self.B[leaving] = temp
         a = self.C[leaving + 1, entering + 1]
-        self.C[leaving + 1, entering + 1] = -self.lastpivot
-        if a > 0:
-            self.C[leaving + 1, :] *= -1
-        for row in range(self.C.shape[0]):
-            if row != leaving + 1:
-                self.C[row, :] = self.C[row, :] * abs(a)
-        for row in range(self.C.shape[0]):
-            if row != leaving + 1:
-                coefficient = self.C[row, entering + 1]
-                pivot_row_multiplier = coefficient // abs(a)
-                self.C[row, entering + 1] = 0
-                self.C[row, :] += pivot_row_multiplier * self.C[leaving + 1, :]
-        for row in range(self.C.shape[0]):
-            if row != leaving + 1:
-                self.C[row, :] = self.C[row, :] // self.lastpivot
-        self.lastpivot = abs(a)
+        sign = 1 if a > 0 else -1
+        pivot_row = self.C[leaving + 1, :].copy()
+        column = self.C[:, entering + 1] * sign
+        column[leaving + 1] = 0
+        rows, cols = self.C.shape
+        block_rows = max(1, min(rows, PIVOT_BLOCK_ENTRIES // cols))
+        buffer = np.empty((block_rows, cols), dtype=self.C.dtype)
+        for first, last in ((0, leaving + 1), (leaving + 2, rows)):
+            for start in range(first, last, block_rows):
+                stop = min(start + block_rows, last)
+                block = self.C[start:stop, :]
+                product = buffer[:stop - start]
+                np.multiply.outer(column[start:stop], pivot_row, out=product)
+                block *= abs(a)
+                block -= product
+                if self.lastpivot != 1:
+                    block //= self.lastpivot
+        self.C[:, entering + 1] = column
+        self.C[leaving + 1, :] = pivot_row * -sign
+        self.C[leaving + 1, entering + 1] = sign * self.lastpivot
+        self.lastpivot = abs(int(a))
+
+    # Checks if the integer pivot on the np.int64 dictionary could overflow.
+    # The intermediate values of the update are |a|*c_ij and c_i*c_lj, so they are bounded by the bit lengths of
+    # |a| plus the largest entry of the dictionary and of the largest entry of the column plus the largest entry of
+    # the pivot row. Both must be at most INT64_PIVOT_BITS so that their difference fits in 63 bits.
+    # The largest entry of the dictionary is found from its maximum and minimum, without a temporary array.
+    def may_overflow(self, entering, leaving):
+        a = abs(int(self.C[leaving + 1, entering + 1]))
+        largest = max(int(self.C.max()), -int(self.C.min()))
+        largest_in_column = int(np.abs(self.C[:, entering + 1]).max())
+        largest_in_row = int(np.abs(self.C[leaving + 1, :]).max())
+        return (a.bit_length() + largest.bit_length() > INT64_PIVOT_BITS or
+                largest_in_column.bit_length() + largest_in_row.bit_length() > INT64_PIVOT_BITS)
+
+    # With a the pivot coefficient, s the sign of a, d_i the denominator of row i and c_i the coefficient of the
+    # entering variable in row i, the pivot row becomes -s*c_lj over the denominator |a| (with s*d_l as the
+    # coefficient of the leaving variable), and every row with c_i != 0 becomes |a|*c_ij + c_i*(pivot row)_j over the
+    # denominator |a|*d_i. Rows with c_i == 0 are not changed.
+    # The rows are reduced by their gcd every RATIONAL_REDUCE_PIVOTS pivots instead of after every pivot (see
+    # 'reduce_rows'), which saves most of the gcd computations. They are not left unreduced for longer, as the entries
+    # of the rows grow with every pivot until they are reduced.
+    # 1) Save pivot coefficient, its sign, the column of the entering variable (with the pivot row entry set to 0)
+    #    and the rows where it is non-zero
+    # 2) Compute the new pivot row, and check if the update could overflow np.int64
+    #       True: reduce the rows and pivot again if they are not reduced, and otherwise promote the dictionary to
+    #             Python ints
+    # 3) Shift the names of the variables N[entering] <--> B[leaving]
+    # 4) Update the rows with a non-zero coefficient of the entering variable and multiply their denominators by |a|
+    # 5) Correct the coefficients of the 'leaving variable' in the updated rows, which is c_i*s*d_l
+    # 6) Store the pivot row with the denominator |a|
+    # 7) Reduce the rows if this was the RATIONAL_REDUCE_PIVOTS'th pivot since they were reduced
+    def rational_pivot(self, entering, leaving):
+        a = self.C[leaving + 1, entering + 1]
+        sign = 1 if a > 0 else -1
+        column = self.C[:, entering + 1].copy()
+        column[leaving + 1] = 0
+        rows = np.flatnonzero(column)
+        pivot_row = self.C[leaving + 1, :] * -sign
+        pivot_row[entering + 1] = self.denominators[leaving + 1] * sign
+        if self.C.dtype == np.int64 and self.rational_may_overflow(rows, a, column, pivot_row):
+            if self.unreduced_pivots > 0:
+                self.reduce_rows()
+                return self.rational_pivot(entering, leaving)
+            self.C = self.C.astype(object)
+            self.denominators = self.denominators.astype(object)
+            column = column.astype(object)
+            pivot_row = pivot_row.astype(object)
+            a = int(a)
+        temp = self.N[entering]
+        self.N[entering] = self.B[leaving]
+        self.B[leaving] = temp
+        block = self.C[rows] * abs(a)
+        block += np.multiply.outer(column[rows], pivot_row)
+        block[:, entering + 1] = column[rows] * pivot_row[entering + 1]
+        self.C[rows] = block
+        self.denominators[rows] *= abs(a)
+        self.C[leaving + 1, :] = pivot_row
+        self.denominators[leaving + 1] = abs(a)
+        self.unreduced_pivots += 1
+        if self.unreduced_pivots >= RATIONAL_REDUCE_PIVOTS:
+            self.reduce_rows()
+
+    # Divides every row of the 'RationalRows' dictionary and its denominator by their gcd
+    def reduce_rows(self):
+        divisors = np.gcd(np.gcd.reduce(self.C, axis=1), self.denominators)
+        self.C //= divisors[:, np.newaxis]
+        self.denominators //= divisors
+        self.unreduced_pivots = 0
+
+    # Checks if the rational pivot on the np.int64 dictionary could overflow, as 'may_overflow' for the changed rows:
+    # the products |a|*c_ij and |a|*d_i are bounded by the bit lengths of |a| and the largest entry (or denominator)
+    # of the rows, and c_i*(pivot row)_j by the bit lengths of the largest entries of the column and the pivot row.
+    def rational_may_overflow(self, rows, a, column, pivot_row):
+        largest = max(int(np.abs(self.C[rows]).max(initial=0)), int(self.denominators[rows].max(initial=0)))
+        largest_in_column = int(np.abs(column).max())
+        largest_in_row = int(np.abs(pivot_row).max())
+        return (abs(int(a)).bit_length() + largest.bit_length() > INT64_PIVOT_BITS or
+                largest_in_column.bit_length() + largest_in_row.bit_length() > INT64_PIVOT_BITS)
 
     # 0) Shift the names of the variables in N and B (This can be done at any point doing the algorithm)
     # 1) Save pivot coefficient into a variable
@@ -187,6 +794,8 @@ class Dictionary:
     #   c) Correct the coefficient of the 'leaving variable' which is now part of the non-basis
     #      This is necessary as the coefficient would otherwise be:
     #           coefficient-value of entering variable + coefficient-value of entering variable * pivot row
+    #
+    # For floating point dictionaries step 4) is done as a rank-1 update of the whole tableau (see rank_one_update).
     def float_fraction_pivot(self, entering, leaving):
         temp = self.N[entering]
         self.N[entering] = self.B[leaving]
@@ -194,8 +803,38 @@ class Dictionary:
         a = self.C[leaving + 1, entering + 1]
         self.C[leaving + 1, :] /= -a
         self.C[leaving + 1, entering + 1] = 1 / a
+        if self.C.dtype.kind == 'f':
+            self.rank_one_update(entering, leaving)
+            return
         for row in range(self.C.shape[0]):
             if row != leaving + 1:
                 c = self.C[row, entering + 1]
                 self.C[row, :] += c * self.C[leaving + 1, :]
                 self.C[row, entering + 1] = c * self.C[leaving + 1, entering + 1]
+
+    # Step 4) of float_fraction_pivot for floating point dictionaries, i.e. C += column * pivot_row for all non-pivot
+    # rows. The pivot row has already been divided by the negative pivot coefficient.
+    # Every entry is computed as in the row by row version (c + column * pivot_row), so the result is identical.
+    #
+    # 1) Save the column of the entering variable
+    # 2) For each block of consecutive non-pivot rows (the rows above and below the pivot row)
+    #   a) Compute the outer product of the block of the column and the pivot row into a reusable buffer.
+    #      The blocks are bounded by PIVOT_BLOCK_ENTRIES so no temporary of the size of the tableau is allocated.
+    #   b) Add the buffer to the block in place
+    # 3) Correct the coefficients of the 'leaving variable' in all non-pivot rows
+    def rank_one_update(self, entering, leaving):
+        rows, cols = self.C.shape
+        pivot_row = self.C[leaving + 1, :]
+        column = self.C[:, entering + 1].copy()
+        block_rows = max(1, min(rows, PIVOT_BLOCK_ENTRIES // cols))
+        buffer = np.empty((block_rows, cols), dtype=self.C.dtype)
+        for first, last in ((0, leaving + 1), (leaving + 2, rows)):
+            for start in range(first, last, block_rows):
+                stop = min(start + block_rows, last)
+                block = buffer[:stop - start]
+                np.multiply.outer(column[start:stop], pivot_row, out=block)
+                self.C[start:stop, :] += block
+        column[leaving + 1] = 0
+        column *= pivot_row[entering + 1]
+        self.C[:leaving + 1, entering + 1] = column[:leaving + 1]
+        self.C[leaving + 2:, entering + 1] = column[leaving + 2:]
@@ -1,9 +1,13 @@
 import random
 import time
+from fractions import Fraction
 
 from scipy.optimize import linprog
 import numpy as np
-from lpsolve import simple_simplex
+import scipy.linalg
+from dictionary import RationalRows
+from lpsolve import simple_simplex, lp_solve
+from numberbackends import number_backend
 
 
 def experiment_execution_time(seed_for_random, random_lp_choice, cmp_function, iterations, dtype, pivotrule_function):
@@ -23,6 +27,49 @@ def experiment_execution_time(seed_for_random, random_lp_choice, cmp_function, i
     print(f"{pivotrule_function}, {dtype}: Average lp_solve: {average_lp_solve}")
 
 
+# Compares the execution time of lp_solve with the number backends 'python' and 'gmpy2' (see 'number_backend') for the
+# exact dtype 'dtype' on random LPs with up to 'size' variables and constraints, and checks that the backends find
+# the same results. If gmpy2 is not installed both runs use the Python types.
+def experiment_number_backends(seed_for_random, iterations, size, dtype, pivotrule_function):
+    random.seed(seed_for_random)
+    np.random.seed(seed_for_random)
+    durations = {'python': 0, 'gmpy2': 0}
+    for i in range(iterations):
+        n = random.randint(1, size)
+        m = random.randint(1, size)
+        c, a, b = random_lp_including_negative_b_values(n, m)
+        results = []
+        for backend in durations:
+            start = time.time()
+            res, d = lp_solve(c, a, b, dtype, pivotrule=lambda d, eps: pivotrule_function(d, eps), backend=backend)
+            durations[backend] += time.time() - start
+            results.append((res, None if d is None else d.value()))
+        assert results[0] == results[1]
+    for backend, duration in durations.items():
+        print(f"{pivotrule_function}, {dtype}, {number_backend(backend)}: Average lp_solve: {duration / iterations}")
+
+
+# Compares the execution time of lp_solve with the exact dtypes Fraction, int and 'RationalRows' on random LPs whose
+# constraints form 'blocks' independent blocks of 'size' variables and constraints, and checks that the dtypes find the
+# same results. 'RationalRows' only changes the rows of the block of the entering variable, while integer pivoting
+# scales every row and its last pivot grows with the pivots of all blocks, so 'RationalRows' is the fastest exact dtype
+# for several blocks. With one block (a dense LP) every row changes in every pivot, and integer pivoting is faster.
+def experiment_exact_dtypes(seed_for_random, iterations, blocks, size, pivotrule_function):
+    np.random.seed(seed_for_random)
+    durations = {Fraction: 0, int: 0, RationalRows: 0}
+    for i in range(iterations):
+        c, a, b = random_lp_blocks(blocks, size)
+        results = []
+        for dtype in durations:
+            start = time.time()
+            res, d = lp_solve(c, a, b, dtype, pivotrule=lambda d, eps: pivotrule_function(d, eps))
+            durations[dtype] += time.time() - start
+            results.append((res, None if d is None else d.value()))
+        assert all(result == results[0] for result in results)
+    for dtype, duration in durations.items():
+        print(f"{pivotrule_function}, {dtype}, {blocks} blocks: Average lp_solve: {duration / iterations}")
+
+
 def compare_to_linprog(random_lp_choice, cmp_function, n, m, dtype, pivotrule=None):
     if random_lp_choice == "non-negative b-values":
         c, a, b = random_lp_only_none_negative_b_values(n, m)
@@ -50,3 +97,8 @@ def random_lp_including_negative_b_values(n, m, sigma=10):
     return np.round(sigma * np.random.randn(n)), np.round(sigma * np.random.randn(m, n)), np.round(
         sigma * np.random.randn(m))
 
+
+def random_lp_blocks(blocks, size, sigma=10):
+    a = scipy.linalg.block_diag(*[np.round(sigma * np.random.randn(size, size)) for block in range(blocks)])
+    return np.round(sigma * np.random.randn(blocks * size)), a, np.round(
+        sigma * np.abs(np.random.randn(blocks * size)))
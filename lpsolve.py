@@ -3,11 +3,20 @@ from fractions import Fraction
 import numpy as np
 
 import dictionary
-from dictionary import Dictionary
+from dictionary import Dictionary, RationalRows, convert_array, fits_int64
 from lpresult import LPResult
-from pivotrules import bland, eps_correction
+from pivotrules import bland, smallest_subscript, eps_correction, lexicographic_leaving_variable, dual_bland, \
+    dual_largest_infeasibility, infeasible_constants, infeasible_coefficients
+from sparsedictionary import SparseDictionary
 from scipy.optimize import linprog as linprog_original
 import scipy.optimize
+import scipy.sparse
+
+# eps of the np.float64 solve of 'float_first_lp_solve'
+FLOAT_FIRST_EPS = 1e-9
+
+# Largest number of decimals of the input which is read as decimal data by dtype 'auto' (see 'auto_dtype')
+MAX_AUTO_DECIMALS = 12
 
 
 # Simplex algorithm
@@ -19,7 +28,7 @@ import scipy.optimize
 # are to be treated as if they were 0.
 #
 # pivotrule is a rule used for pivoting. Cycling is prevented by
-# switching to Bland's rule as needed.
+# switching to an anti-cycle mode as needed (see 'simplex').
 #
 # If verbose is True it outputs possible useful information about
 # the execution, e.g. the sequence of pivot operations
@@ -39,48 +48,291 @@ import scipy.optimize
 # 3) Set the entering variable to be the auxiliary variable
 # 4) Find the leaving variable, where the constraint have the numerically greatest negative constant
 # 5) pivot(auxiliary variable, leaving identified above)
-# 6) Use the simplex method in the dictionary
-# 7) Check if simplex method is unbounded
-#       True: return INFEASIBLE, None
-# 8) Check if the auxiliary variable is in the basis
-#       True: pivot the auxiliary variable out of the basis. The entering variable can be chosen arbitrarily
-# 9) Identify location of auxiliary variable in the non-basis
-# 10) Delete the column with the auxiliary variable, and
-#     delete the element of N holding the auxiliary variable
-# 11) Correct the OF
-# 12) return simplex(...)
-def lp_solve(c, a, b, dtype=Fraction, eps=0, pivotrule=lambda d, eps: bland(d, eps=0), verbose=False):
+# 6) Use the simplex method in the dictionary. The auxiliary LP is bounded (its OF -x0 is at most 0), so it can only be
+#    reported unbounded when rounding errors of a floating point dtype leave a positive coefficient in the OF which
+#    should be 0. No pivot is made then, so D is the optimal auxiliary dictionary either way, and an infeasible LP
+#    is found by 'simplex' in phase two (x0 is positive, so a constant is negative when it is removed)
+# 7) Check if the auxiliary variable is in the basis
+#       True: pivot the auxiliary variable out of the basis. The entering variable can be chosen arbitrarily among
+#             the variables with a non-zero coefficient in the row of the auxiliary variable
+# 8) Remove the auxiliary variable from the dictionary and correct the OF (see 'Dictionary.remove_auxiliary')
+# 9) return simplex(...)
+#
+# 'a' may be a scipy.sparse matrix, in which case the LP is solved on a 'SparseDictionary', and the fill-in of the
+# pivots is added to statistics for every result (see 'fill_in_statistics').
+# anticycling and statistics are passed on to 'simplex' for both phases.
+# phase_one selects how an LP with a negative constraint constant is solved (see 'phase_one_method'):
+#   'auxiliary': the auxiliary dictionary as above
+#   'dual': the dual simplex method with the pivot rule dualrule (see 'dual_simplex'), directly on the dictionary of the
+#           LP if it is dual feasible and as phase one of 'composite_simplex' otherwise
+#   'auto': 'dual', unless 'a' is a scipy.sparse matrix
+# The method is reported as statistics['phase_one'] ('auxiliary', 'dual' or 'composite').
+# If float_first is True and dtype is exact (Fraction or int) the LP is solved with np.float64 first, and the optimal
+# basis is certified in dtype (see 'float_first_lp_solve').
+# backend selects the number types of the exact dtypes, 'python' or 'gmpy2' (see 'number_backend').
+# If dtype is 'auto' the dtype is chosen from the input data, exact unless exact is False (see 'auto_dtype'), and it is
+# the attribute 'chosen_dtype' of the returned dictionary.
+def lp_solve(c, a, b, dtype=Fraction, eps=0, pivotrule=lambda d, eps: bland(d, eps=0), verbose=False,
+             anticycling='bland', statistics=None, float_first=False, backend='python', exact=True, phase_one='auto',
+             dualrule=lambda d, eps: dual_largest_infeasibility(d, eps)):
+    if dtype == 'auto':
+        dtype, scale, c, a, b, eps = resolve_auto_dtype(c, a, b, eps, exact, statistics)
+        return auto_solution(lp_solve(c, a, b, dtype, eps, pivotrule, verbose, anticycling, statistics, float_first,
+                                      backend, exact, phase_one, dualrule), dtype, scale)
+    if float_first and dtype != np.float64:
+        return float_first_lp_solve(c, a, b, dtype, eps, pivotrule, anticycling, statistics, backend, dualrule)
     if (b >= 0).all():
-        d = dictionary.Dictionary(c, a, b, dtype)
-        return simplex(d, eps, pivotrule)
-    d_aux = Dictionary(None, a, b, dtype)
+        d = make_dictionary(c, a, b, dtype, backend)
+        return fill_in_statistics(simplex(d, eps, pivotrule, anticycling=anticycling, statistics=statistics), d,
+                                  statistics)
+    method = phase_one_method(c, a, phase_one)
+    if statistics is not None:
+        statistics['phase_one'] = method
+    if method == 'dual':
+        return dual_simplex(make_dictionary(c, a, b, dtype, backend), eps, dualrule, statistics=statistics)
+    if method == 'composite':
+        return composite_simplex(make_dictionary(c, a, b, dtype, backend), c, eps, pivotrule, dualrule,
+                                 anticycling=anticycling, statistics=statistics)
+    d_aux = make_dictionary(None, a, b, dtype, backend)
     entering = d_aux.N.shape[0] - 1
     leaving = lowest_constraint_const(d_aux)
     d_aux.pivot(entering, leaving)
-    result_aux, d_aux = simplex(d_aux, eps, pivotrule)
-    if result_aux != LPResult.OPTIMAL:
-        return LPResult.INFEASIBLE, None
+    simplex(d_aux, eps, pivotrule, anticycling=anticycling, statistics=statistics)
     is_auxiliary_variable_in_basis, position_in_basis = position_of_auxiliary_variable_in_basis(d_aux)
     if is_auxiliary_variable_in_basis:
-        entering = 0
+        entering = int(np.flatnonzero(d_aux.C[position_in_basis + 1, 1:] != 0)[0])
         d_aux.pivot(entering, position_in_basis)
-    index_of_auxiliary_variable_in_basis = basis_index_auxiliary_variable(d_aux)
-    d_aux.N = np.delete(d_aux.N, index_of_auxiliary_variable_in_basis, 0)
-    d_aux.C = np.delete(d_aux.C, index_of_auxiliary_variable_in_basis + 1, 1)
-    d_aux.C[0, 1:] = c
-    aggregate = np.full((len(c) + 1), 0, dtype)
-    for index, b in enumerate(d_aux.B):
-        if b <= len(c):
-            aggregate = aggregate + d_aux.C[index + 1, :] * c[b - 1]
-            d_aux.C[0, b] = 0
-    d_aux.C[0, :] += aggregate
-    return simplex(d_aux, eps=eps, pivotrule=pivotrule)
+    d_aux.remove_auxiliary(c)
+    return fill_in_statistics(simplex(d_aux, eps=eps, pivotrule=pivotrule, anticycling=anticycling,
+                                      statistics=statistics), d_aux, statistics)
+
+
+# Adds the fill-in of a 'SparseDictionary' D (see 'SparseDictionary.fill_in_statistics') to statistics of 'lp_solve',
+# also when the LP is not optimal and D is not returned. The pivots are already counted by 'simplex'.
+# Returns 'solution', the return value of 'lp_solve'.
+def fill_in_statistics(solution, d, statistics):
+    if statistics is not None and isinstance(d, SparseDictionary):
+        fill_in = d.fill_in_statistics()
+        del fill_in['pivots']
+        statistics.update(fill_in)
+    return solution
+
+
+# The method of 'lp_solve' for an LP with a negative constraint constant:
+#   'auxiliary' for phase_one 'auxiliary', and for phase_one 'auto' if 'a' is a scipy.sparse matrix (the dual methods
+#               are not implemented for 'SparseDictionary')
+#   'dual' if the dictionary of the LP is dual feasible (no positive coefficient in 'c'), as the dual simplex method
+#          then solves the LP without a phase one
+#   'composite' otherwise
+# The dual methods are picked by 'auto' as they needed fewer pivots and less time than the auxiliary dictionary on
+# random LPs with every dtype (about half the time for dual feasible LPs, and 10-30% less for the other LPs).
+def phase_one_method(c, a, phase_one):
+    if phase_one not in ['auto', 'auxiliary', 'dual']:
+        raise ValueError(f"Unknown phase one: {phase_one}")
+    if phase_one == 'auxiliary' or (phase_one == 'auto' and scipy.sparse.issparse(a)):
+        return 'auxiliary'
+    if scipy.sparse.issparse(a):
+        raise ValueError("The dual methods are not implemented for a scipy.sparse 'a'")
+    if (np.asarray(c) <= 0).all():
+        return 'dual'
+    return 'composite'
+
+
+# Constructs the dictionary of the LP (or the auxiliary dictionary if 'c' is None).
+# If 'a' is a scipy.sparse matrix the dictionary is a 'SparseDictionary', which always uses the Python number types.
+# 'RationalRows' is solved with Fraction on a 'SparseDictionary', which stores a Fraction only for the non-zero entries
+# and has no dense rows to share a denominator.
+def make_dictionary(c, a, b, dtype, backend='python'):
+    if scipy.sparse.issparse(a):
+        return SparseDictionary(c, a, b, Fraction if dtype == RationalRows else dtype)
+    return Dictionary(c, a, b, dtype, backend)
+
+
+# Float-first solve with exact certification
+#
+# Solves the LP like 'lp_solve' in the exact dtype 'dtype', but finds the optimal basis with the much faster np.float64
+# arithmetic first (with eps FLOAT_FIRST_EPS), and then only builds the dictionary of that basis in exact arithmetic.
+# The exact dictionary is optimal if it is primal feasible (no negative constraint constant) and dual feasible (no
+# positive coefficient in the OF), which is checked exactly. Otherwise the exact pivots continue from the basis: the
+# simplex method if it is primal feasible, the dual simplex method (with the rule dualrule) if it is dual feasible, and
+# 'composite_simplex' if it is neither. The LP is only solved from scratch if the basis can not be used (a
+# 'SparseDictionary' which is not primal feasible, as the dual methods are not implemented for it).
+#
+# If statistics is a dict statistics['certified_first_try'] is True if the basis found with np.float64 is optimal,
+# statistics['basis_pivots'] is the number of exact pivots to build the dictionary of the basis, and
+# statistics['float_statistics'] are the statistics of the np.float64 solve.
+#
+# 1) Solve the LP with np.float64
+# 2) Check if the LP is not optimal
+#       True: return lp_solve(...) in dtype (infeasibility and unboundedness are not certified by a basis)
+# 3) Map the basis to the variables of the LP without the auxiliary variable (variables after x0 move one down)
+# 4) Construct the exact dictionary and pivot it to the basis (see 'pivot_to_basis')
+#       False if the basis is singular in exact arithmetic: return lp_solve(...) in dtype
+# 5) Check if the dictionary is primal and dual feasible
+#       True: return LPResult.OPTIMAL, d
+# 6) Check if the dictionary is primal feasible
+#       True: return simplex(...) from the dictionary
+# 7) Check if the dictionary is a 'SparseDictionary'
+#       True: return lp_solve(...) in dtype
+# 8) Check if the dictionary is dual feasible
+#       True: return dual_simplex(...) from the dictionary
+# 9) return composite_simplex(...) from the dictionary
+def float_first_lp_solve(c, a, b, dtype=Fraction, eps=0, pivotrule=lambda d, eps: bland(d, eps=0), anticycling='bland',
+                         statistics=None, backend='python', dualrule=lambda d, eps: dual_largest_infeasibility(d, eps)):
+    if statistics is None:
+        statistics = dict()
+    statistics['certified_first_try'] = False
+    statistics['basis_pivots'] = 0
+    statistics['float_statistics'] = dict()
+    result, d_float = lp_solve(c, a, b, np.float64, max(eps, FLOAT_FIRST_EPS), pivotrule, anticycling=anticycling,
+                               statistics=statistics['float_statistics'])
+    if result != LPResult.OPTIMAL:
+        return lp_solve(c, a, b, dtype, eps, pivotrule, anticycling=anticycling, statistics=statistics,
+                        backend=backend)
+    basis = original_basis(d_float)
+    d = make_dictionary(c, a, b, dtype, backend)
+    pivots = pivot_to_basis(d, basis)
+    if pivots is None:
+        return lp_solve(c, a, b, dtype, eps, pivotrule, anticycling=anticycling, statistics=statistics,
+                        backend=backend)
+    statistics['basis_pivots'] = pivots
+    primal_feasible = bool((d.C[1:, 0] >= 0).all())
+    if primal_feasible and (d.C[0, 1:] <= 0).all():
+        statistics['certified_first_try'] = True
+        return LPResult.OPTIMAL, d
+    if primal_feasible:
+        return simplex(d, eps, pivotrule, anticycling=anticycling, statistics=statistics)
+    if isinstance(d, SparseDictionary):
+        return lp_solve(c, a, b, dtype, eps, pivotrule, anticycling=anticycling, statistics=statistics,
+                        backend=backend)
+    if not infeasible_coefficients(d, eps).any():
+        return dual_simplex(d, eps, dualrule, statistics=statistics)
+    return composite_simplex(d, c, eps, pivotrule, dualrule, anticycling=anticycling, statistics=statistics)
+
+
+# The basic variables of the dictionary numbered as in the dictionary of the LP, i.e. without the auxiliary variable
+# (the slack variables of a dictionary which was an auxiliary dictionary move one down)
+def original_basis(d):
+    n, m, auxiliary = d.variables
+    basis = d.B.copy()
+    if auxiliary:
+        basis[basis > n + 1] -= 1
+    return basis
+
+
+# Pivots the dictionary such that the variables of 'basis' are basic.
+# Each variable of the basis which is non-basic enters, and leaves for the first basic variable which is not in the
+# basis and has a non-zero coefficient in the column of the entering variable.
+# Returns the number of pivots, or None if the basis is singular (no such basic variable exists).
+def pivot_to_basis(d, basis):
+    pivots = 0
+    for variable in basis:
+        if variable in d.B:
+            continue
+        entering = int(np.flatnonzero(d.N == variable)[0])
+        column = d.C[1:, entering + 1]
+        rows = np.flatnonzero((column != 0) & ~np.isin(d.B, basis))
+        if rows.size == 0:
+            return None
+        d.pivot(entering, int(rows[0]))
+        pivots += 1
+    return pivots
 
 
 # A simple wrapper method for the simplex algorithm which produces the dictionary and calls the simplex method.
-def simple_simplex(c, a, b, dtype=Fraction, eps=0, pivotrule=lambda D: bland(D, eps=0), verbose=False):
-    d = Dictionary(c, a, b, dtype)
-    return simplex(d, eps, pivotrule, verbose)
+# dtype 'auto' is as for 'lp_solve'.
+def simple_simplex(c, a, b, dtype=Fraction, eps=0, pivotrule=lambda d, eps: bland(d, eps=0), verbose=False,
+                   backend='python', exact=True, statistics=None):
+    if dtype == 'auto':
+        dtype, scale, c, a, b, eps = resolve_auto_dtype(c, a, b, eps, exact, statistics)
+        return auto_solution(simple_simplex(c, a, b, dtype, eps, pivotrule, verbose, backend, exact, statistics),
+                             dtype, scale)
+    d = Dictionary(c, a, b, dtype, backend)
+    return simplex(d, eps, pivotrule, verbose, statistics=statistics)
+
+
+# Chooses the dtype of the LP c,A,b for dtype 'auto' by inspecting the input once:
+#   exact is False: np.float64
+#   integral data: int, which is stored as np.int64 if the entries fit (see 'Dictionary')
+#   decimal data (at most MAX_AUTO_DECIMALS decimals, see 'input_decimals'): the data is read as the decimals it
+#       represents, and c,A,b are scaled by 10^decimals to integers (see 'decimal_integers'), so the LP is solved with
+#       int. The scaled LP has the same solutions and pivots, and its optimal dictionary is turned into the dictionary
+#       of the LP by 'lp_solve' (see 'auto_solution'). A scipy.sparse 'a' is scaled in its non-zero entries, and the
+#       LP is solved with int on a 'SparseDictionary'.
+#   otherwise: 'RationalRows' (Fraction for a scipy.sparse 'a'), where every float is converted exactly
+# Returns the dtype, the number of decimals of the data (None if it is not decimal) and c,A,b for the dtype.
+def auto_dtype(c, a, b, exact=True):
+    if not exact:
+        return np.float64, input_decimals(c, a, b), c, a, b
+    decimals = input_decimals(c, a, b)
+    if decimals == 0:
+        return int, decimals, c, a, b
+    if decimals is not None and scipy.sparse.issparse(a):
+        a = a.tocsr(copy=True)
+        a.data = decimal_integers(a.data, decimals)
+        return int, decimals, decimal_integers(c, decimals), a, decimal_integers(b, decimals)
+    if decimals is not None:
+        return int, decimals, *[decimal_integers(values, decimals) for values in [c, a, b]]
+    if scipy.sparse.issparse(a):
+        return Fraction, decimals, c, a, b
+    return RationalRows, decimals, c, a, b
+
+
+# The least number of decimals k <= MAX_AUTO_DECIMALS such that every entry of the input is the np.float64 nearest to
+# an integer divided by 10^k (0 for integral data), or None if there is no such k (or the input is not numeric).
+def input_decimals(c, a, b):
+    if scipy.sparse.issparse(a):
+        a = a.data
+    arrays = [np.asarray(values) for values in [c, a, b]]
+    if any(values.dtype.kind not in 'biuf' for values in arrays):
+        return None
+    values = np.concatenate([values.ravel() for values in arrays]).astype(np.float64)
+    if not np.isfinite(values).all():
+        return None
+    for decimals in range(MAX_AUTO_DECIMALS + 1):
+        if (np.round(values * 10.0 ** decimals) / 10.0 ** decimals == values).all():
+            return decimals
+    return None
+
+
+# The entries of 'values', decimals with 'decimals' decimals (see 'input_decimals'), times 10^decimals as np.int64 if
+# they fit (see 'fits_int64') and as Python ints otherwise
+def decimal_integers(values, decimals):
+    values = np.round(np.asarray(values) * 10.0 ** decimals)
+    if fits_int64(None, values, []):
+        return values.astype(np.int64)
+    integers = np.empty(values.shape, dtype=object)
+    convert_array(values, int, integers)
+    return integers
+
+
+# The return value of 'lp_solve' or 'simple_simplex' with dtype 'auto' from the solution of the LP with the chosen
+# dtype and c,A,b scaled by 'scale' (see 'auto_dtype'). An optimal dictionary of a scaled LP is turned into the
+# dictionary of the LP (see 'Dictionary.unscale' and 'SparseDictionary.unscale'), and the chosen dtype is the
+# attribute 'chosen_dtype' of the dictionary.
+def auto_solution(solution, dtype, scale):
+    result, d = solution
+    if d is not None:
+        if scale != 1:
+            d.unscale(scale)
+        d.chosen_dtype = dtype
+    return result, d
+
+
+# Resolves dtype 'auto' for 'lp_solve' and 'simple_simplex' (see 'auto_dtype'). The eps of np.float64 is at least
+# FLOAT_FIRST_EPS. If statistics is a dict the chosen dtype and the number of decimals of the data are reported as
+# statistics['dtype'] and statistics['decimals'].
+# Returns the dtype, the scale of c,A,b (10^decimals if decimal data is scaled to int and 1 otherwise), c,A,b for the
+# dtype and eps.
+def resolve_auto_dtype(c, a, b, eps, exact, statistics):
+    dtype, decimals, c, a, b = auto_dtype(c, a, b, exact)
+    if statistics is not None:
+        statistics['dtype'] = dtype
+        statistics['decimals'] = decimals
+    if dtype == np.float64:
+        eps = max(eps, FLOAT_FIRST_EPS)
+    scale = 10 ** decimals if dtype == int and decimals is not None else 1
+    return dtype, scale, c, a, b, eps
 
 
 # Simplex algorithm
@@ -92,7 +344,7 @@ def simple_simplex(c, a, b, dtype=Fraction, eps=0, pivotrule=lambda D: bland(D,
 # are to be treated as if they were 0.
 #
 # pivotrule is a rule used for pivoting. Cycling is prevented by
-# switching to Bland's rule as needed.
+# switching to an anti-cycle mode as needed (see anticycling below).
 #
 # If verbose is True it outputs possible useful information about
 # the execution, e.g. the sequence of pivot operations
@@ -111,71 +363,368 @@ def simple_simplex(c, a, b, dtype=Fraction, eps=0, pivotrule=lambda D: bland(D,
 # In general when working with fractions one has to divided periodically by the common factors, to prevent an explosion
 # of the numerator and the denominator. Note that this is done automatically when using pythons Fraction type.
 #
-# 0) Set max_degenerate_steps_before_anti_cycle_mode to whatever you choose and
-#    consecutive_degenerate_steps = 0
+# Cycling is detected by hashing the basis: while the OF does not strictly increase (a degenerate stretch) the
+# hashes of the visited bases are kept, and if a basis is visited again the simplex method is cycling. Then it
+# switches to the anti-cycle mode selected by anticycling:
+#   'bland': the entering and leaving variables are picked by Bland's rule (see 'smallest_subscript')
+#   'lexicographic': the entering variable is still picked by pivotrule, and the leaving variable by the
+#                    lexicographic ratio test (see 'lexicographic_leaving_variable'), where the constraint constants
+#                    are perturbed by the identity matrix when the anti-cycle mode starts
+# Both modes guarantee termination, and pivotrule is used again as soon as the OF strictly increases, i.e. once the
+# simplex method has left the degenerate vertex.
+#
+# If statistics is a dict the number of pivots, the number of degenerate pivots (which did not strictly increase the
+# OF), the number of pivots in the anti-cycle mode and the number of detected cycles are added to
+# statistics['pivots'], statistics['degenerate_pivots'], statistics['anticycling_pivots'] and
+# statistics['cycles_detected'].
+#
+# Only the OF value is compared to decide if a pivot is degenerate, so the constraint constants are not scanned after
+# a pivot. The initial check of the constants is a single eps-corrected array comparison (see 'infeasible_constants').
+#
+# 0) Compute the hash of the basis, and add it to the set of bases of the degenerate stretch
 # 1) Check if dictionary is not origo-feasible
 #   True: return LPResult.INFEASIBLE, None
 # 2) Get entering and leaving variable using the pivot rule
 # 3) While entering and leaving is None (We haven't found the optimal, nor that the dictionary is unbounded)
-#       a) pivot(entering, leaving)
-#       b) Check if dictionary is degenerate (If any of the constraint constants are zero)
-#           True: Add one to count of consecutive degenerate steps
-#                 Check if consecutive degenerate steps have reached the max_degenerate_steps_before_anti_cycle_mode
-#                       True: Shift to an anti cycle mode (We use bland's rule for anti-cycle pivoting)
-#           False: Set consecutive degenerate steps = 0
-#       c) Get next entering and leaving variable using the pivot rule
+#       a) In the lexicographic anti-cycle mode: pick the leaving variable by the lexicographic ratio test and pivot
+#          the perturbation
+#       b) Update the hash of the basis and pivot(entering, leaving)
+#       c) Check if the OF strictly increased
+#           True: Leave the anti-cycle mode, and start a new degenerate stretch with only the new basis
+#           False: The pivot is degenerate. Check if the basis has been visited in the degenerate stretch
+#                   True: The simplex method is cycling, shift to the anti-cycle mode
+#                   False: Add the basis to the degenerate stretch
+#       d) Get next entering and leaving variable using the pivot rule (Bland's rule in the 'bland' anti-cycle mode)
 # 4) Check if the dictionary is unbounded (entering is not None and leaving is None)
 #   True: return LPResult.UNBOUNDED, None
 # 5) return LPResult.OPTIMAL, d
-def simplex(d, eps=0, pivotrule=lambda d, eps: bland(d, eps=0), verbose=False):
-    consecutive_degenerate_steps_before_anti_cycle = 10
-    if (d.C[1:, 0] < 0).any():
+def simplex(d, eps=0, pivotrule=lambda d, eps: bland(d, eps=0), verbose=False, anticycling='bland',
+            statistics=None):
+    if anticycling not in ['bland', 'lexicographic']:
+        raise ValueError(f"Unknown anti-cycling mode: {anticycling}")
+    if statistics is None:
+        statistics = dict()
+    for key in ['pivots', 'degenerate_pivots', 'anticycling_pivots', 'cycles_detected']:
+        statistics.setdefault(key, 0)
+    keys = basis_hash_keys(d)
+    basis_hash = 0
+    for variable in d.B:
+        basis_hash ^= keys[variable]
+    degenerate_stretch = {basis_hash}
+    if infeasible_constants(d, eps).any():
         return LPResult.INFEASIBLE, None
-    consecutive_degenerate_steps = 0
+    anti_cycle_mode = False
+    perturbation = None
     entering, leaving = pivotrule(d, eps)
     while entering is not None and leaving is not None:
+        if anti_cycle_mode and anticycling == 'lexicographic':
+            leaving = lexicographic_leaving_variable(d, eps, entering, perturbation)
+            perturbation = pivot_perturbation(d, perturbation, entering, leaving)
+        basis_hash ^= keys[d.N[entering]] ^ keys[d.B[leaving]]
+        value = d.value()
         d.pivot(entering, leaving)
-        for const in d.C[:, 0][1:]:
-            if eps_correction(const, eps, d.dtype) == 0:  # New dictionary is degenerate
-                consecutive_degenerate_steps += 1
-                if consecutive_degenerate_steps > consecutive_degenerate_steps_before_anti_cycle:
-                    pivotrule = lambda d, eps: bland(d, eps)
-                break
+        statistics['pivots'] += 1
+        if anti_cycle_mode:
+            statistics['anticycling_pivots'] += 1
+        if eps_correction(d.value() - value, eps, d.dtype) > 0:
+            anti_cycle_mode = False
+            degenerate_stretch = {basis_hash}
         else:
-            consecutive_degenerate_steps = 0
-        entering, leaving = pivotrule(d, eps)
+            statistics['degenerate_pivots'] += 1
+            if basis_hash not in degenerate_stretch:
+                degenerate_stretch.add(basis_hash)
+            elif not anti_cycle_mode:
+                statistics['cycles_detected'] += 1
+                anti_cycle_mode = True
+                perturbation = initial_perturbation(d)
+        if anti_cycle_mode and anticycling == 'bland':
+            entering, leaving = smallest_subscript(d, eps)
+        else:
+            entering, leaving = pivotrule(d, eps)
     if entering is not None and leaving is None:
         return LPResult.UNBOUNDED, None
     return LPResult.OPTIMAL, d
 
 
+# Dual simplex algorithm
+#
+# Solves the LP of a dual feasible dictionary D (no positive coefficient in the OF, see 'infeasible_coefficients'), e.g.
+# the dictionary of an LP where only some constraint constants are negative and no coefficient of 'c' is positive.
+# Every pivot keeps the dictionary dual feasible and makes a negative constant non-negative, and the dictionary is
+# optimal once it is also primal feasible. Raises ValueError if D is not dual feasible.
+#
+# eps, verbose and statistics are as for 'simplex'.
+#
+# dualrule is a rule for the dual simplex method, which returns entering and leaving (see 'dual_largest_infeasibility'
+# and 'dual_bland').
+#
+# If LP is infeasible (a row with a negative constant has no positive coefficient) the return value is
+# LPResult.INFEASIBLE, None
+#
+# If LP has an optimal solution the return value is
+# LPResult.OPTIMAL,d, where d is an optimal dictionary.
+#
+# As the dual of 'simplex' the OF never increases. Cycling is detected by hashing the basis as in 'simplex' while the
+# OF does not strictly decrease, and the anti-cycle mode picks the entering and leaving variables by 'dual_bland'.
+# The pivots are also counted in statistics['dual_pivots'].
+#
+# If cutoff is not None the method stops as soon as the OF is at most cutoff, as it can only decrease further (e.g. a
+# node of 'milp_solve' which cannot improve on the best solution found). The return value is then
+# LPResult.INFEASIBLE, None, as no solution with a value above cutoff exists, and statistics['cut_off'] is True.
+#
+# 0) Compute the hash of the basis, and add it to the set of bases of the degenerate stretch
+# 1) Check if the dictionary is not dual feasible
+#   True: raise ValueError
+# 2) Get entering and leaving variable using the dual pivot rule
+# 3) While entering and leaving is None (We haven't found the optimal, nor that the LP is infeasible)
+#       a) Check if the OF is at most cutoff
+#           True: return LPResult.INFEASIBLE, None
+#       b) Update the hash of the basis and pivot(entering, leaving)
+#       c) Check if the OF strictly decreased
+#           True: Leave the anti-cycle mode, and start a new degenerate stretch with only the new basis
+#           False: Check if the basis has been visited in the degenerate stretch
+#                   True: The dual simplex method is cycling, shift to the anti-cycle mode
+#                   False: Add the basis to the degenerate stretch
+#       d) Get next entering and leaving variable using the dual pivot rule ('dual_bland' in the anti-cycle mode)
+# 4) Check if the LP is infeasible (leaving is not None and entering is None)
+#   True: return LPResult.INFEASIBLE, None
+# 5) return LPResult.OPTIMAL, d
+def dual_simplex(d, eps=0, dualrule=lambda d, eps: dual_largest_infeasibility(d, eps), verbose=False,
+                 statistics=None, cutoff=None):
+    if statistics is None:
+        statistics = dict()
+    for key in ['pivots', 'degenerate_pivots', 'anticycling_pivots', 'cycles_detected', 'dual_pivots']:
+        statistics.setdefault(key, 0)
+    keys = basis_hash_keys(d)
+    basis_hash = 0
+    for variable in d.B:
+        basis_hash ^= keys[variable]
+    degenerate_stretch = {basis_hash}
+    if infeasible_coefficients(d, eps).any():
+        raise ValueError("The dictionary is not dual feasible")
+    anti_cycle_mode = False
+    entering, leaving = dualrule(d, eps)
+    while entering is not None and leaving is not None:
+        value = d.value()
+        if cutoff is not None and value <= cutoff:
+            statistics['cut_off'] = True
+            return LPResult.INFEASIBLE, None
+        basis_hash ^= keys[d.N[entering]] ^ keys[d.B[leaving]]
+        d.pivot(entering, leaving)
+        statistics['pivots'] += 1
+        statistics['dual_pivots'] += 1
+        if anti_cycle_mode:
+            statistics['anticycling_pivots'] += 1
+        if eps_correction(value - d.value(), eps, d.dtype) > 0:
+            anti_cycle_mode = False
+            degenerate_stretch = {basis_hash}
+        else:
+            statistics['degenerate_pivots'] += 1
+            if basis_hash not in degenerate_stretch:
+                degenerate_stretch.add(basis_hash)
+            elif not anti_cycle_mode:
+                statistics['cycles_detected'] += 1
+                anti_cycle_mode = True
+        if anti_cycle_mode:
+            entering, leaving = dual_bland(d, eps)
+        else:
+            entering, leaving = dualrule(d, eps)
+    if leaving is not None and entering is None:
+        return LPResult.INFEASIBLE, None
+    return LPResult.OPTIMAL, d
+
+
+# Composite primal-dual simplex algorithm
+#
+# Solves the LP with objective function 'c' of the dictionary D (of the LP, or of any basis of it, e.g. the basis of
+# 'float_first_lp_solve'), which is neither primal nor dual feasible, without an auxiliary variable:
+# 1) Replace the OF by an OF which is dual feasible: the OF 'c' with its positive coefficients replaced by -1 (see
+#    'Dictionary.clip_objective'), which in the dictionary of the LP is the coefficients of 'c' where they are negative
+#    and -1 elsewhere
+# 2) Solve with the dual simplex method, which finds a primal feasible dictionary (see 'dual_simplex')
+#       Infeasible: return LPResult.INFEASIBLE, None
+# 3) Use the OF 'c' again (see 'Dictionary.set_objective')
+# 4) return simplex(...) from the primal feasible dictionary
+# The arguments are as for 'simplex' and 'dual_simplex'.
+def composite_simplex(d, c, eps=0, pivotrule=lambda d, eps: bland(d, eps=0),
+                      dualrule=lambda d, eps: dual_largest_infeasibility(d, eps), verbose=False, anticycling='bland',
+                      statistics=None):
+    d.set_objective(c)
+    d.clip_objective()
+    result, d = dual_simplex(d, eps, dualrule, statistics=statistics)
+    if result != LPResult.OPTIMAL:
+        return LPResult.INFEASIBLE, None
+    d.set_objective(c)
+    return simplex(d, eps, pivotrule, anticycling=anticycling, statistics=statistics)
+
+
+# Re-optimizes the dictionary D from its current basis, e.g. an optimal dictionary after 'Dictionary.add_constraint'
+# or 'Dictionary.add_column', instead of solving the changed LP from scratch.
+# 1) Check if D is primal feasible (e.g. after a new column)
+#       True: return simplex(...)
+# 2) Check if D is dual feasible (e.g. after a new constraint)
+#       True: return dual_simplex(...)
+# 3) raise ValueError, as D is neither primal nor dual feasible
+# The arguments are as for 'simplex' and 'dual_simplex'. If statistics is a dict the method is reported as
+# statistics['reoptimization'] ('primal' or 'dual').
+def reoptimize(d, eps=0, pivotrule=lambda d, eps: bland(d, eps=0),
+               dualrule=lambda d, eps: dual_largest_infeasibility(d, eps), verbose=False, anticycling='bland',
+               statistics=None):
+    if statistics is None:
+        statistics = dict()
+    if not infeasible_constants(d, eps).any():
+        statistics['reoptimization'] = 'primal'
+        return simplex(d, eps, pivotrule, anticycling=anticycling, statistics=statistics)
+    if not infeasible_coefficients(d, eps).any():
+        statistics['reoptimization'] = 'dual'
+        return dual_simplex(d, eps, dualrule, statistics=statistics)
+    raise ValueError("The dictionary is neither primal nor dual feasible")
+
+
+# Solves many what-if scenarios of the LP c,A,b which share one solve of the LP.
+#
+# 'scenarios' is a list of dicts, where scenario['c'] and scenario['b'] (both optional) are dicts from indices of 'c'
+# and 'b' to their new values in the scenario.
+# The LP is solved with 'lp_solve', and each scenario starts from a copy of the optimal dictionary:
+# 1) Change the constraint constants (see 'Dictionary.change_rhs') and re-optimize (the dual simplex method if a
+#    constant became negative, see 'reoptimize')
+# 2) If the scenario is still feasible change the OF (see 'Dictionary.change_objective') and re-optimize (the primal
+#    simplex method if a coefficient became positive)
+# The changes are computed exactly for the exact dtypes. If the LP is not optimal there is no basis to start from, and
+# every scenario is solved with 'lp_solve'.
+#
+# Returns a list with the LPResult, the OF value and the basic solution of each scenario (the value and solution are
+# None unless the scenario is optimal).
+#
+# The other arguments are as for 'lp_solve'. If statistics is a dict the statistics of the solve of the LP are
+# statistics['base_statistics'], and the pivots of the scenarios are the list statistics['scenario_pivots'].
+def solve_scenarios(c, a, b, scenarios, dtype=Fraction, eps=0, pivotrule=lambda d, eps: bland(d, eps=0),
+                    dualrule=lambda d, eps: dual_largest_infeasibility(d, eps), anticycling='bland', statistics=None,
+                    backend='python'):
+    if statistics is None:
+        statistics = dict()
+    statistics['base_statistics'] = dict()
+    statistics['scenario_pivots'] = []
+    result, d = lp_solve(c, a, b, dtype, eps, pivotrule, anticycling=anticycling,
+                         statistics=statistics['base_statistics'], backend=backend, dualrule=dualrule)
+    solutions = []
+    for scenario in scenarios:
+        scenario_statistics = dict(pivots=0)
+        if result == LPResult.OPTIMAL:
+            scenario_result, d_scenario = LPResult.OPTIMAL, d.copy()
+            changes = scenario.get('b', dict())
+            if len(changes) > 0:
+                d_scenario.change_rhs(list(changes), [scenario_delta(value, b[index], d.dtype)
+                                                      for index, value in changes.items()])
+                scenario_result, d_scenario = reoptimize(d_scenario, eps, pivotrule, dualrule, anticycling=anticycling,
+                                                         statistics=scenario_statistics)
+            changes = scenario.get('c', dict())
+            if scenario_result == LPResult.OPTIMAL and len(changes) > 0:
+                d_scenario.change_objective(list(changes), [scenario_delta(value, c[index], d.dtype)
+                                                            for index, value in changes.items()])
+                scenario_result, d_scenario = reoptimize(d_scenario, eps, pivotrule, dualrule, anticycling=anticycling,
+                                                         statistics=scenario_statistics)
+        else:
+            scenario_c, scenario_b = np.array(c, dtype=object), np.array(b, dtype=object)
+            for values, changes in [(scenario_c, scenario.get('c', dict())), (scenario_b, scenario.get('b', dict()))]:
+                for index, value in changes.items():
+                    values[index] = value
+            scenario_result, d_scenario = lp_solve(scenario_c, a, scenario_b, dtype, eps, pivotrule,
+                                                   anticycling=anticycling, statistics=scenario_statistics,
+                                                   backend=backend, dualrule=dualrule)
+        statistics['scenario_pivots'].append(scenario_statistics['pivots'])
+        if scenario_result == LPResult.OPTIMAL:
+            solutions.append((scenario_result, d_scenario.value(), d_scenario.basic_solution()))
+        else:
+            solutions.append((scenario_result, None, None))
+    return solutions
+
+
+# The change from the value 'old' to the value 'new' of a scenario (see 'solve_scenarios'), exactly as a Fraction
+# unless the dtype is floating point
+def scenario_delta(new, old, dtype):
+    if dtype in [int, Fraction, RationalRows]:
+        return Fraction(np.asarray(new).item()) - Fraction(np.asarray(old).item())
+    return new - old
+
+
+# Random 63-bit keys of the variables, such that the hash of a basis is the exclusive or of the keys of the basic
+# variables (Zobrist hashing). The hash is independent of the order of the basic variables, and a pivot updates it
+# with the keys of the entering and the leaving variable only.
+def basis_hash_keys(d):
+    variables = d.B.shape[0] + d.N.shape[0] + 2
+    return [int(key) for key in np.random.default_rng(0).integers(0, 2 ** 63, variables, dtype=np.int64)]
+
+
+# The perturbation of the constraint constants when the lexicographic anti-cycle mode starts: the identity matrix
+# (multiplied by the last pivot coefficient for integer pivoting, like the constraint constants). For 'RationalRows' the
+# perturbation is not divided into rows with denominators but holds Fractions.
+def initial_perturbation(d):
+    m = d.B.shape[0]
+    if d.dtype == int:
+        perturbation = np.zeros((m, m), dtype=object)
+        np.fill_diagonal(perturbation, d.lastpivot)
+    elif d.dtype in [Fraction, RationalRows]:
+        perturbation = np.full((m, m), Fraction(0), dtype=object)
+        np.fill_diagonal(perturbation, Fraction(1))
+    else:
+        perturbation = np.identity(m, dtype=d.dtype)
+    return perturbation
+
+
+# Pivots the perturbation like the constraint constants for N[entering] entering and B[leaving] leaving.
+# Has to be called before the dictionary is pivoted. See 'Dictionary.float_fraction_pivot' and
+# 'Dictionary.integer_pivot' for the formulas. For 'RationalRows' the column is divided by the denominators of its rows
+# first, and the perturbation is pivoted as for Fraction.
+def pivot_perturbation(d, perturbation, entering, leaving):
+    column = d.C[1:, entering + 1]
+    a = column[leaving]
+    if d.dtype == int:
+        a = int(a)
+        sign = 1 if a > 0 else -1
+        column = np.array([sign * int(value) for value in column], dtype=object)
+        column[leaving] = 0
+        pivot_row = perturbation[leaving, :].copy()
+        perturbation = (abs(a) * perturbation - np.multiply.outer(column, pivot_row)) // d.lastpivot
+        perturbation[leaving, :] = pivot_row * -sign
+        return perturbation
+    if d.dtype == RationalRows:
+        column = np.array([Fraction(int(value), int(denominator)) for value, denominator in
+                           zip(column, d.denominators[1:])], dtype=object)
+        a = column[leaving]
+    pivot_row = perturbation[leaving, :] / -a
+    column = column.copy()
+    column[leaving] = 0
+    perturbation = perturbation + np.multiply.outer(column, pivot_row)
+    perturbation[leaving, :] = pivot_row
+    return perturbation
+
+
 def position_of_auxiliary_variable_in_basis(d: dictionary.Dictionary):
     # The auxiliary variable-name is at varname[n+1] (n+1 = cols-1 in C). Thus we look for this entry in the basis.
     rows, cols = d.C.shape
-    for leaving, entry in enumerate(d.B):
-        if entry == cols - 1:
-            return True, leaving
-    return False, None
+    positions = np.flatnonzero(d.B == cols - 1)
+    if positions.size == 0:
+        return False, None
+    return True, int(positions[0])
 
 
 def basis_index_auxiliary_variable(d: dictionary.Dictionary):
     # The auxiliary variable-name is at varname[n+1] (n+1 = cols-1 in C). Thus we look for this entry in the basis.
     rows, cols = d.C.shape
-    for index, entry in enumerate(d.N):
-        if entry == cols - 1:
-            return index
-    return None
+    positions = np.flatnonzero(d.N == cols - 1)
+    if positions.size == 0:
+        return None
+    return int(positions[0])
 
 
+# The first basic variable with the lowest negative constraint constant (0 if no constant is negative)
 def lowest_constraint_const(d):
-    cols = d.C.shape[0]
-    lowest_const = 0
-    basic_variable = 0
-    for column in range(1, cols):
-        if lowest_const > d.C[column, 0]:
-            lowest_const = d.C[column, 0]
-            basic_variable = column - 1
-    return basic_variable
+    constants = d.C[1:, 0]
+    basic_variable = int(np.argmin(constants))
+    if constants[basic_variable] < 0:
+        return basic_variable
+    return 0
 
 
 def linprog(c, a_ub=None, b_ub=None, a_eq=None, b_eq=None):
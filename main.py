@@ -2,7 +2,8 @@ from fractions import Fraction
 
 import numpy as np
 
-from experiments import experiment_execution_time
+from dictionary import RationalRows
+from experiments import experiment_execution_time, experiment_number_backends, experiment_exact_dtypes
 from lpsolve import simple_simplex, lp_solve
 from pivotrules import bland, largest_coefficient, largest_increase
 
@@ -15,24 +16,39 @@ def main():
     experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, np.float64, bland)
     experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, Fraction, bland)
     experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, int, bland)
+    experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, RationalRows, bland)
     experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, np.float64, largest_coefficient)
     experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, Fraction, largest_coefficient)
     experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, int, largest_coefficient)
+    experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, RationalRows, largest_coefficient)
     experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, np.float64, largest_increase)
     experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, Fraction, largest_increase)
     experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, int, largest_increase)
+    experiment_execution_time(seed_for_random, random_lp_choice, simple_simplex, iterations, RationalRows, largest_increase)
 
     random_lp_choice = "including negative b-values"
     print(random_lp_choice)
     experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, np.float64, bland)
     experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, Fraction, bland)
     experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, int, bland)
+    experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, RationalRows, bland)
     experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, np.float64, largest_coefficient)
     experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, Fraction, largest_coefficient)
     experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, int, largest_coefficient)
+    experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, RationalRows, largest_coefficient)
     experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, np.float64, largest_increase)
     experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, Fraction, largest_increase)
     experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, int, largest_increase)
+    experiment_execution_time(seed_for_random, random_lp_choice, lp_solve, iterations, RationalRows, largest_increase)
+
+    print("exact dtypes")
+    experiment_exact_dtypes(seed_for_random, 10, 20, 8, bland)
+    experiment_exact_dtypes(seed_for_random, 10, 20, 8, largest_coefficient)
+    experiment_exact_dtypes(seed_for_random, 10, 1, 40, largest_coefficient)
+
+    print("number backends")
+    experiment_number_backends(seed_for_random, iterations, 50, Fraction, largest_coefficient)
+    experiment_number_backends(seed_for_random, iterations, 50, int, largest_coefficient)
 
     print("Done maaaain!")
 
@@ -0,0 +1,213 @@
+import heapq
+import math
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from fractions import Fraction
+from itertools import count
+
+import numpy as np
+
+from dictionary import RationalRows
+from lpresult import LPResult
+from lpsolve import lp_solve, dual_simplex
+from pivotrules import bland, dual_largest_infeasibility
+from sparsedictionary import SparseDictionary
+
+# A value of an integer variable is integral if it is within INTEGRALITY_TOLERANCE of an integer (floating point dtypes)
+INTEGRALITY_TOLERANCE = 1e-6
+
+# Number of nodes between the entries of statistics['progress'] of 'milp_solve'
+PROGRESS_NODES = 100
+
+# The value of the best solution found, shared with the worker processes of 'milp_solve' (see 'set_shared_cutoff')
+shared_cutoff = None
+
+
+# Branch-and-bound for the mixed integer LP in standard form given by c,A,b (maximize c x subject to A x <= b and
+# x >= 0), where the variables with a non-zero entry of 'integrality' (all variables if integrality is None) must be
+# integers.
+#
+# The LP relaxation is solved with 'lp_solve'. A node which is not integral is branched on the integer variable x_j
+# whose value v is the most fractional, into the nodes with x_j <= floor(v) and -x_j <= -ceil(v). A child node starts
+# from a copy of the optimal dictionary of its parent with the bound added as a constraint (see
+# 'Dictionary.add_constraint'): the dictionary stays dual feasible and only the new row is infeasible, so the child is
+# re-optimized with a few pivots of 'dual_simplex' instead of being solved from scratch.
+#
+# The nodes are kept in a heap by the OF value of their parent, which is an upper bound of their value, and the node
+# with the best bound is evaluated first (best-bound search). A node whose bound is at most the value of the best
+# integral solution found (the incumbent) is pruned without being evaluated, and the incumbent is the cutoff of the
+# dual simplex method of a node, which stops as soon as the node cannot improve on it.
+#
+# If processes > 1 up to 'processes' nodes are evaluated at once on a ProcessPoolExecutor. The incumbent is shared
+# with the workers as a float rounded down (see 'set_shared_cutoff'), so a node which is evaluated after a better
+# solution has been found by another node is cut off with the newest incumbent. The dual rule is sent to the workers,
+# so it must be picklable (a function of a module and not a lambda). The results are the same as with processes=1,
+# except that another optimal solution may be found.
+#
+# The return value is
+#   LPResult.OPTIMAL, value, x: the optimal OF value and solution
+#   LPResult.INFEASIBLE, None, None: the LP relaxation is infeasible or there is no integral solution
+#   LPResult.UNBOUNDED, None, None: the LP relaxation is unbounded (the mixed integer LP is unbounded or infeasible)
+#
+# 1) Solve the LP relaxation
+#       Not optimal: return the result
+# 2) Push the root node, which is evaluated by its optimal dictionary
+# 3) While there are nodes in the heap or being evaluated
+#       a) Pop nodes from the heap (pruning the nodes with a bound at most the incumbent) and submit them, until
+#          'processes' nodes are being evaluated
+#       b) Wait for an evaluated node
+#           Cut off, infeasible or not better than the incumbent: prune the node
+#           Integral: Update the incumbent and the shared cutoff
+#           Otherwise: push the two child nodes with the value of the node as bound
+# 4) Check if there is an incumbent
+#       True: return LPResult.OPTIMAL, the incumbent value and solution
+#       False: return LPResult.INFEASIBLE, None, None
+#
+# The other arguments are as for 'lp_solve', and 'dualrule' is used for the nodes. If statistics is a dict the
+# statistics of the LP relaxation are statistics['root_statistics'], and it reports
+#   'nodes': the number of evaluated nodes, 'pruned': the number of pruned nodes
+#   'node_pivots': the number of pivots of the nodes
+#   'seconds', 'nodes_per_second' and 'gap': the time, the node throughput and the final gap
+#   'progress': a list of dicts with 'seconds', 'nodes', 'nodes_per_second', 'incumbent', 'bound' and 'gap', added
+#               when the incumbent improves and every PROGRESS_NODES nodes (see 'progress'), and printed if verbose
+def milp_solve(c, a, b, integrality=None, dtype=Fraction, eps=0, pivotrule=lambda d, eps: bland(d, eps=0),
+               dualrule=dual_largest_infeasibility, processes=1, verbose=False, anticycling='bland', statistics=None,
+               backend='python'):
+    if statistics is None:
+        statistics = dict()
+    statistics.update(root_statistics=dict(), nodes=0, pruned=0, node_pivots=0, progress=[])
+    start = time.perf_counter()
+    result, d = lp_solve(c, a, b, dtype, eps, pivotrule, anticycling=anticycling,
+                         statistics=statistics['root_statistics'], backend=backend, dualrule=dualrule)
+    if result != LPResult.OPTIMAL:
+        return result, None, None
+    if isinstance(d, SparseDictionary):
+        d = d.to_dictionary()
+    n = d.variables[0]
+    integer = np.ones(n, dtype=bool) if integrality is None else np.asarray(integrality) != 0
+    exact = d.dtype in [int, Fraction, RationalRows]
+    order = count()
+    heap = [(-d.value(), next(order), (d, None, None, None))]
+    running = dict()
+    incumbent, solution = None, None
+    cutoff_value = multiprocessing.Value('d', -math.inf) if processes > 1 else None
+    executor = ProcessPoolExecutor(processes, initializer=set_shared_cutoff, initargs=(cutoff_value,)) \
+        if processes > 1 else SerialExecutor()
+    with executor:
+        while len(heap) > 0 or len(running) > 0:
+            while len(heap) > 0 and len(running) < processes:
+                negated_bound, _, node = heapq.heappop(heap)
+                if incumbent is not None and -negated_bound <= incumbent:
+                    statistics['pruned'] += 1
+                    continue
+                future = executor.submit(evaluate_node, *node, integer, exact, eps, dualrule, incumbent)
+                running[future] = -negated_bound
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                del running[future]
+                result, d, value, x, variable, pivots = future.result()
+                statistics['nodes'] += 1
+                statistics['node_pivots'] += pivots
+                if result != LPResult.OPTIMAL or (incumbent is not None and value <= incumbent):
+                    statistics['pruned'] += 1
+                elif variable is None:
+                    incumbent, solution = value, x
+                    if cutoff_value is not None:
+                        cutoff_value.value = math.nextafter(float(incumbent), -math.inf)
+                    progress(statistics, start, incumbent, heap, running, verbose)
+                else:
+                    for sign, bound in [(1, math.floor(x[variable])), (-1, -math.ceil(x[variable]))]:
+                        heapq.heappush(heap, (-value, next(order), (d, variable, sign, bound)))
+                if statistics['nodes'] % PROGRESS_NODES == 0:
+                    progress(statistics, start, incumbent, heap, running, verbose)
+    progress(statistics, start, incumbent, heap, running, verbose)
+    statistics['seconds'] = time.perf_counter() - start
+    statistics['nodes_per_second'] = statistics['nodes'] / statistics['seconds'] if statistics['seconds'] > 0 else 0
+    statistics['gap'] = statistics['progress'][-1]['gap']
+    if incumbent is None:
+        return LPResult.INFEASIBLE, None, None
+    return LPResult.OPTIMAL, incumbent, solution
+
+
+# Evaluates the node of 'milp_solve' given by the optimal dictionary D of its parent and the bound sign*x_j <= bound
+# of the variable x_j (the root node is evaluated by its own optimal dictionary if variable is None):
+# 1) Add the bound as a constraint to a copy of D (see 'Dictionary.add_constraint')
+# 2) Re-optimize with 'dual_simplex', with the incumbent (or the shared cutoff if it is better) as cutoff
+# 3) Find the integer variable to branch on (see 'branching_variable')
+# Returns the LPResult, the dictionary (None unless it is branched on), the OF value and solution, the variable to
+# branch on (None if the solution is integral) and the number of pivots.
+def evaluate_node(d, variable, sign, bound, integer, exact, eps, dualrule, cutoff):
+    statistics = dict(pivots=0)
+    if variable is not None:
+        if shared_cutoff is not None and shared_cutoff.value > -math.inf and \
+                (cutoff is None or shared_cutoff.value > cutoff):
+            cutoff = shared_cutoff.value
+        d = d.copy()
+        row = np.zeros(d.variables[0], dtype=int)
+        row[variable] = sign
+        d.add_constraint(row, bound)
+        result, d = dual_simplex(d, eps, dualrule, statistics=statistics, cutoff=cutoff)
+        if result != LPResult.OPTIMAL:
+            return result, None, None, None, None, statistics['pivots']
+    x = d.basic_solution()
+    variable = branching_variable(x, integer, exact)
+    return LPResult.OPTIMAL, d if variable is not None else None, d.value(), x, variable, statistics['pivots']
+
+
+# The index of the integer variable whose value in the solution x is the most fractional (the farthest from an
+# integer), or None if the values of the integer variables are integral (within INTEGRALITY_TOLERANCE unless exact)
+def branching_variable(x, integer, exact):
+    candidates = np.flatnonzero(integer)
+    if len(candidates) == 0:
+        return None
+    fractional = np.array([value - math.floor(value) for value in x[candidates]], dtype=x.dtype)
+    distances = np.minimum(fractional, 1 - fractional)
+    best = np.argmax(distances)
+    if distances[best] <= (0 if exact else INTEGRALITY_TOLERANCE):
+        return None
+    return int(candidates[best])
+
+
+# Adds an entry with the time, the node throughput, the incumbent, the bound (the best bound of the nodes in the heap
+# and the nodes being evaluated) and the gap to statistics['progress'] of 'milp_solve', and prints it if verbose
+def progress(statistics, start, incumbent, heap, running, verbose):
+    seconds = time.perf_counter() - start
+    bounds = [-heap[0][0]] if len(heap) > 0 else []
+    bounds += list(running.values())
+    bound = max(bounds) if len(bounds) > 0 else incumbent
+    entry = dict(seconds=seconds, nodes=statistics['nodes'],
+                 nodes_per_second=statistics['nodes'] / seconds if seconds > 0 else 0,
+                 incumbent=incumbent, bound=bound, gap=gap(incumbent, bound))
+    statistics['progress'].append(entry)
+    if verbose:
+        print(f"{entry['nodes']} nodes, {entry['nodes_per_second']:.1f} nodes/s, incumbent {entry['incumbent']}, "
+              f"bound {entry['bound']}, gap {entry['gap']:.2%}")
+
+
+# The relative gap between the incumbent and the bound of 'milp_solve', (bound - incumbent) / max(|incumbent|, 1) as a
+# float (math.inf if there is no incumbent)
+def gap(incumbent, bound):
+    if incumbent is None or bound is None:
+        return math.inf
+    return float(bound - incumbent) / max(abs(float(incumbent)), 1)
+
+
+# Initializer of the worker processes of 'milp_solve', which sets the shared multiprocessing.Value of the cutoff
+def set_shared_cutoff(value):
+    global shared_cutoff
+    shared_cutoff = value
+
+
+# Executor of 'milp_solve' with processes=1, which evaluates a submitted node at once in the calling process
+class SerialExecutor:
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
@@ -0,0 +1,226 @@
+import math
+from fractions import Fraction
+
+import numpy as np
+import scipy.sparse
+
+from dictionary import Dictionary, convert_array
+from lpresult import LPResult
+from lpsolve import lp_solve, simplex, original_basis, FLOAT_FIRST_EPS
+from pivotrules import bland, PIVOT_TOLERANCE
+
+# The primes of the modular pivots are the largest primes below 2^MODULAR_PRIME_BITS, so the product of two residues
+# fits in np.int64.
+MODULAR_PRIME_BITS = 31
+
+# Number of primes which are pivoted together as one np.int64 array
+PRIMES_PER_BATCH = 8
+
+# Number of primes after which 'modular_lp_solve' gives up and solves the LP with integer pivoting
+MAX_PRIMES = 1000
+
+
+# Multi-modular simplex algorithm
+#
+# Solves the LP in standard form given by vectors and matrices c,A,b like 'lp_solve' with dtype int, but the exact
+# dictionary is computed modulo word-size primes instead of with big integers.
+#
+# A pilot run with 'pilot_dtype' (np.float64 with eps FLOAT_FIRST_EPS, or an exact dtype) finds the optimal basis, and
+# 'pivot_sequence' finds pivots from the initial dictionary to that basis. The pivots are replayed modulo batches of
+# primes with np.int64 arithmetic (see 'modular_dictionaries'). The result is the integer dictionary of integer
+# pivoting, i.e. the dictionary multiplied by the determinant of its basis matrix, which is a matrix of integers that
+# is reconstructed (together with the determinant) from its residues by the Chinese remainder theorem. As the
+# determinant is the common denominator of all entries no rational reconstruction is needed.
+#
+# Primes are added until the reconstruction is stable, i.e. it already agrees with the residues of the next prime.
+# Then the constants and the OF of the reconstructed dictionary are verified exactly (see 'consistent_dictionary'),
+# and if they are wrong more primes are added.
+#
+# If statistics is a dict statistics['primes'] is the number of primes used for the reconstruction,
+# statistics['unlucky_primes'] the number of primes where a pivot coefficient is 0, statistics['basis_pivots'] the
+# number of replayed pivots, statistics['certified'] is True if the reconstructed dictionary is optimal and
+# statistics['pilot_statistics'] are the statistics of the pilot run.
+#
+# 1) Solve the LP with pilot_dtype
+# 2) Check if the LP is not optimal
+#       True: return lp_solve(...) with integer pivoting
+# 3) Map the basis to the variables of the LP without the auxiliary variable, and find the pivots to the basis
+#       False if the basis is singular: return lp_solve(...) with integer pivoting
+# 4) For each prime (in batches of PRIMES_PER_BATCH primes)
+#       a) Skip the prime if a pivot coefficient is 0 modulo the prime
+#       b) Check if the reconstruction agrees with the residues of the prime and the dictionary is consistent
+#           True: Check if the dictionary is optimal
+#                   True: return LPResult.OPTIMAL, d
+#                 Check if the dictionary is primal feasible
+#                   True: return simplex(...) from the dictionary
+#                 return lp_solve(...) with integer pivoting
+#       c) Add the residues of the prime to the reconstruction
+# 5) return lp_solve(...) with integer pivoting (MAX_PRIMES primes were not enough)
+def modular_lp_solve(c, a, b, eps=0, pivotrule=lambda d, eps: bland(d, eps=0), anticycling='bland', statistics=None,
+                     pilot_dtype=np.float64):
+    if statistics is None:
+        statistics = dict()
+    statistics['primes'] = 0
+    statistics['unlucky_primes'] = 0
+    statistics['basis_pivots'] = 0
+    statistics['certified'] = False
+    statistics['pilot_statistics'] = dict()
+    if scipy.sparse.issparse(a):
+        a = a.toarray()
+    pilot_eps = max(eps, FLOAT_FIRST_EPS) if pilot_dtype == np.float64 else eps
+    result, d_pilot = lp_solve(c, a, b, pilot_dtype, pilot_eps, pivotrule, anticycling=anticycling,
+                               statistics=statistics['pilot_statistics'])
+    if result != LPResult.OPTIMAL:
+        return lp_solve(c, a, b, int, eps, pivotrule, anticycling=anticycling, statistics=statistics)
+    basis = original_basis(d_pilot)
+    tolerance = PIVOT_TOLERANCE if pilot_dtype == np.float64 else 0
+    pivots = pivot_sequence(Dictionary(c, a, b, pilot_dtype), basis, tolerance)
+    if pivots is None:
+        return lp_solve(c, a, b, int, eps, pivotrule, anticycling=anticycling, statistics=statistics)
+    statistics['basis_pivots'] = len(pivots)
+    d = Dictionary(c, a, b, int)
+    for entering, leaving in pivots:
+        d.N[entering], d.B[leaving] = d.B[leaving], d.N[entering]
+    values = np.zeros(d.C.size + 1, dtype=object)
+    modulus = 1
+    primes = word_primes()
+    while statistics['primes'] + statistics['unlucky_primes'] < MAX_PRIMES:
+        batch = [next(primes) for _ in range(PRIMES_PER_BATCH)]
+        residues, determinants, lucky = modular_dictionaries(d.C, pivots, batch)
+        for p, prime_residues, determinant, prime_lucky in zip(batch, residues, determinants, lucky):
+            if not prime_lucky:
+                statistics['unlucky_primes'] += 1
+                continue
+            prime_residues = np.append(prime_residues.ravel(), determinant)
+            if modulus > 1 and (np.array(values % p, dtype=np.int64) == prime_residues).all():
+                reconstructed = reconstructed_dictionary(d, values)
+                if consistent_dictionary(c, a, b, reconstructed):
+                    primal_feasible = bool((reconstructed.C[1:, 0] >= 0).all())
+                    if primal_feasible and (reconstructed.C[0, 1:] <= 0).all():
+                        statistics['certified'] = True
+                        return LPResult.OPTIMAL, reconstructed
+                    if primal_feasible:
+                        return simplex(reconstructed, eps, pivotrule, anticycling=anticycling, statistics=statistics)
+                    return lp_solve(c, a, b, int, eps, pivotrule, anticycling=anticycling, statistics=statistics)
+            values, modulus = chinese_remainder(values, modulus, prime_residues, p)
+            statistics['primes'] += 1
+    return lp_solve(c, a, b, int, eps, pivotrule, anticycling=anticycling, statistics=statistics)
+
+
+# The primes below 2^MODULAR_PRIME_BITS in decreasing order. The candidates are tested by trial division with the
+# primes up to the square root of 2^MODULAR_PRIME_BITS, which are found with the sieve of Eratosthenes.
+def word_primes():
+    limit = math.isqrt(2 ** MODULAR_PRIME_BITS) + 1
+    sieve = np.ones(limit + 1, dtype=bool)
+    sieve[:2] = False
+    for i in range(2, math.isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = False
+    small_primes = np.flatnonzero(sieve)
+    candidate = 2 ** MODULAR_PRIME_BITS - 1
+    while candidate > limit:
+        if (candidate % small_primes != 0).all():
+            yield candidate
+        candidate -= 2
+
+
+# The pivots (entering, leaving) which pivot the dictionary 'd' to the basis 'basis' (see 'pivot_to_basis').
+# Each variable of the basis which is non-basic enters, and among the basic variables which are not in the basis the
+# one with the largest absolute coefficient in the column of the entering variable leaves. Coefficients of at most
+# tolerance times the largest absolute coefficient of the column are treated as 0.
+# Returns None if the basis is singular.
+def pivot_sequence(d, basis, tolerance=0):
+    pivots = []
+    for variable in basis:
+        if variable in d.B:
+            continue
+        entering = int(np.flatnonzero(d.N == variable)[0])
+        column = np.abs(d.C[1:, entering + 1])
+        sizes = np.where(np.isin(d.B, basis), 0, column)
+        leaving = int(np.argmax(sizes))
+        if not sizes[leaving] > tolerance * column.max():
+            return None
+        pivots.append((entering, leaving))
+        d.pivot(entering, leaving)
+    return pivots
+
+
+# Residues of the integer dictionary after the pivots (the dictionary multiplied by the determinant of its basis
+# matrix, see 'Dictionary.integer_pivot') modulo each of the primes, for the integer dictionary 'C' before the pivots.
+# The residues of all primes are pivoted together in one np.int64 array with a layer for each prime. Each pivot is
+# the pivot of 'Dictionary.float_fraction_pivot' where the division by the pivot coefficient is the multiplication with
+# its inverse modulo the prime, and the determinant is the product of the negative pivot coefficients. The residues
+# are less than 2^MODULAR_PRIME_BITS so every product of two residues fits in np.int64.
+# Returns the residues of the dictionaries and of the determinants, and whether all pivot coefficients were non-zero
+# modulo each prime (the residues of the other primes are not used).
+def modular_dictionaries(C, pivots, primes):
+    moduli = np.array(primes, dtype=np.int64)
+    layers = moduli[:, np.newaxis, np.newaxis]
+    residues = np.stack([np.array(C % p, dtype=np.int64) for p in primes])
+    determinants = np.ones(len(primes), dtype=np.int64)
+    lucky = np.ones(len(primes), dtype=bool)
+    for entering, leaving in pivots:
+        a = residues[:, leaving + 1, entering + 1].copy()
+        lucky &= a != 0
+        inverses = np.array([pow(int(value), -1, p) if value != 0 else 0 for value, p in zip(a, primes)],
+                            dtype=np.int64)
+        column = residues[:, :, entering + 1].copy()
+        column[:, leaving + 1] = 0
+        residues[:, leaving + 1, :] = residues[:, leaving + 1, :] * (moduli - inverses)[:, np.newaxis] \
+            % moduli[:, np.newaxis]
+        residues[:, leaving + 1, entering + 1] = inverses
+        residues += column[:, :, np.newaxis] * residues[:, np.newaxis, leaving + 1, :] % layers
+        residues %= layers
+        residues[:, :, entering + 1] = column * inverses[:, np.newaxis] % moduli[:, np.newaxis]
+        residues[:, leaving + 1, entering + 1] = inverses
+        determinants = determinants * (moduli - a) % moduli
+    return residues * determinants[:, np.newaxis, np.newaxis] % layers, determinants, lucky
+
+
+# Adds the residues modulo the prime p to the values modulo 'modulus' by the Chinese remainder theorem (Garner's
+# step). The values are an object array of Python ints in the symmetric range (-modulus/2, modulus/2].
+# Returns the values modulo modulus*p in the symmetric range and modulus*p.
+def chinese_remainder(values, modulus, residues, p):
+    differences = (residues - np.array(values % p, dtype=np.int64)) % p
+    steps = differences * pow(modulus % p, -1, p) % p
+    values = values + modulus * steps.astype(object)
+    modulus *= p
+    values = np.where(values > modulus // 2, values - modulus, values)
+    return values, modulus
+
+
+# The integer dictionary with the basis of 'd' whose entries, followed by the determinant of its basis matrix, are
+# 'values'. The signs are changed if the determinant is negative, as the last pivot coefficient is positive.
+def reconstructed_dictionary(d, values):
+    reconstructed = Dictionary.__new__(Dictionary)
+    reconstructed.__dict__.update(d.__dict__)
+    sign = 1 if values[-1] > 0 else -1
+    reconstructed.C = (values[:-1] * sign).reshape(d.C.shape)
+    reconstructed.lastpivot = int(values[-1] * sign)
+    reconstructed.N = d.N.copy()
+    reconstructed.B = d.B.copy()
+    return reconstructed
+
+
+# Checks exactly that the constants and the OF of the integer dictionary 'd' are those of the LP c,A,b with the basis
+# of 'd', which holds if
+# 1) The basic solution x and the values s of the slack variables satisfy A x + s = b
+# 2) With y the negative coefficients of the slack variables in the OF (0 for the basic slack variables), the value
+#    of the basic solution is y b, and the coefficient of each original variable j is c_j - y A_j (0 for the basic
+#    variables)
+def consistent_dictionary(c, a, b, d):
+    m, n = a.shape
+    values = np.full(n + m + 1, Fraction(0), dtype=object)
+    values[d.B] = [Fraction(int(value), d.lastpivot) for value in d.C[1:, 0]]
+    coefficients = np.full(n + m + 1, Fraction(0), dtype=object)
+    coefficients[d.N] = [Fraction(int(value), d.lastpivot) for value in d.C[0, 1:]]
+    exact_c = np.empty(n, dtype=object)
+    exact_a = np.empty((m, n), dtype=object)
+    exact_b = np.empty(m, dtype=object)
+    convert_array(c, Fraction, exact_c)
+    convert_array(a, Fraction, exact_a)
+    convert_array(b, Fraction, exact_b)
+    y = -coefficients[n + 1:]
+    return bool((exact_a @ values[1:n + 1] + values[n + 1:] == exact_b).all()
+                and d.value() == y @ exact_b
+                and (exact_c - y @ exact_a == coefficients[1:n + 1]).all())
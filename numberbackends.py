@@ -0,0 +1,69 @@
+from fractions import Fraction
+
+import numpy as np
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+class NumberBackend:
+    # The number types used for the entries of the exact dictionaries
+    # (see 'Dictionary'):
+    #
+    # 'integer' is the type of the entries of an integer dictionary
+    # once it is promoted from np.int64 (dtype int), and 'rational' is
+    # the type of the entries of a dtype Fraction dictionary.
+    #
+    # The results of a dictionary ('value', 'basic_solution') are
+    # always Python Fractions, whichever backend is used, so the
+    # backends give identical results.
+
+    def __init__(self, name, integer, rational):
+        self.name = name
+        self.integer = integer
+        self.rational = rational
+
+    # The element type of the entries of a dictionary with the given dtype
+    def element(self, dtype):
+        if dtype == int:
+            return self.integer
+        if dtype == Fraction:
+            return self.rational
+        return dtype
+
+    # The integer array 'values' as an object array of 'integer'
+    def integers(self, values):
+        if self.integer == int:
+            return values.astype(object)
+        return np.frompyfunc(self.integer, 1, 1)(values).astype(object)
+
+    # A rational number of the backend as a Python Fraction
+    def fraction(self, value):
+        if self.rational == Fraction:
+            return value
+        return Fraction(int(value.numerator), int(value.denominator))
+
+    def __repr__(self):
+        return self.name
+
+
+# The Python int and Fraction types
+PYTHON = NumberBackend('python', int, Fraction)
+
+# GMP integers and rationals of gmpy2 (None if gmpy2 is not installed), which are much faster than the Python types
+# for numbers with hundreds of digits
+GMPY2 = NumberBackend('gmpy2', gmpy2.mpz, gmpy2.mpq) if gmpy2 is not None else None
+
+
+# The backend with the given name, 'python' or 'gmpy2' (a NumberBackend is returned as it is).
+# Falls back to the Python types if gmpy2 is not installed.
+def number_backend(backend='python'):
+    if isinstance(backend, NumberBackend):
+        return backend
+    if backend == 'gmpy2':
+        return GMPY2 if GMPY2 is not None else PYTHON
+    if backend == 'python':
+        return PYTHON
+    raise ValueError(f"Unknown number backend: {backend}")
@@ -1,7 +1,14 @@
 import math
+from fractions import Fraction
 
 import numpy as np
 
+from dictionary import RationalRows
+
+# Default relative tolerances of Harris' ratio test (see 'harris_ratio_test')
+FEASIBILITY_TOLERANCE = 1e-9
+PIVOT_TOLERANCE = 1e-7
+
 
 # Assumes a feasible dictionary D and finds entering and leaving
 # variables according to Bland's rule.
@@ -15,34 +22,63 @@ import numpy as np
 # leaving is None if D is Unbounded
 # Otherwise D.B[leaving] is a leaving variable
 #
+# ratio_test is 'textbook' or 'harris' (see 'leaving_variable')
+#
 # Pick the leftmost variable in the objective function, for which the coefficient is positive, as entering variable
 # Pick the variable from the basis for which the corresponding constraint limits the growth of the entering variable
 # the most as leaving variable
 #
-# 1) Initialize entering and leaving to None
-# 2) Iterate over the objective function variable coefficients
-#   a) Check if eps-corrected coefficient is non-positive
-#       True: continue with next iteration
-#   b) Set entering to the current variable
-# 3) Check if entering is None
+# 1) Get the eps-corrected objective function variable coefficients as an array
+# 2) Check if none of the coefficients are positive
 #       True: return None, None
+# 3) Set entering to the first variable with a positive coefficient
 # 4) Pick leaving variable for which the corresponding constraint limits the growth of the entering variable the most.
 #    (Use helper function)
 # 5) return entering and leaving
-def bland(d, eps, verbose=False):
-    entering = None
-    for col in range(1, d.C.shape[1]):
-        value = eps_correction(d.C[0, col], eps, d.dtype)
-        if value <= 0:
-            continue
-        entering = col - 1
-        break
-    if entering is None:
+def bland(d, eps, verbose=False, ratio_test='textbook'):
+    improving = eps_correction_array(d.C[0, 1:], eps, d.dtype) > 0
+    if not improving.any():
         return None, None
-    leaving, _ = leaving_variable(d, eps, entering)
+    entering = int(np.argmax(improving))
+    leaving, _ = leaving_variable(d, eps, entering, ratio_test=ratio_test)
     return entering, leaving
 
 
+# Assumes a feasible dictionary D and finds entering and leaving
+# variables according to Bland's smallest subscript rule, which never
+# cycles.
+#
+# eps>=0 is such that numbers in the closed interval [-eps,eps]
+# are to be treated as if they were 0
+#
+# Returns entering and leaving as 'bland'
+#
+# Unlike 'bland', which picks the first position in N and the first row, the variables are compared by their indices
+# (the subscripts), which is what prevents cycling. It is the rule of the 'bland' anti-cycle mode of 'simplex'.
+#
+# 1) Get the eps-corrected objective function variable coefficients as an array
+# 2) Check if none of the coefficients are positive
+#       True: return None, None
+# 3) Set entering to the variable with the lowest index among the variables with a positive coefficient
+# 4) Find the least ratio of the constraints which limit the growth of the entering variable (Use helper function)
+# 5) Set leaving to the basic variable with the lowest index among the constraints with the least ratio
+# 6) return entering and leaving
+def smallest_subscript(d, eps, verbose=False):
+    improving = eps_correction_array(d.C[0, 1:], eps, d.dtype) > 0
+    if not improving.any():
+        return None, None
+    candidates = np.flatnonzero(improving)
+    entering = int(candidates[np.argmin(d.N[candidates])])
+    leaving, ratio = leaving_variable(d, eps, entering)
+    if leaving is None:
+        return entering, None
+    coefficients = eps_correction_array(d.C[1:, entering + 1], eps, d.dtype)
+    candidates = np.flatnonzero(coefficients < 0)
+    constants = eps_correction_array(d.C[1:, 0][candidates], eps, d.dtype)
+    tied = candidates[constants / -coefficients[candidates] == ratio]
+    return entering, int(tied[np.argmin(d.B[tied])])
+
+
 # Assumes a feasible dictionary D and find entering and leaving
 # variables according to the Largest Coefficient rule.
 #
@@ -55,31 +91,23 @@ def bland(d, eps, verbose=False):
 # leaving is None if D is Unbounded
 # Otherwise D.B[leaving] is a leaving variable
 #
+# ratio_test is 'textbook' or 'harris' (see 'leaving_variable')
+#
 # Pick entering variable with the largest coefficient in z, and
 # leaving variable from the row which limits the growth of the entering variable the most
 # (Use helper function for that last part)
 #
-# 1) Initialize entering and leaving to None and
-#    largest_until_now to 0
-# 2) For each coefficient in OF
-#   a) Get coefficient value through eps_correction
-#   b) Check if eps-corrected coefficient value is greater than largest_until_now
-#       True: Set largest_until_now to coefficient value
-#             Set entering to variable index in N of the current coefficient
-# 3) Check if entering is None
+# 1) Get the eps-corrected objective function variable coefficients as an array
+# 2) Check if none of the coefficients are positive
 #   True: return None, None
+# 3) Set entering to the first variable with the largest coefficient (argmax picks the first of tied coefficients)
 # 4) return entering, leaving variable which limits the growth of the entering variable the most
-def largest_coefficient(d, eps, verbose=False):
-    entering = None
-    largest_until_now = 0
-    for col in range(1, d.C.shape[1]):
-        current_value = eps_correction(d.C[0, col], eps, d.dtype)
-        if largest_until_now < current_value:
-            largest_until_now = current_value
-            entering = col - 1
-    if entering is None:
+def largest_coefficient(d, eps, verbose=False, ratio_test='textbook'):
+    coefficients = eps_correction_array(d.C[0, 1:], eps, d.dtype)
+    if not (coefficients > 0).any():
         return None, None
-    leaving, _ = leaving_variable(d, eps, entering)
+    entering = int(np.argmax(coefficients))
+    leaving, _ = leaving_variable(d, eps, entering, ratio_test=ratio_test)
     return entering, leaving
 
 
@@ -94,79 +122,512 @@ def largest_coefficient(d, eps, verbose=False):
 # leaving is None if D is Unbounded
 # Otherwise D.B[leaving] is a leaving variable
 #
+# ratio_test is 'textbook' or 'harris' (see 'leaving_variable')
+#
 # Finds the entering and leaving variable which increases the value of the objective function the most
 #
-# 1) Initialize largest_increase_until_now = 0 and
-#    entering and leaving to be None
-# 2) For each variable coefficient in the OF
-#   a) Check if eps-corrected coefficient value is non-positive
-#       True: continue with next iteration.
-#   b) Get ratio for the current potential entering variable. (Note that ratio equals the increase of the variable)
-#   c) Check if the entering variable is unbounded (If all constraint coefficients a non-basic variable is non-negative
-#      then the dictionary is unbounded, and then the 'leaving_variable()' helper method will return None, math.inf)
-#       True: In case of unbounded we need to return Some, none, and so we set the entering variable to infinity
-#             and the leaving variable to None
-#   d) Calculate how much the OF is increased: OF_coefficient * ratio
-#   e) Check if increase is greater than largest_increase_until_now
-#       True: largest_increase_until_now = increase
-#             entering = current potential entering variable
-#             leaving = potential leaving variable
-# 3) return found results
-def largest_increase(d, eps, verbose=False):
-    entering = leaving = None
-    largest_increase_until_now = -math.inf
-    for col in range(1, d.C.shape[1]):
-        coefficient = eps_correction(d.C[0, col], eps, d.dtype)
-        if coefficient <= 0:
-            continue
-        leaving_given_col, ratio = leaving_variable(d, eps, col - 1, verbose)
-        if leaving_given_col is None:
-            entering = math.inf
-            leaving = None
-            break
-        increase = d.C[0, col] * ratio
-        if largest_increase_until_now < increase:
-            largest_increase_until_now = increase
-            entering = col - 1
-            leaving = leaving_given_col
+# The ratios of all candidate entering variables are computed at once as a matrix with a row for each constraint and
+# a column for each candidate, so the constraint constants are only read and eps-corrected once.
+#
+# 1) Find the candidate entering variables, i.e. the eps-corrected OF coefficients which are positive
+#   True if there are none: return None, None
+# 2) Get the eps-corrected constraint coefficients of the candidates as a matrix
+# 3) Calculate the ratio matrix: constraint constant / negative constraint coefficient where the coefficient is
+#    negative and infinity elsewhere (Note that ratio equals the increase of the variable)
+# 4) For each candidate pick the first constraint with the least ratio (like 'leaving_variable()'), or the constraint
+#    of Harris' ratio test if ratio_test is 'harris' (see 'harris_ratio_test')
+# 5) Check if any candidate is unbounded (If all constraint coefficients of a non-basic variable is non-negative
+#    the least ratio is infinity)
+#       True: In case of unbounded we need to return Some, none, and so we return the entering variable as infinity
+#             and the leaving variable as None
+# 6) Calculate how much the OF is increased for each candidate: OF_coefficient * ratio
+# 7) return the first candidate with the largest increase and its leaving variable
+def largest_increase(d, eps, verbose=False, ratio_test='textbook'):
+    candidates = np.flatnonzero(eps_correction_array(d.C[0, 1:], eps, d.dtype) > 0)
+    if candidates.size == 0:
+        return None, None
+    coefficients = eps_correction_array(d.C[1:, candidates + 1], eps, d.dtype)
+    constants = eps_correction_array(d.C[1:, 0], eps, d.dtype)
+    if ratio_test == 'harris':
+        rows, least, unbounded = harris_ratio_test(d, constants, coefficients, FEASIBILITY_TOLERANCE,
+                                                    PIVOT_TOLERANCE)
+        if unbounded.any():
+            return math.inf, None
+    else:
+        limiting = coefficients < 0
+        ratios = np.full(coefficients.shape, math.inf, dtype=object if coefficients.dtype == object else np.float64)
+        np.divide(constants[:, np.newaxis], -coefficients, out=ratios, where=limiting)
+        rows = np.argmin(ratios, axis=0)
+        least = ratios[rows, np.arange(candidates.size)]
+        if not (least < math.inf).all():
+            return math.inf, None
+    increases = d.C[0, candidates + 1] * least
+    best = np.argmax(increases)
+    return int(candidates[best]), int(rows[best])
+
+
+# Assumes a feasible dictionary D and finds entering and leaving
+# variables according to the Steepest Edge rule.
+#
+# eps>=0 is such that numbers in the closed interval [-eps,eps]
+# are to be treated as if they were 0
+#
+# entering is None if D is Optimal
+# Otherwise D.N[entering] is entering variable
+# leaving is None if D is Unbounded
+# Otherwise D.B[leaving] is a leaving variable
+#
+# ratio_test is 'textbook' or 'harris' (see 'leaving_variable')
+#
+# Pick the entering variable with the largest coefficient in z relative to the length of its edge, i.e. the largest
+# coefficient^2 / weight where the weight of N[j] is 1 + the sum of the squared coefficients of N[j] in the constraints.
+# The weights are kept in D.pricing_state and updated from the pivot row and column after each pivot instead of being
+# recomputed (see 'pricing_weights' and 'update_weights').
+def steepest_edge(d, eps, verbose=False, ratio_test='textbook'):
+    return weighted_pricing(d, eps, 'steepest_edge', ratio_test)
+
+
+# Assumes a feasible dictionary D and finds entering and leaving
+# variables according to the Devex rule.
+#
+# eps>=0 is such that numbers in the closed interval [-eps,eps]
+# are to be treated as if they were 0
+#
+# entering is None if D is Optimal
+# Otherwise D.N[entering] is entering variable
+# leaving is None if D is Unbounded
+# Otherwise D.B[leaving] is a leaving variable
+#
+# ratio_test is 'textbook' or 'harris' (see 'leaving_variable')
+#
+# As 'steepest_edge', but the weights are approximations of the lengths of the edges measured in a reference
+# framework: the non-basic variables when the weights were initialized (all weights are 1). The weights are updated
+# from the pivot row and column only.
+def devex(d, eps, verbose=False, ratio_test='textbook'):
+    return weighted_pricing(d, eps, 'devex', ratio_test)
+
+
+# Assumes a feasible dictionary D and finds entering and leaving
+# variables according to Partial Pricing.
+#
+# eps>=0 is such that numbers in the closed interval [-eps,eps]
+# are to be treated as if they were 0
+#
+# entering is None if D is Optimal
+# Otherwise D.N[entering] is entering variable
+# leaving is None if D is Unbounded
+# Otherwise D.B[leaving] is a leaving variable
+#
+# ratio_test is 'textbook' or 'harris' (see 'leaving_variable')
+#
+# Only part of the objective function is priced in each iteration. A list of at most candidate_list_length improving
+# variables is kept in D.pricing_state, and the entering variable is the candidate with the largest coefficient. When
+# no candidate is improving any more, the list is refilled from the next segments of segment_size variables of the
+# objective function (rotating through the objective function). Only a refill which scans the whole objective function
+# finds that D is optimal. The number of refills and of refills which scanned the whole objective function are counted
+# in D.pricing_state['partial_pricing']['refills'] and ['full_rescans'].
+#
+# 1) Keep the candidates which are still non-basic and have a positive eps-corrected coefficient
+# 2) Check if there are no candidates left
+#   True: Refill the candidate list (see 'refill_candidates')
+#         Check if there are still no candidates
+#           True: return None, None
+# 3) Set entering to the first candidate with the largest coefficient
+# 4) Pick leaving variable for which the corresponding constraint limits the growth of the entering variable the most.
+# 5) return entering and leaving
+def partial_pricing(d, eps, segment_size=1000, candidate_list_length=10, verbose=False, ratio_test='textbook'):
+    state = pricing_state(d, 'partial_pricing')
+    for key in ['refills', 'full_rescans', 'segment']:
+        state.setdefault(key, 0)
+    positions, variables = state.get('candidates', (np.empty(0, dtype=int), np.empty(0, dtype=int)))
+    in_range = positions < d.N.shape[0]
+    positions, variables = positions[in_range], variables[in_range]
+    positions = positions[d.N[positions] == variables]
+    positions = positions[eps_correction_array(d.C[0, positions + 1], eps, d.dtype) > 0]
+    if positions.size == 0:
+        positions = refill_candidates(d, eps, state, segment_size, candidate_list_length)
+        if positions.size == 0:
+            state['candidates'] = positions, d.N[positions]
+            return None, None
+    entering = int(positions[np.argmax(d.C[0, positions + 1])])
+    state['candidates'] = positions, d.N[positions]
+    leaving, _ = leaving_variable(d, eps, entering, ratio_test=ratio_test)
     return entering, leaving
 
 
+# Refills the candidate list of 'partial_pricing'
+# 1) Scan the segments of the objective function, starting after the last scanned segment, until a segment has
+#    improving variables or the whole objective function has been scanned
+# 2) Keep the (at most candidate_list_length) improving variables with the largest coefficients
+# 3) return the positions of the candidates in N
+def refill_candidates(d, eps, state, segment_size, candidate_list_length):
+    n = d.N.shape[0]
+    state['refills'] += 1
+    scanned = 0
+    improving = np.empty(0, dtype=int)
+    while improving.size == 0 and scanned < n:
+        positions = (state['segment'] + np.arange(min(segment_size, n - scanned))) % n
+        scanned += positions.size
+        state['segment'] = (state['segment'] + positions.size) % n
+        improving = positions[eps_correction_array(d.C[0, positions + 1], eps, d.dtype) > 0]
+    if scanned == n:
+        state['full_rescans'] += 1
+    order = np.argsort(-d.C[0, improving + 1], kind='stable')
+    return improving[order[:candidate_list_length]]
+
+
+# Entering and leaving variable for the pricing rule 'rule' with weights (see 'steepest_edge' and 'devex')
+# 1) Get the weights of the non-basic variables in the dictionary
+# 2) Find the candidate entering variables, i.e. the eps-corrected OF coefficients which are positive
+#   True if there are none: return None, None
+# 3) Set entering to the first candidate with the largest coefficient^2 / weight (compared as coefficient /
+#    sqrt(weight), which does not overflow for large coefficients)
+# 4) Pick leaving variable for which the corresponding constraint limits the growth of the entering variable the most
+# 5) If the dictionary is not unbounded, compute the weights after the pivot and keep them until the next call (they
+#    may overflow, see 'pricing_weights')
+# 6) return entering and leaving
+def weighted_pricing(d, eps, rule, ratio_test='textbook'):
+    state = pricing_state(d, rule)
+    weights = pricing_weights(d, state, rule)
+    candidates = np.flatnonzero(eps_correction_array(d.C[0, 1:], eps, d.dtype) > 0)
+    if candidates.size == 0:
+        return None, None
+    coefficients = float_entries(d, d.C[0, candidates + 1], 0)
+    entering = int(candidates[np.argmax(coefficients / np.sqrt(weights[candidates]))])
+    leaving, _ = leaving_variable(d, eps, entering, ratio_test=ratio_test)
+    if leaving is not None:
+        pivoted_N = d.N.copy()
+        pivoted_N[entering] = d.B[leaving]
+        with np.errstate(over='ignore', invalid='ignore'):
+            state['pending'] = pivoted_N, update_weights(d, weights, entering, leaving, rule)
+    return entering, leaving
+
+
+# The pricing state of the rule 'rule' in D.pricing_state, which is created if D does not have it
+def pricing_state(d, rule):
+    if getattr(d, 'pricing_state', None) is None:
+        d.pricing_state = dict()
+    return d.pricing_state.setdefault(rule, dict())
+
+
+# The weights of the non-basic variables of the dictionary for the rule 'rule'
+# 1) If the dictionary was pivoted as the last call of the rule expected, use the updated weights
+# 2) If the weights are not for the non-basic variables of the dictionary (it was pivoted otherwise, e.g. by an
+#    anti-cycle mode, or the auxiliary variable was removed), initialize the weights again:
+#       'steepest_edge': 1 + the sum of the squared coefficients of each column
+#       'devex': 1 for each column, which starts a new reference framework
+# 3) If a weight is not finite (the squares overflow np.float64 for large entries of exact dtypes), use 1 for each
+#    column, as for 'devex'
+def pricing_weights(d, state, rule):
+    pending = state.pop('pending', None)
+    if pending is not None and np.array_equal(pending[0], d.N):
+        state['N'], state['weights'] = pending
+    if 'N' not in state or not np.array_equal(state['N'], d.N):
+        state['N'] = d.N.copy()
+        if rule == 'steepest_edge':
+            with np.errstate(over='ignore'):
+                state['weights'] = 1 + (float_entries(d, d.C[1:, 1:]) ** 2).sum(axis=0)
+        else:
+            state['weights'] = np.ones(d.N.shape[0])
+    if not np.isfinite(state['weights']).all():
+        state['weights'] = np.ones(d.N.shape[0])
+    return state['weights']
+
+
+# The weights after pivoting N[entering] and B[leaving], computed from the pivot row and column of the dictionary.
+# With the ratios r_j = (coefficient of N[j] in the pivot row) / (pivot coefficient) a and the weight w_q of the
+# entering variable:
+#   'steepest_edge': w_j - 2 r_j (column_j . column_entering) + r_j^2 w_q, but at least 1 + r_j^2 (Goldfarb and Reid)
+#                    and w_q / a^2 for the leaving variable
+#   'devex': max(w_j, r_j^2 w_q) and max(w_q / a^2, 1) for the leaving variable (Forrest and Goldfarb)
+def update_weights(d, weights, entering, leaving, rule):
+    column = float_entries(d, d.C[1:, entering + 1])
+    row = float_entries(d, d.C[leaving + 1, 1:], leaving + 1)
+    a = column[leaving]
+    ratios = row / a
+    if rule == 'steepest_edge':
+        products = column @ float_entries(d, d.C[1:, 1:])
+        updated = np.maximum(weights - 2 * ratios * products + ratios ** 2 * weights[entering], 1 + ratios ** 2)
+        updated[entering] = max(weights[entering] / a ** 2, 1 + 1 / a ** 2)
+    else:
+        updated = np.maximum(weights, ratios ** 2 * weights[entering])
+        updated[entering] = max(weights[entering] / a ** 2, 1)
+    return updated
+
+
+# Entries of the rows 'rows' of the dictionary (the constraints by default) as np.float64, divided by the last pivot
+# coefficient for integer pivoting and by the denominators of the rows for 'RationalRows'. Python ints and Fractions
+# are divided exactly before they are rounded (see 'float_quotient'), so entries and denominators beyond the range of
+# np.float64 are converted as well.
+def float_entries(d, values, rows=slice(1, None)):
+    values = np.asarray(values)
+    if d.dtype == int:
+        denominators = np.asarray(d.lastpivot)
+    elif d.dtype == RationalRows:
+        denominators = np.asarray(d.denominators[rows])
+        if values.ndim == 2:
+            denominators = denominators[:, np.newaxis]
+    elif values.dtype != object:
+        return values.astype(np.float64)
+    else:
+        denominators = np.asarray(1)
+    if values.dtype != object and denominators.dtype != object:
+        return values.astype(np.float64) / denominators
+    return np.frompyfunc(float_quotient, 2, 1)(values, denominators).astype(np.float64)
+
+
+# numerator / denominator as a float, rounded from the exact quotient (Python ints and Fractions of any size), and
+# -math.inf or math.inf if it is beyond the range of np.float64
+def float_quotient(numerator, denominator):
+    try:
+        return float(numerator / denominator)
+    except OverflowError:
+        return math.inf if (numerator > 0) == (denominator > 0) else -math.inf
+
+
 # Pick leaving variable which limits the growth of the entering variable the most.
-# 1) Initialize the variable least_until_now to be infinite and the leaving variable to be None
-# 2) for each constraint:
-#   a) Check if constraint coefficient of entering variable is non-negative
-#      (Note: For a tableau or algebraic notation the coefficient would have to be positive instead)
-#       True: go to next iteration
-#   b) Calculate: ratio = constraint constant / negative constraint coefficient of entering variable
-#   c) Check if ratio is less than least until now
-#       True: set leas_until_now = ratio
-#             Save leaving variable
-# 3) Check if leaving is None (Implies that all constrain coefficients are positive; thus the problem is unbounded)
-#       True: adjust least_until_now to -math.inf to represent unbounded
-# 4) return leaving variable, along with least(ratio)-until-now:
-def leaving_variable(d, eps, entering, verbose=False):
-    leaving = None
-    least_until_now = math.inf
-    for row in range(1, d.C.shape[0]):
-        coefficient = eps_correction(d.C[row, entering + 1], eps, d.dtype)
-        if coefficient >= 0:
-            continue
-        constant = eps_correction(d.C[row, 0], eps, d.dtype)
-        new_ratio = constant / -coefficient
-        if least_until_now > new_ratio:
-            least_until_now = new_ratio
-            leaving = row - 1
-    if leaving is None:
-        least_until_now = -math.inf
-    return leaving, least_until_now
+#
+# ratio_test selects how ties and near-ties of the ratios are handled:
+#   'textbook': the first constraint with the least ratio
+#   'harris': the two-pass ratio test of Harris (see 'harris_ratio_test'), which picks the constraint with the largest
+#             pivot coefficient among the constraints with nearly the least ratio. The tolerances are relative to the
+#             constants and the coefficients, and are only used for floating point dtypes (for exact dtypes the
+#             largest pivot coefficient among the exactly tied ratios is picked).
+#
+# 1) Get the eps-corrected constraint coefficients of the entering variable as an array
+# 2) Check if ratio_test is 'harris'
+#   True: return the leaving variable and ratio of 'harris_ratio_test' (None, -math.inf if unbounded)
+# 3) Find the constraints where the coefficient is negative
+#    (Note: For a tableau or algebraic notation the coefficient would have to be positive instead)
+# 4) Check if there are no such constraints (Implies that the problem is unbounded)
+#       True: return None, -math.inf to represent unbounded
+# 5) Calculate: ratio = eps-corrected constraint constant / negative constraint coefficient of entering variable
+#    for these constraints
+# 6) Pick the first constraint with the least ratio (argmin picks the first of tied ratios)
+# 7) return leaving variable, along with the least ratio
+def leaving_variable(d, eps, entering, verbose=False, ratio_test='textbook',
+                     feasibility_tolerance=FEASIBILITY_TOLERANCE, pivot_tolerance=PIVOT_TOLERANCE):
+    coefficients = eps_correction_array(d.C[1:, entering + 1], eps, d.dtype)
+    if ratio_test == 'harris':
+        constants = eps_correction_array(d.C[1:, 0], eps, d.dtype)
+        rows, ratios, unbounded = harris_ratio_test(d, constants, coefficients[:, np.newaxis], feasibility_tolerance,
+                                                    pivot_tolerance)
+        if unbounded[0]:
+            return None, -math.inf
+        return int(rows[0]), ratios[0]
+    if ratio_test != 'textbook':
+        raise ValueError(f"Unknown ratio test: {ratio_test}")
+    candidates = np.flatnonzero(coefficients < 0)
+    if candidates.size == 0:
+        return None, -math.inf
+    constants = eps_correction_array(d.C[1:, 0][candidates], eps, d.dtype)
+    ratios = constants / -coefficients[candidates]
+    least = np.argmin(ratios)
+    if not ratios[least] < math.inf:
+        return None, -math.inf
+    return int(candidates[least]), ratios[least]
+
+
+# Harris' two-pass ratio test for each column of 'coefficients' (the constraint coefficients of candidate entering
+# variables, with a row for each constraint).
+# For floating point dtypes:
+# 1) Only coefficients less than -pivot_tolerance times the largest absolute coefficient of the column limit the
+#    growth of the entering variable (smaller pivot coefficients are treated as 0)
+# 2) Pass one: the bound is the least ratio where each constant is relaxed by feasibility_tolerance * (1 + |constant|)
+# 3) Pass two: among the constraints with a ratio of at most the bound pick the largest absolute pivot coefficient
+# For exact dtypes the tolerances are 0, i.e. the bound is the least ratio, and the ratios are computed exactly.
+# The pivot coefficients of 'RationalRows' are compared after dividing them by the denominators of their rows.
+# Returns the rows and ratios of the picked constraints, and whether each column is unbounded.
+def harris_ratio_test(d, constants, coefficients, feasibility_tolerance, pivot_tolerance):
+    columns = np.arange(coefficients.shape[1])
+    if d.dtype == np.float64:
+        limiting = coefficients < -pivot_tolerance * np.abs(coefficients).max(axis=0, initial=0)
+        relaxed = np.full(coefficients.shape, math.inf)
+        np.divide((constants + feasibility_tolerance * (1 + np.abs(constants)))[:, np.newaxis], -coefficients,
+                  out=relaxed, where=limiting)
+        ratios = np.full(coefficients.shape, math.inf)
+        np.divide(constants[:, np.newaxis], -coefficients, out=ratios, where=limiting)
+        sizes = np.where(limiting, -coefficients, 0)
+    else:
+        limiting = coefficients < 0
+        if d.dtype in [int, RationalRows]:
+            constants = np.array([Fraction(int(value)) for value in constants], dtype=object)
+        ratios = np.full(coefficients.shape, math.inf, dtype=object)
+        np.divide(constants[:, np.newaxis], -coefficients.astype(object), out=ratios, where=limiting)
+        relaxed = ratios
+        sizes = np.where(limiting, -coefficients.astype(object), 0)
+        if d.dtype == RationalRows:
+            sizes = sizes / d.denominators[1:, np.newaxis]
+    bound = relaxed.min(axis=0)
+    rows = np.argmax(np.where(limiting & (ratios <= bound), sizes, 0), axis=0)
+    return rows, ratios[rows, columns], ~limiting.any(axis=0)
+
+
+# Pick leaving variable by the lexicographic ratio test, used by 'simplex' as anti-cycling mode.
+# The constraint constants are perturbed by 'perturbation', a matrix with a row for each constraint, i.e. constant i
+# is C[i+1,0] + perturbation[i,0]*e_1 + perturbation[i,1]*e_2 + ... for infinitesimals e_1 >> e_2 >> ...
+# As the rows of the perturbation are linearly independent there are no ties among the perturbed ratios, so no
+# basis can repeat, whatever entering variable the pivot rule picks.
+# 1) Get the eps-corrected constraint coefficients of the entering variable as an array
+# 2) Find the constraints where the coefficient is negative
+#       True if there are none: return None (the LP is unbounded)
+# 3) For the constraint constants and then each column of the perturbation
+#       a) Calculate the ratios of the remaining constraints (exactly, unless the dtype is floating point). For
+#          'RationalRows' the perturbation is multiplied by the denominators of the rows like the constants.
+#       b) Keep the constraints with the least ratio, and stop if only one is left
+# 4) return the leaving variable
+def lexicographic_leaving_variable(d, eps, entering, perturbation, verbose=False):
+    coefficients = eps_correction_array(d.C[1:, entering + 1], eps, d.dtype)
+    candidates = np.flatnonzero(coefficients < 0)
+    if candidates.size == 0:
+        return None
+    constants = eps_correction_array(d.C[1:, 0], eps, d.dtype)
+    for column in range(perturbation.shape[1] + 1):
+        values = constants[candidates] if column == 0 else perturbation[candidates, column - 1]
+        if column > 0 and d.dtype == RationalRows:
+            values = values * d.denominators[candidates + 1].astype(object)
+        ratios = exact_ratios(values, -coefficients[candidates], d.dtype)
+        candidates = candidates[ratios == ratios.min()]
+        if candidates.size == 1:
+            break
+    return int(candidates[0])
 
 
-# eps>=0 is such that float64 numbers in the closed interval [-eps,eps] are to be treated as if they were 0.
+# Assumes a dual feasible dictionary D (no positive coefficient in the OF) and finds entering and leaving
+# variables for the dual simplex method according to Bland's rule.
+#
+# eps>=0 is such that numbers in the closed interval [-eps,eps]
+# are to be treated as if they were 0
+#
+# Returns entering and leaving such that
+# leaving is None if D is Optimal (no constraint constant is negative)
+# Otherwise D.B[leaving] is the leaving variable
+# entering is None if the LP is Infeasible
+# Otherwise D.N[entering] is an entering variable
+#
+# This is Bland's rule applied to the dual LP, which prevents cycling of the dual simplex method.
+#
+# 1) Find the constraints with a negative constant (see 'infeasible_constants')
+#       True if there are none: return None, None
+# 2) Set leaving to the basic variable with the lowest index among them
+# 3) Pick the entering variable by the dual ratio test (see 'dual_entering_variable')
+# 4) Pick the non-basic variable with the lowest index among the variables with the same ratio as the entering variable
+# 5) return entering and leaving
+def dual_bland(d, eps, verbose=False):
+    infeasible = np.flatnonzero(infeasible_constants(d, eps))
+    if infeasible.size == 0:
+        return None, None
+    leaving = int(infeasible[np.argmin(d.B[infeasible])])
+    entering, ratio = dual_entering_variable(d, eps, leaving)
+    if entering is not None:
+        candidates, ratios = dual_ratios(d, eps, leaving)
+        tied = candidates[ratios == ratio]
+        entering = int(tied[np.argmin(d.N[tied])])
+    return entering, leaving
+
+
+# Assumes a dual feasible dictionary D (no positive coefficient in the OF) and finds entering and leaving
+# variables for the dual simplex method according to the Largest Infeasibility rule.
+#
+# eps>=0 is such that numbers in the closed interval [-eps,eps]
+# are to be treated as if they were 0
+#
+# Returns entering and leaving such that
+# leaving is None if D is Optimal (no constraint constant is negative)
+# Otherwise D.B[leaving] is the leaving variable
+# entering is None if the LP is Infeasible
+# Otherwise D.N[entering] is an entering variable
+#
+# Pick the leaving variable with the most negative constant (the dual of the Largest Coefficient rule), and the
+# entering variable by the dual ratio test. The constants are compared exactly: the rows of an integer dictionary share
+# the last pivot coefficient as denominator, so its constants are compared directly, and the constants of 'RationalRows'
+# are compared as the Fractions they represent (see 'Dictionary.entry_values').
+def dual_largest_infeasibility(d, eps, verbose=False):
+    infeasible = np.flatnonzero(infeasible_constants(d, eps))
+    if infeasible.size == 0:
+        return None, None
+    if d.dtype == RationalRows:
+        constants = d.entry_values(infeasible + 1, [0])[:, 0]
+    else:
+        constants = d.C[infeasible + 1, 0]
+    leaving = int(infeasible[np.argmin(constants)])
+    entering, _ = dual_entering_variable(d, eps, leaving)
+    return entering, leaving
+
+
+# Pick entering variable by the dual ratio test, i.e. the non-basic variable whose OF coefficient becomes 0 first when
+# the OF is changed by a multiple of the row of the leaving variable, which keeps the dictionary dual feasible.
+#
+# 1) Find the non-basic variables with a positive coefficient in the row of the leaving variable (see 'dual_ratios')
+# 2) Check if there are no such variables (The leaving variable can not increase, which implies that the LP is
+#    infeasible)
+#       True: return None, math.inf to represent infeasible
+# 3) Pick the first variable with the least ratio (argmin picks the first of tied ratios)
+# 4) return entering variable, along with the least ratio
+def dual_entering_variable(d, eps, leaving, verbose=False):
+    candidates, ratios = dual_ratios(d, eps, leaving)
+    if candidates.size == 0:
+        return None, math.inf
+    least = np.argmin(ratios)
+    return int(candidates[least]), ratios[least]
+
+
+# The candidate entering variables of the dual ratio test for the leaving variable B[leaving] and their ratios
+# -OF coefficient / coefficient in the row of the leaving variable (eps-corrected, and computed exactly unless the dtype
+# is floating point). The candidates are the positive coefficients of the row, where for np.float64 the coefficients
+# of at most PIVOT_TOLERANCE times the largest absolute coefficient of the row are treated as 0. For 'RationalRows'
+# the ratios are multiplied by the same positive factor (the denominator of the row over that of the OF), which does
+# not change their order.
+def dual_ratios(d, eps, leaving):
+    coefficients = eps_correction_array(d.C[leaving + 1, 1:], eps, d.dtype)
+    if d.dtype == np.float64:
+        candidates = np.flatnonzero(coefficients > PIVOT_TOLERANCE * np.abs(coefficients).max(initial=0))
+    else:
+        candidates = np.flatnonzero(coefficients > 0)
+    objective = eps_correction_array(d.C[0, candidates + 1], eps, d.dtype)
+    return candidates, exact_ratios(-objective, coefficients[candidates], d.dtype)
+
+
+# The constraint constants of the dictionary which are negative. For np.float64 a constant is only negative if it is
+# less than -FEASIBILITY_TOLERANCE * (1 + |constant|), so rounding errors (e.g. after phase one) are not infeasible.
+def infeasible_constants(d, eps):
+    constants = eps_correction_array(d.C[1:, 0], eps, d.dtype)
+    if d.dtype == np.float64:
+        return constants < -FEASIBILITY_TOLERANCE * (1 + np.abs(constants))
+    return constants < 0
+
+
+# The OF coefficients of the dictionary which are positive, i.e. the dictionary is dual feasible if there are none.
+# For np.float64 the tolerance is as for 'infeasible_constants'.
+def infeasible_coefficients(d, eps):
+    coefficients = eps_correction_array(d.C[0, 1:], eps, d.dtype)
+    if d.dtype == np.float64:
+        return coefficients > FEASIBILITY_TOLERANCE * (1 + np.abs(coefficients))
+    return coefficients > 0
+
+
+# Elementwise numerators / denominators, as Fractions (of Python ints) for integer and rational pivoting
+def exact_ratios(numerators, denominators, dtype):
+    if dtype == int:
+        return np.array([Fraction(int(x), int(y)) for x, y in zip(numerators, denominators)], dtype=object)
+    if dtype == RationalRows:
+        return np.array([(x if isinstance(x, Fraction) else Fraction(int(x))) / int(y)
+                         for x, y in zip(numerators, denominators)], dtype=object)
+    return numerators / denominators
+
+
+# eps>=0 is such that numbers in the closed interval [-eps,eps] are to be treated as if they were 0, for every dtype.
 def eps_correction(value, eps, dtype):
-    if dtype == np.float64 or eps <= 0:
+    if eps <= 0:
         return value
     if -eps <= value <= eps:
         return 0
     else:
         return value
+
+
+# eps_correction applied to a whole array of values at once
+def eps_correction_array(values, eps, dtype):
+    if eps <= 0:
+        return values
+    return np.where(np.abs(values) <= eps, 0, values)
@@ -0,0 +1,257 @@
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+from dictionary import Dictionary, variable_names
+from lpresult import LPResult
+from numberbackends import PYTHON
+from lpsolve import simplex, lowest_constraint_const
+from pivotrules import bland, FEASIBILITY_TOLERANCE
+
+
+class RevisedDictionary:
+    # Dictionary for the revised simplex method.
+    #
+    # Instead of storing the whole (m+1)x(n+1) dictionary only the
+    # original constraint matrix is stored, together with a
+    # factorization of the basis matrix. Any entry of the dictionary
+    # can be computed from these, so 'C' is a view that computes the
+    # rows and columns the pivot rules ask for:
+    #
+    #   C[1:, 0]   = B^-1 b                  (values of the basic variables)
+    #   C[1:, j+1] = -B^-1 a_N[j]            (coefficients of N[j])
+    #   C[0, j+1]  = c_N[j] - c_B B^-1 a_N[j] (reduced costs)
+    #   C[0, 0]    = c_B B^-1 b              (value of the basic solution)
+    #
+    # where B is the basis matrix, i.e. the columns of [A I] of the
+    # basic variables. The objective row costs one backward solve
+    # (btran) and one product with the non-basic columns, and every
+    # column costs one forward solve (ftran). Computed rows and columns
+    # are cached until the next pivot.
+    #
+    # The basis matrix is factorized with a sparse LU factorization.
+    # Each pivot appends an eta vector to the factorization (product
+    # form of the inverse) and after 'refactor_frequency' pivots the
+    # basis matrix is factorized again from scratch.
+    #
+    # The entries are always np.float64.
+    #
+    # Variables are indexed as in 'Dictionary', including the
+    # auxillary dictionary where variable n+1 is x0.
+
+    def __init__(self, c, A, b, refactor_frequency=50):
+        # Initializes the dictionary based on linear program in
+        # standard form given by vectors and matrices 'c','A','b'.
+        #
+        # If 'c' is None it generates the auxillary dictionary for the
+        # use in the standard two-phase simplex algorithm
+        m, n = A.shape
+        self.dtype = np.float64
+        self.refactor_frequency = refactor_frequency
+        columns = [scipy.sparse.csc_matrix(np.asarray(A, dtype=np.float64))]
+        if c is None:
+            columns.append(scipy.sparse.csc_matrix(-np.ones((m, 1))))
+        columns.append(scipy.sparse.identity(m, format='csc'))
+        # Column v-1 of 'A' is the column of variable v
+        self.A = scipy.sparse.hstack(columns, format='csc')
+        self.b = np.asarray(b, dtype=np.float64)
+        # Entry v of 'c' is the objective coefficient of variable v
+        self.c = np.zeros(self.A.shape[1] + 1)
+        if c is None:
+            self.c[n + 1] = -1
+        else:
+            self.c[1:n + 1] = c
+        self.N = np.array(range(1, n + 1 + (c is None)))
+        self.B = np.array(range(n + 1 + (c is None), n + 1 + (c is None) + m))
+        self.variables = (n, m, c is None)
+        self.varnames = variable_names(*self.variables)
+        self.n = n
+        self.C = RevisedTableau(self)
+        self.factorize()
+
+    def __str__(self):
+        return self.to_dictionary().__str__()
+
+    # Factorizes the basis matrix from scratch and clears the eta vectors
+    def factorize(self):
+        self.lu = scipy.sparse.linalg.splu(self.A[:, self.B - 1].tocsc())
+        self.etas = []
+        self.clear_cache()
+
+    def clear_cache(self):
+        self.objective_row = None
+        self.columns = {}
+
+    # Solves B x = v, i.e. computes B^-1 v.
+    # The LU factorization is applied first and then the eta vectors in the order of the pivots.
+    def ftran(self, v):
+        x = self.lu.solve(np.asarray(v, dtype=np.float64))
+        for leaving, w in self.etas:
+            x_leaving = x[leaving] / w[leaving]
+            x -= w * x_leaving
+            x[leaving] = x_leaving
+        return x
+
+    # Solves y B = v, i.e. computes v B^-1.
+    # The eta vectors are applied first in the reverse order of the pivots and then the LU factorization.
+    def btran(self, v):
+        y = np.array(v, dtype=np.float64)
+        for leaving, w in reversed(self.etas):
+            y[leaving] = (y[leaving] - (y @ w - y[leaving] * w[leaving])) / w[leaving]
+        return self.lu.solve(y, trans='T')
+
+    # Row 0 of the dictionary: the value of the basic solution followed by the reduced costs
+    def row_zero(self):
+        if self.objective_row is None:
+            c_basic = self.c[self.B]
+            y = self.btran(c_basic)
+            self.objective_row = np.empty(self.N.shape[0] + 1)
+            self.objective_row[0] = c_basic @ self.column(0)[1:]
+            self.objective_row[1:] = self.c[self.N] - (self.A.T @ y)[self.N - 1]
+        return self.objective_row
+
+    # Column j of the dictionary (including row 0)
+    def column(self, j):
+        if j not in self.columns:
+            column = np.empty(self.B.shape[0] + 1)
+            if j == 0:
+                column[1:] = self.ftran(self.b)
+                column[0] = self.c[self.B] @ column[1:]
+            else:
+                column[1:] = -self.ftran(self.original_column(self.N[j - 1]))
+                column[0] = self.row_zero()[j]
+            self.columns[j] = column
+        return self.columns[j]
+
+    # Column of variable v in [A I] as a dense vector
+    def original_column(self, v):
+        column = np.zeros(self.A.shape[0])
+        start, end = self.A.indptr[v - 1], self.A.indptr[v]
+        column[self.A.indices[start:end]] = self.A.data[start:end]
+        return column
+
+    def basic_solution(self):
+        # Extracts the basic solution defined by the dictionary
+        x = np.zeros(self.n)
+        values = self.column(0)[1:]
+        original = self.B <= self.n
+        x[self.B[original] - 1] = values[original]
+        return x
+
+    def value(self):
+        # Extracts the value of the basic solution defined by the dictionary
+        return self.column(0)[0]
+
+    # Pivot Dictionary with N[k] entering and B[l] leaving
+    # 1) Compute the column of the entering variable in the current basis, B^-1 a (it is usually cached already)
+    # 2) Shift the names of the variables N[entering] <--> B[leaving]
+    # 3) Add the eta vector of the pivot, or factorize the new basis matrix if enough eta vectors have been added
+    # 4) Clear the cached rows and columns
+    def pivot(self, entering, leaving, verbose=False):
+        w = -self.column(entering + 1)[1:]
+        temp = self.N[entering]
+        self.N[entering] = self.B[leaving]
+        self.B[leaving] = temp
+        if len(self.etas) + 1 >= self.refactor_frequency:
+            self.factorize()
+        else:
+            self.etas.append((leaving, w))
+            self.clear_cache()
+
+    # Row l+1 of the dictionary without the constant, i.e. the coefficients of the non-basic variables for B[l]
+    def row(self, leaving):
+        unit = np.zeros(self.B.shape[0])
+        unit[leaving] = 1
+        return -(self.A.T @ self.btran(unit))[self.N - 1]
+
+    # Removes the auxillary variable x0 from the non-basis and replaces the auxillary objective by 'c'.
+    # x0 has to be non-basic.
+    def remove_auxiliary(self, c):
+        self.N = self.N[self.N != self.n + 1]
+        self.c[:] = 0
+        self.c[1:self.n + 1] = c
+        self.clear_cache()
+
+    # Computes all entries of the dictionary, and returns them as a np.float64 'Dictionary' (which can be analysed with
+    # 'sensitivity')
+    def to_dictionary(self):
+        d = Dictionary.__new__(Dictionary)
+        d.dtype = np.float64
+        d.backend = PYTHON
+        d.C = np.empty(self.C.shape)
+        d.C[0, :] = self.row_zero()
+        for j in range(self.C.shape[1]):
+            d.C[1:, j] = self.column(j)[1:]
+        d.N = self.N.copy()
+        d.B = self.B.copy()
+        d.variables = self.variables
+        d.varnames = self.varnames
+        return d
+
+
+class RevisedTableau:
+    # The 'C' of a 'RevisedDictionary'. Indexing it as d.C[rows, columns]
+    # computes the requested entries. If rows is 0 the objective row is
+    # used, otherwise the requested columns are computed.
+
+    def __init__(self, d):
+        self.d = d
+        self.dtype = np.dtype(np.float64)
+
+    @property
+    def shape(self):
+        return self.d.B.shape[0] + 1, self.d.N.shape[0] + 1
+
+    def __getitem__(self, key):
+        rows, columns = key
+        if isinstance(rows, (int, np.integer)) and rows == 0:
+            return self.d.row_zero()[columns]
+        indices = np.arange(self.shape[1])[columns]
+        if np.ndim(indices) == 0:
+            return self.d.column(int(indices))[rows]
+        block = np.empty((self.shape[0], indices.shape[0]))
+        for position, j in enumerate(indices):
+            block[:, position] = self.d.column(j)
+        return block[rows]
+
+
+# Revised simplex algorithm
+#
+# Solves the LP in standard form given by vectors and matrices c,A,b
+# like 'lp_solve', but on a 'RevisedDictionary'. The two phases are
+# the same as in 'lp_solve' and the same pivot rules can be used.
+# Results are returned in the same form as 'lp_solve', where the
+# optimal dictionary is a 'RevisedDictionary'. anticycling and
+# statistics are passed on to 'simplex'.
+#
+# This is fast when few rows and columns of the dictionary are needed
+# in each iteration, e.g. for LPs where m and n are far apart.
+#
+# 1) Check if we can go directly to the simplex method (all constraint constants are greater than 0)
+#       True: return simplex(...) on the revised dictionary
+# 2) Construct the auxiliary revised dictionary and pivot the auxiliary variable in at the lowest constant
+# 3) Use the simplex method in the dictionary. As in 'lp_solve' the auxiliary LP is bounded, so its result is not used:
+#    it can only be reported unbounded when rounding errors leave a positive coefficient in the OF which should be 0,
+#    and no pivot is made then
+# 4) Check if the auxiliary OF value -x0 is negative (beyond the rounding errors, see 'infeasible_constants')
+#       True: return INFEASIBLE, None
+# 5) Check if the auxiliary variable is in the basis
+#       True: pivot it out of the basis with an entering variable with a non-zero coefficient in its row
+# 6) Remove the auxiliary variable and use the objective function 'c'
+# 7) return simplex(...)
+def revised_lp_solve(c, a, b, eps=0, pivotrule=lambda d, eps: bland(d, eps=0), verbose=False, refactor_frequency=50,
+                     anticycling='bland', statistics=None):
+    if (b >= 0).all():
+        d = RevisedDictionary(c, a, b, refactor_frequency)
+        return simplex(d, eps, pivotrule, verbose, anticycling, statistics)
+    d = RevisedDictionary(None, a, b, refactor_frequency)
+    d.pivot(d.N.shape[0] - 1, lowest_constraint_const(d))
+    simplex(d, eps, pivotrule, verbose, anticycling, statistics)
+    if d.value() < -FEASIBILITY_TOLERANCE * (1 + abs(d.value())):
+        return LPResult.INFEASIBLE, None
+    auxiliary = np.flatnonzero(d.B == d.n + 1)
+    if auxiliary.size > 0:
+        entering = int(np.argmax(np.abs(d.row(auxiliary[0]))))
+        d.pivot(entering, auxiliary[0])
+    d.remove_auxiliary(c)
+    return simplex(d, eps, pivotrule, verbose, anticycling, statistics)
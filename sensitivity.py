@@ -0,0 +1,107 @@
+import math
+from fractions import Fraction
+
+import numpy as np
+
+from dictionary import Dictionary
+
+
+# Sensitivity analysis of an optimal dictionary D of the LP in standard form given by c,A,b (maximize c x subject to
+# A x <= b and x >= 0), read from the final C, B and N without pivots.
+#
+# Returns a dict with
+#   'x': the values of the original variables (as 'Dictionary.basic_solution')
+#   'slacks': the values of the slack variables of the constraints
+#   'shadow_prices': the dual values y of the constraints, i.e. how much the optimal value increases per unit increase
+#                    of each constant of 'b' (the negative coefficients of the non-basic slack variables in the OF)
+#   'reduced_costs': the coefficients of the original variables in the OF (0 for the basic variables), i.e.
+#                    c_j - y A_j
+#   'cost_ranges': the lower and upper bound of the change of each coefficient of 'c' for which the basis stays
+#                  optimal (see 'cost_ranges')
+#   'rhs_ranges': the lower and upper bound of the change of each constant of 'b' for which the basis stays optimal,
+#                 so the shadow prices stay valid (see 'rhs_ranges')
+# The bounds are changes of the coefficients and constants, -math.inf or math.inf where there is no bound.
+#
+# The numbers are Python Fractions for the exact dtypes and floats otherwise (see 'Dictionary.entry_values'). Only
+# the entries which are needed are converted, once: the OF, the constants, the rows of the basic original variables
+# and the columns of the non-basic slack variables. A 'SparseDictionary' (or 'RevisedDictionary') has to be converted
+# with 'to_dictionary' first.
+#
+# 1) Read the OF coefficients and the constants, and split B and N into original and slack variables
+# 2) Scatter the constants of the basic variables into 'slacks' (and 'x', see 'Dictionary.basic_solution'), and the
+#    OF coefficients of the non-basic variables into 'reduced_costs' and (negated) 'shadow_prices'
+# 3) Compute the ranges of 'c' from the rows of the basic original variables and of 'b' from the columns of the
+#    non-basic slack variables
+def sensitivity(d: Dictionary):
+    n, m, auxiliary = d.variables
+    objective = d.entry_values([0], slice(1, None))[0]
+    constants = d.entry_values(slice(1, None), [0])[:, 0]
+    x = d.basic_solution()
+    zero = Fraction(0) if x.dtype == object else x.dtype.type(0)
+    basic_original = np.flatnonzero(d.B <= n)
+    basic_slack = np.flatnonzero(d.B > n + auxiliary)
+    non_basic_original = np.flatnonzero(d.N <= n)
+    non_basic_slack = np.flatnonzero(d.N > n + auxiliary)
+    slacks = np.full(m, zero, dtype=constants.dtype)
+    slacks[d.B[basic_slack] - n - auxiliary - 1] = constants[basic_slack]
+    reduced_costs = np.full(n, zero, dtype=objective.dtype)
+    reduced_costs[d.N[non_basic_original] - 1] = objective[non_basic_original]
+    shadow_prices = np.full(m, zero, dtype=objective.dtype)
+    shadow_prices[d.N[non_basic_slack] - n - auxiliary - 1] = -objective[non_basic_slack]
+    return {
+        'x': x,
+        'slacks': slacks,
+        'shadow_prices': shadow_prices,
+        'reduced_costs': reduced_costs,
+        'cost_ranges': cost_ranges(d, objective, basic_original, non_basic_original),
+        'rhs_ranges': rhs_ranges(d, constants, basic_slack, non_basic_slack),
+    }
+
+
+# The ranges of the changes of the coefficients of 'c' for which the basis of the optimal dictionary D stays optimal
+# (see 'sensitivity'), where 'objective' are the OF coefficients.
+# A change delta of the coefficient of an original variable
+#   which is non-basic changes its OF coefficient d_j by delta, so the range is (-inf, -d_j]
+#   which is basic adds delta times its row to the OF, so every OF coefficient d_k + delta*a_k must stay non-positive:
+#       delta <= -d_k/a_k for a_k > 0 and delta >= -d_k/a_k for a_k < 0
+# The ratios of all basic original variables are computed at once as a matrix with a row for each of them.
+# Returns the arrays of the lower and upper bounds.
+def cost_ranges(d, objective, basic_original, non_basic_original):
+    n = d.variables[0]
+    lower = np.full(n, -math.inf, dtype=objective.dtype)
+    upper = np.full(n, math.inf, dtype=objective.dtype)
+    upper[d.N[non_basic_original] - 1] = -objective[non_basic_original]
+    rows = d.entry_values(basic_original + 1, slice(1, None))
+    lower[d.B[basic_original] - 1], upper[d.B[basic_original] - 1] = bounds(objective[np.newaxis, :], rows)
+    return lower, upper
+
+
+# The ranges of the changes of the constants of 'b' for which the basis of the optimal dictionary D stays optimal
+# (see 'sensitivity'), where 'constants' are the constraint constants.
+# A change delta of the constant of a constraint changes the constants by delta times the column of the inverse basis
+# matrix of the constraint, and every constant must stay non-negative:
+#   for a basic slack variable the column is the unit column of its row, so the range is [-slack value, inf)
+#   for a non-basic slack variable the column is minus the column w of the slack variable in the dictionary, so
+#       delta <= constant/w for w > 0 and delta >= constant/w for w < 0
+# The ratios of all non-basic slack variables are computed at once as a matrix with a row for each of them.
+# Returns the arrays of the lower and upper bounds.
+def rhs_ranges(d, constants, basic_slack, non_basic_slack):
+    n, m, auxiliary = d.variables
+    lower = np.full(m, -math.inf, dtype=constants.dtype)
+    upper = np.full(m, math.inf, dtype=constants.dtype)
+    lower[d.B[basic_slack] - n - auxiliary - 1] = -constants[basic_slack]
+    columns = d.entry_values(slice(1, None), non_basic_slack + 1)
+    constraints = d.N[non_basic_slack] - n - auxiliary - 1
+    lower[constraints], upper[constraints] = bounds(-constants[np.newaxis, :], columns.T)
+    return lower, upper
+
+
+# For each row of 'coefficients' the largest -values/coefficients over the negative coefficients (-inf if there are
+# none) and the least over the positive coefficients (inf if there are none), with 'values' broadcast to the rows
+def bounds(values, coefficients):
+    values = np.broadcast_to(values, coefficients.shape)
+    ratios = np.full(coefficients.shape, math.inf, dtype=coefficients.dtype)
+    np.divide(-values, coefficients, out=ratios, where=coefficients != 0)
+    lower = np.where(coefficients < 0, ratios, -math.inf).max(axis=1, initial=-math.inf)
+    upper = np.where(coefficients > 0, ratios, math.inf).min(axis=1, initial=math.inf)
+    return lower, upper
@@ -0,0 +1,279 @@
+from fractions import Fraction
+
+import numpy as np
+import scipy.sparse
+
+from dictionary import Dictionary, RationalRows, variable_names
+from numberbackends import PYTHON
+
+
+class SparseDictionary:
+    # Simplex dictionary as 'Dictionary', but with the coefficients
+    # stored in a sparse row format.
+    #
+    # 'rows' is a list of m+1 Python dicts, one for each row of the
+    # dictionary (row 0 is the objective function). Each dict maps the
+    # column index (0 for the constant, j+1 for N[j]) to the non-zero
+    # coefficient, so zero entries cost neither memory nor arithmetic.
+    # This matters the most for the dtypes 'Fraction' and 'int' where
+    # every stored zero would be a full Python object.
+    #
+    # 'dtype' is 'int', 'Fraction' or a NumPy floating point type as for
+    # 'Dictionary', and dtype 'int' is used for integer pivoting with
+    # 'lastpivot' as in 'Dictionary'. 'RationalRows' is not supported
+    # (see 'make_dictionary' in lpsolve).
+    #
+    # 'C' is a view of the dictionary as a (m+1)x(n+1) array, such that
+    # the pivot rules and 'simplex' can index it like the 'C' of
+    # 'Dictionary'. Only the requested entries are looked up.
+    #
+    # 'B', 'N' and 'varnames' are as for 'Dictionary'.
+    #
+    # The number of non-zero entries is tracked to report the fill-in
+    # of the pivots (see 'fill_in_statistics').
+
+    def __init__(self, c, A, b, dtype=Fraction):
+        # Initializes the dictionary based on linear program in
+        # standard form given by vectors and matrices 'c','A','b',
+        # where 'A' may be a scipy.sparse matrix or a NumPy array.
+        #
+        # If 'c' is None it generates the auxillary dictionary for the
+        # use in the standard two-phase simplex algorithm
+        #
+        # Every non-zero entry of the input is individually converted
+        # to the given dtype.
+        if dtype == RationalRows:
+            raise ValueError("RationalRows is not supported by SparseDictionary, use Fraction")
+        A = scipy.sparse.csr_matrix(A)
+        m, n = A.shape
+        self.dtype = dtype
+        if dtype == int:
+            self.lastpivot = 1
+        self.zero = dtype(0)
+        self.rows = [dict() for _ in range(m + 1)]
+        if c is None:
+            self.rows[0][n + 1] = dtype(-1)
+        else:
+            for j in range(0, n):
+                if c[j] != 0:
+                    self.rows[0][j + 1] = dtype(c[j])
+        for i in range(0, m):
+            row = self.rows[i + 1]
+            if b[i] != 0:
+                row[0] = dtype(b[i])
+            for j, value in zip(A.indices[A.indptr[i]:A.indptr[i + 1]], A.data[A.indptr[i]:A.indptr[i + 1]]):
+                if value != 0:
+                    row[int(j) + 1] = dtype(-value)
+            if c is None:
+                row[n + 1] = dtype(1)
+        self.n = n
+        self.N = np.array(range(1, n + 1 + (c is None)))
+        self.B = np.array(range(n + 1 + (c is None), n + 1 + (c is None) + m))
+        self.variables = (n, m, c is None)
+        self.varnames = variable_names(*self.variables)
+        self.C = SparseTableau(self)
+        self.initial_nonzeros = self.nonzeros = self.peak_nonzeros = sum(len(row) for row in self.rows)
+        self.pivots = 0
+
+    def __str__(self):
+        return self.to_dictionary().__str__()
+
+    def basic_solution(self):
+        # Extracts the basic solution defined by the dictionary
+        x_dtype = Fraction if self.dtype == int else self.dtype
+        x = np.empty(self.n, x_dtype)
+        x[:] = x_dtype(0)
+        for i in range(0, self.B.shape[0]):
+            if self.B[i] <= self.n:
+                if self.dtype == int:
+                    x[self.B[i] - 1] = Fraction(self.rows[i + 1].get(0, 0), self.lastpivot)
+                else:
+                    x[self.B[i] - 1] = self.rows[i + 1].get(0, self.zero)
+        return x
+
+    def value(self):
+        # Extracts the value of the basic solution defined by the dictionary
+        if self.dtype == int:
+            return Fraction(self.rows[0].get(0, 0), self.lastpivot)
+        return self.rows[0].get(0, self.zero)
+
+    # Pivot Dictionary with N[k] entering and B[l] leaving
+    # Performs integer pivoting if self.dtype==int
+    # Only rows with a non-zero coefficient of the entering variable are changed (except for integer pivoting which
+    # scales every row), and only the non-zero entries of the pivot row are added to them.
+    def pivot(self, entering, leaving, verbose=False):
+        temp = self.N[entering]
+        self.N[entering] = self.B[leaving]
+        self.B[leaving] = temp
+        if self.dtype == int:
+            changed = self.integer_pivot(entering + 1, leaving + 1)
+        else:
+            changed = self.float_fraction_pivot(entering + 1, leaving + 1)
+        self.nonzeros += changed
+        self.peak_nonzeros = max(self.peak_nonzeros, self.nonzeros)
+        self.pivots += 1
+
+    # Pivot as 'Dictionary.float_fraction_pivot' on the rows of column 'k' and row 'l'.
+    # Returns the change in the number of non-zero entries.
+    # 1) Divide the pivot row by the negative pivot coefficient and set the coefficient of the leaving variable
+    # 2) For each non-pivot row with a non-zero coefficient c of the entering variable
+    #   a) Add c times the pivot row to each of the non-zero entries of the pivot row, removing entries that become
+    #      zero and adding entries that become non-zero (fill-in)
+    #   b) Set the coefficient of the leaving variable to c times its coefficient in the pivot row
+    def float_fraction_pivot(self, k, l):
+        pivot_row = self.rows[l]
+        a = pivot_row.pop(k)
+        for j in pivot_row:
+            pivot_row[j] /= -a
+        pivot_row[k] = 1 / a
+        changed = 0
+        for i, row in enumerate(self.rows):
+            if i == l or k not in row:
+                continue
+            before = len(row)
+            c = row.pop(k)
+            for j, value in pivot_row.items():
+                if j == k:
+                    continue
+                new_value = row.get(j, self.zero) + c * value
+                if new_value == 0:
+                    row.pop(j, None)
+                else:
+                    row[j] = new_value
+            row[k] = c * pivot_row[k]
+            changed += len(row) - before
+        return changed
+
+    # Integer pivot as 'Dictionary.integer_pivot' on the rows of column 'k' and row 'l'. Every non-pivot entry
+    # becomes (|a|*c_ij - s*c_i*c_lj) // lastpivot, which is computed for the non-zero entries only.
+    # Returns the change in the number of non-zero entries.
+    def integer_pivot(self, k, l):
+        pivot_row = self.rows[l]
+        a = pivot_row.pop(k)
+        sign = 1 if a > 0 else -1
+        changed = 0
+        for i, row in enumerate(self.rows):
+            if i == l:
+                continue
+            before = len(row)
+            c = sign * row.pop(k, 0)
+            for j in row:
+                row[j] *= abs(a)
+            if c != 0:
+                for j, value in pivot_row.items():
+                    new_value = row.get(j, 0) - c * value
+                    if new_value == 0:
+                        row.pop(j, None)
+                    else:
+                        row[j] = new_value
+            if self.lastpivot != 1:
+                for j in row:
+                    row[j] //= self.lastpivot
+            if c != 0:
+                row[k] = c
+            changed += len(row) - before
+        for j in pivot_row:
+            pivot_row[j] *= -sign
+        pivot_row[k] = sign * self.lastpivot
+        self.lastpivot = abs(a)
+        return changed
+
+    # Turns the integer pivoting dictionary of the LP scaled by 'scale' into the Fraction dictionary of the LP in the
+    # same basis, as 'Dictionary.unscale' (which makes a 'RationalRows' dictionary, not supported here): the entries of
+    # the columns of the non-basic slack variables are multiplied by scale, and the entries of the rows of the basic
+    # slack variables and the OF are divided by it (and every entry by the last pivot coefficient).
+    def unscale(self, scale):
+        n, m, auxiliary = self.variables
+        slack_columns = set((np.flatnonzero(self.N > n + auxiliary) + 1).tolist())
+        for i, row in enumerate(self.rows):
+            denominator = self.lastpivot * (scale if i == 0 or self.B[i - 1] > n + auxiliary else 1)
+            for j in row:
+                row[j] = Fraction(row[j] * (scale if j in slack_columns else 1), denominator)
+        self.dtype = Fraction
+        self.zero = Fraction(0)
+        del self.lastpivot
+
+    # Removes the auxillary variable x0 from the non-basis and uses the objective function 'c' (see 'lp_solve').
+    # 1) Swap the column of the auxiliary variable with the last column, and remove the last column
+    # 2) Set the objective row to the coefficients of the non-basic original variables and add the rows of the
+    #    basic original variables multiplied by their coefficients in 'c' (for integer pivoting the objective
+    #    function is multiplied by the last pivot coefficient like all other rows)
+    def remove_auxiliary(self, c):
+        position = int(np.flatnonzero(self.N == self.n + 1)[0]) + 1
+        last = self.N.shape[0]
+        self.N[position - 1] = self.N[last - 1]
+        self.N = self.N[:-1]
+        for row in self.rows:
+            row.pop(position, None)
+            if last in row:
+                row[position] = row.pop(last)
+        multiplier = self.lastpivot if self.dtype == int else 1
+        objective = dict()
+        for j, variable in enumerate(self.N):
+            if variable <= self.n and c[variable - 1] != 0:
+                objective[j + 1] = self.dtype(c[variable - 1]) * multiplier
+        for i, variable in enumerate(self.B):
+            if variable <= self.n and c[variable - 1] != 0:
+                coefficient = self.dtype(c[variable - 1])
+                for j, value in self.rows[i + 1].items():
+                    objective[j] = objective.get(j, self.zero) + coefficient * value
+        self.rows[0] = {j: value for j, value in objective.items() if value != 0}
+        self.nonzeros = sum(len(row) for row in self.rows)
+
+    # Number of non-zero entries of the dictionary now, initially and at most after a pivot, and the density of the
+    # dictionary. Fill-in is the number of non-zero entries created by the pivots.
+    def fill_in_statistics(self):
+        rows, columns = self.C.shape
+        return {
+            'pivots': self.pivots,
+            'initial_nonzeros': self.initial_nonzeros,
+            'nonzeros': self.nonzeros,
+            'peak_nonzeros': self.peak_nonzeros,
+            'fill_in': self.nonzeros - self.initial_nonzeros,
+            'density': self.nonzeros / (rows * columns),
+        }
+
+    # Returns the dictionary as a dense 'Dictionary'
+    def to_dictionary(self):
+        d = Dictionary.__new__(Dictionary)
+        d.dtype = self.dtype
+        d.backend = PYTHON
+        if self.dtype == int:
+            d.lastpivot = self.lastpivot
+        d.C = self.C[:, :]
+        d.N = self.N.copy()
+        d.B = self.B.copy()
+        d.variables = self.variables
+        d.varnames = self.varnames
+        return d
+
+
+class SparseTableau:
+    # The 'C' of a 'SparseDictionary'. Indexing it as d.C[rows, columns]
+    # returns the requested entries as a NumPy array (or a single
+    # entry), with the zero entries filled in.
+
+    def __init__(self, d):
+        self.d = d
+        self.dtype = np.dtype(object) if d.dtype in [int, Fraction] else np.dtype(d.dtype)
+
+    @property
+    def shape(self):
+        return self.d.B.shape[0] + 1, self.d.N.shape[0] + 1
+
+    def __getitem__(self, key):
+        rows, columns = key
+        row_indices = np.arange(self.shape[0])[rows]
+        column_indices = np.arange(self.shape[1])[columns]
+        zero = self.d.zero
+        if np.ndim(row_indices) == 0 and np.ndim(column_indices) == 0:
+            return self.d.rows[row_indices].get(int(column_indices), zero)
+        block = np.empty((np.size(row_indices), np.size(column_indices)), dtype=self.dtype)
+        for position, i in enumerate(np.atleast_1d(row_indices)):
+            row = self.d.rows[i]
+            block[position, :] = [row.get(j, zero) for j in np.atleast_1d(column_indices).tolist()]
+        if np.ndim(row_indices) == 0:
+            return block[0, :]
+        if np.ndim(column_indices) == 0:
+            return block[:, 0]
+        return block
@@ -1,8 +1,10 @@
+from fractions import Fraction
 from unittest import TestCase
 
 import numpy as np
 
-from dictionary import Dictionary
+import dictionary
+from dictionary import Dictionary, RationalRows
 
 
 class TestDictionary(TestCase):
@@ -139,6 +141,212 @@ x2 =    2 -  3/4*x1 -  1/4*x6 -  1/2*x3"""
             print()
         self.assertTrue(d.__str__() == expected)
 
+    def test_float_pivot_blocks(self):
+        # The rank-1 update must give the same dictionary as the Fraction pivot, also when split into many blocks
+        c = np.array([5, 4, 3])
+        a = np.array([[2, 3, 1],
+                      [4, 1, 2],
+                      [3, 4, 2]])
+        b = np.array([5, 11, 8])
+        block_entries = dictionary.PIVOT_BLOCK_ENTRIES
+        dictionary.PIVOT_BLOCK_ENTRIES = 1
+        try:
+            d_float = Dictionary(c, a, b, np.float64)
+            d_float.pivot(0, 0)
+            d_float.pivot(2, 2)
+        finally:
+            dictionary.PIVOT_BLOCK_ENTRIES = block_entries
+        d_fraction = Dictionary(c, a, b, Fraction)
+        d_fraction.pivot(0, 0)
+        d_fraction.pivot(2, 2)
+        self.assertTrue((d_float.C == d_fraction.C.astype(np.float64)).all())
+        self.assertTrue((d_float.B == d_fraction.B).all())
+        self.assertTrue((d_float.N == d_fraction.N).all())
+
+    def test_integer_pivot_matches_fraction_pivot(self):
+        c = np.array([5, 4, 3])
+        a = np.array([[2, 3, 1],
+                      [4, 1, 2],
+                      [3, 4, 2]])
+        b = np.array([5, 11, 8])
+        d_integer = Dictionary(c, a, b, int)
+        d_fraction = Dictionary(c, a, b, Fraction)
+        for entering, leaving in [(0, 0), (2, 2), (1, 1)]:
+            d_integer.pivot(entering, leaving)
+            d_fraction.pivot(entering, leaving)
+            self.assertTrue((d_integer.C == d_fraction.C * d_integer.lastpivot).all())
+            self.assertEqual(d_fraction.value(), d_integer.value())
+
+    def test_integer_pivot_int64(self):
+        c = np.array([5, 2])
+        a = np.array([[3, 1],
+                      [2, 5]])
+        b = np.array([7, 5])
+        d = Dictionary(c, a, b, int)
+        self.assertEqual(np.int64, d.C.dtype)
+        d.pivot(0, 0)
+        d.pivot(1, 1)
+        self.assertEqual(np.int64, d.C.dtype)
+        self.assertEqual(Fraction(152, 13), d.value())
+        self.assertEqual(int, type(d.value().numerator))
+
+    def test_integer_pivot_promotion(self):
+        # Entries of 40 bits can not be multiplied in np.int64, so the dictionary is promoted to Python ints
+        c = np.array([5, 2])
+        a = np.array([[3, 1],
+                      [2, 5]]) * 2 ** 40
+        b = np.array([7, 5]) * 2 ** 40
+        d = Dictionary(c, a, b, int)
+        self.assertEqual(np.int64, d.C.dtype)
+        d.pivot(0, 0)
+        self.assertEqual(object, d.C.dtype)
+        d.pivot(1, 1)
+        d_fraction = Dictionary(c, a, b, Fraction)
+        d_fraction.pivot(0, 0)
+        d_fraction.pivot(1, 1)
+        self.assertEqual(d_fraction.value(), d.value())
+        self.assertTrue((d.C == d_fraction.C * d.lastpivot).all())
+
+    def test_rational_pivot_matches_fraction_pivot(self):
+        c = np.array([5, 4, 3])
+        a = np.array([[2, 3, 1],
+                      [4, 1, 2],
+                      [3, 4, 2]])
+        b = np.array([5, 11, 8])
+        d_rational = Dictionary(c, a, b, RationalRows)
+        d_fraction = Dictionary(c, a, b, Fraction)
+        self.assertEqual(np.int64, d_rational.C.dtype)
+        for entering, leaving in [(0, 0), (2, 2), (1, 1)]:
+            d_rational.pivot(entering, leaving)
+            d_fraction.pivot(entering, leaving)
+            self.assertTrue((d_rational.rational_entries() == d_fraction.C).all())
+            self.assertEqual(d_fraction.__str__(), d_rational.__str__())
+            self.assertEqual(d_fraction.value(), d_rational.value())
+            self.assertTrue((d_fraction.basic_solution() == d_rational.basic_solution()).all())
+        # The rows are reduced every RATIONAL_REDUCE_PIVOTS pivots, after which the numerators and the denominator of
+        # each row have no common factor
+        d_rational.reduce_rows()
+        self.assertEqual(0, d_rational.unreduced_pivots)
+        for row, denominator in zip(d_rational.C, d_rational.denominators):
+            self.assertEqual(1, np.gcd(np.gcd.reduce(row), denominator))
+
+    def test_rational_pivot_unchanged_rows(self):
+        # Only the rows with a non-zero coefficient of the entering variable are changed
+        c = np.array([1, 1])
+        a = np.array([[3, 0],
+                      [0, 7]])
+        b = np.array([2, 5])
+        d = Dictionary(c, a, b, RationalRows)
+        d.pivot(0, 0)
+        self.assertTrue((np.array([0, -7]) == d.C[2, 1:]).all())
+        self.assertEqual(1, d.denominators[2])
+        self.assertEqual(3, d.denominators[1])
+        self.assertEqual(Fraction(2, 3), d.value())
+
+    def test_rational_pivot_promotion(self):
+        c = np.array([5, 2])
+        a = np.array([[3, 1],
+                      [2, 5]]) * 2 ** 40
+        b = np.array([7, 5]) * 2 ** 40
+        d = Dictionary(c, a, b, RationalRows)
+        self.assertEqual(np.int64, d.C.dtype)
+        d.pivot(0, 0)
+        self.assertEqual(object, d.C.dtype)
+        d.pivot(1, 1)
+        d_fraction = Dictionary(c, a, b, Fraction)
+        d_fraction.pivot(0, 0)
+        d_fraction.pivot(1, 1)
+        self.assertEqual(d_fraction.value(), d.value())
+        self.assertTrue((d.rational_entries() == d_fraction.C).all())
+
+    def test_construction(self):
+        c = np.array([1.5, 2.0])
+        a = np.array([[3.0, -1.0],
+                      [0.25, 5.0]])
+        b = np.array([7, 5])
+        d = Dictionary(c, a, b, Fraction)
+        expected = np.array([[0, Fraction(3, 2), 2],
+                             [7, -3, 1],
+                             [5, Fraction(-1, 4), -5]], dtype=object)
+        self.assertTrue((expected == d.C).all())
+        self.assertTrue(all(type(entry) == Fraction for entry in d.C.ravel()))
+        d = Dictionary(c, a, b, np.float64)
+        self.assertTrue((expected.astype(np.float64) == d.C).all())
+        d = Dictionary(c, a, b, RationalRows)
+        self.assertTrue((expected == d.rational_entries()).all())
+        self.assertTrue((np.array([2, 1, 4]) == d.denominators).all())
+        d = Dictionary(None, a, b, Fraction)
+        self.assertEqual(['z', 'x1', 'x2', 'x0', 'x3', 'x4'], list(d.varnames))
+        self.assertTrue((d.C[1:, 3] == 1).all())
+
+    def test_add_constraint_and_column(self):
+        # The dictionary is the dictionary of the LP with the constraint (column) with the same pivots
+        c = np.array([5, 4, 3])
+        a = np.array([[2, 3, 1],
+                      [4, 1, 2],
+                      [3, 4, 2]])
+        b = np.array([5, 11, 8])
+        pivots = [(0, 0), (2, 2)]
+        for dtype in [Fraction, int, RationalRows, np.float64]:
+            constraint = np.array([1, 1, 1]), 3
+            column = (7, np.array([1, 3, 2, 1])) if dtype in [int, np.float64] else \
+                (Fraction(1, 3), np.array([Fraction(1, 2), 3, Fraction(2, 5), 1]))
+            d = Dictionary(c, a, b, dtype)
+            for entering, leaving in pivots:
+                d.pivot(entering, leaving)
+            d.add_constraint(*constraint)
+            c_expected = c
+            a_expected = np.vstack([a, constraint[0]])
+            b_expected = np.append(b, constraint[1])
+            for added in range(2):
+                d_expected = Dictionary(c_expected, a_expected, b_expected, dtype)
+                for entering, leaving in pivots:
+                    d_expected.pivot(entering, leaving)
+                self.assertTrue((d_expected.B == d.B).all())
+                self.assertTrue((d_expected.N == d.N).all())
+                self.assertEqual(d_expected.__str__(), d.__str__())
+                if dtype == int:
+                    self.assertEqual(d_expected.lastpivot, d.lastpivot)
+                if dtype == RationalRows:
+                    self.assertTrue((d_expected.rational_entries() == d.rational_entries()).all())
+                elif dtype == np.float64:
+                    self.assertTrue(np.allclose(d_expected.C, d.C))
+                else:
+                    self.assertTrue((d_expected.C == d.C).all())
+                d.add_column(*column)
+                c_expected = np.append(c_expected, column[0])
+                a_expected = np.hstack([a_expected, column[1][:, np.newaxis]])
+
+    def test_change_objective_and_rhs(self):
+        # The dictionary is the dictionary of the changed LP with the same pivots
+        c = np.array([5, 4, 3])
+        a = np.array([[2, 3, 1],
+                      [4, 1, 2],
+                      [3, 4, 2]])
+        b = np.array([5, 11, 8])
+        pivots = [(0, 0), (2, 2)]
+        for dtype in [Fraction, int, RationalRows, np.float64]:
+            d = Dictionary(c, a, b, dtype)
+            for entering, leaving in pivots:
+                d.pivot(entering, leaving)
+            d_copy = d.copy()
+            # x1 and x3 are basic and x2 is non-basic, the slack variables of the first and the third constraint are
+            # non-basic and that of the second is basic
+            deltas = [3, -2] if dtype in [int, np.float64] else [Fraction(1, 2), Fraction(-7, 3)]
+            d.change_objective([0, 1], deltas)
+            d.change_rhs([0, 1, 2], deltas + [1])
+            d_expected = Dictionary(c + np.array(deltas + [0]), a, b + np.array(deltas + [1]), dtype)
+            for entering, leaving in pivots:
+                d_expected.pivot(entering, leaving)
+            self.assertEqual(d_expected.__str__(), d.__str__())
+            self.assertEqual(d_expected.value(), d.value())
+            if dtype == int:
+                self.assertTrue((d_expected.C == d.C).all())
+            # The copy is not changed
+            d_unchanged = Dictionary(c, a, b, dtype)
+            for entering, leaving in pivots:
+                d_unchanged.pivot(entering, leaving)
+            self.assertEqual(d_unchanged.__str__(), d_copy.__str__())
 
 """
 def custom1():
@@ -2,19 +2,21 @@ from datetime import time
 from fractions import Fraction
 from math import copysign
 import random
-from unittest import TestCase
+from unittest import TestCase, mock
 
 import numpy as np
+import scipy.sparse
 
 import dictionary
 import lpsolve
-from dictionary import Dictionary
+from dictionary import Dictionary, RationalRows
 from experiments import compare_to_linprog, random_lp_only_none_negative_b_values, random_lp_including_negative_b_values
 from lpresult import LPResult
-from lpsolve import lp_solve
+from lpsolve import lp_solve, initial_perturbation, pivot_perturbation, simplex, pivot_to_basis, auto_dtype, \
+    input_decimals, simple_simplex, dual_simplex, composite_simplex, reoptimize, solve_scenarios
 from scipy.optimize import linprog as linprog_original, linprog
 
-from pivotrules import bland
+from pivotrules import bland, largest_coefficient, dual_bland
 
 
 def example1():
@@ -41,6 +43,11 @@ def exercise2_7():
     return np.array([1, 3]), np.array([[-1, -1], [-1, 1], [-1, 2]]), np.array([-3, -1, 2])
 
 
+def cycling_example():
+    # Cycles with the largest coefficient rule (Chvatal, Linear Programming, p. 31)
+    return np.array([10, -57, -9, -24]), np.array([[0.5, -5.5, -2.5, 9], [0.5, -1.5, -0.5, 1], [1, 0, 0, 0]]), np.array([0, 0, 1])
+
+
 class Test(TestCase):
     def test_lp_solve(self):
         verbose = True
@@ -109,11 +116,11 @@ x2 =   1/13 +   2/13*x3 -   3/13*x4"""
             print(initial_d)
             print("------------------------")
         expected_res = LPResult.OPTIMAL
-        expected_d = """ z = -8/3 -  4/3*x3 -  5/3*x4
-x2 =  1/3 -  1/3*x3 +  1/3*x4
-x1 =  4/3 +  2/3*x3 +  1/3*x4
-x5 =  2/3 +  1/3*x3 -  1/3*x4"""
-        res, d = lp_solve(c, a, b, verbose=verbose)
+        expected_d = """ z =  -3 -   1*x4 -   1*x3
+x2 = 1/3 + 1/3*x4 - 1/3*x3
+x1 = 4/3 + 1/3*x4 + 2/3*x3
+x5 = 2/3 - 1/3*x4 + 1/3*x3"""
+        res, d = lp_solve(c, a, b, verbose=verbose, phase_one='auxiliary')
         self.assertEqual(expected_res, res)
         self.assertEqual(expected_d, d.__str__())
 
@@ -230,7 +237,7 @@ x5 =  5 -  0*x1 -  3*x2 +  1*x3"""
 x3 = 17/5 -  3/5*x5 -  4/5*x1 +  1/5*x4
 x6 =    3 -    1*x5 -    1*x1 -    0*x4
 x2 = 14/5 -  1/5*x5 +  2/5*x1 +  2/5*x4"""
-        res, d = lp_solve(c, a, b, verbose=verbose)
+        res, d = lp_solve(c, a, b, verbose=verbose, phase_one='auxiliary')
         self.assertEqual(expected_res, res)
         self.assertEqual(expected_d, d.__str__())
         print(f"d.value(): {d.value()}")
@@ -257,3 +264,410 @@ x2 = 14/5 -  1/5*x5 +  2/5*x1 +  2/5*x4"""
         b_eq = np.array([5])
         res_linprog = lpsolve.linprog(c, a, b, a_eq, b_eq)
         print(res_linprog)
+
+    def test_two_phase_compared_to_linprog(self):
+        # The objective function after phase one must be correct for every dtype, including integer pivoting
+        np.random.seed(9)
+        eps = 0.0000001
+        for dtype in [Fraction, int, np.float64]:
+            for i in range(30):
+                n = np.random.randint(1, 20)
+                m = np.random.randint(1, 20)
+                c, a, b = random_lp_including_negative_b_values(n, m)
+                res_linprog = linprog(-c, a, b, method="highs")
+                res, d = lp_solve(c, a, b, dtype)
+                self.assertEqual(res_linprog.status == 0, res == LPResult.OPTIMAL)
+                if res == LPResult.OPTIMAL:
+                    self.assertTrue(d.value() - eps <= -res_linprog.fun <= d.value() + eps)
+                    self.assertAlmostEqual(float(d.value()), float(c @ d.basic_solution()))
+
+    def test_anticycling(self):
+        c, a, b = cycling_example()
+        for dtype in [Fraction, np.float64]:
+            for anticycling in ['bland', 'lexicographic']:
+                statistics = dict()
+                res, d = lp_solve(c, a, b, dtype, pivotrule=lambda d, eps: largest_coefficient(d, eps),
+                                  anticycling=anticycling, statistics=statistics)
+                self.assertEqual(LPResult.OPTIMAL, res)
+                self.assertEqual(1, d.value())
+                self.assertTrue(0 < statistics['anticycling_pivots'] < statistics['pivots'])
+                self.assertEqual(1, statistics['cycles_detected'])
+        with self.assertRaises(ValueError):
+            simplex(Dictionary(c, a, b), anticycling='random')
+
+    def test_degenerate_without_cycling(self):
+        # Degenerate pivots which do not cycle must not switch to the anti-cycle mode
+        c = np.array([1, 1, 1])
+        a = np.array([[1, -1, 0], [-1, 1, 0], [0, -1, 1], [1, 1, 1]])
+        b = np.array([0, 0, 0, 3])
+        for pivotrule in [bland, largest_coefficient]:
+            statistics = dict()
+            res, d = lp_solve(c, a, b, pivotrule=lambda d, eps: pivotrule(d, eps), statistics=statistics)
+            self.assertEqual(LPResult.OPTIMAL, res)
+            self.assertEqual(3, d.value())
+            self.assertEqual(0, statistics['cycles_detected'])
+            self.assertEqual(0, statistics['anticycling_pivots'])
+            self.assertTrue(0 < statistics['degenerate_pivots'] <= statistics['pivots'])
+
+    def test_lowest_constraint_const(self):
+        d = Dictionary(None, np.array([[1, 1], [1, -1], [-1, 1]]), np.array([-1, -3, -3]))
+        self.assertEqual(1, lpsolve.lowest_constraint_const(d))
+        d = Dictionary(None, np.array([[1, 1], [1, -1]]), np.array([1, 0]))
+        self.assertEqual(0, lpsolve.lowest_constraint_const(d))
+        self.assertEqual((False, None), lpsolve.position_of_auxiliary_variable_in_basis(d))
+        d.pivot(2, 1)
+        self.assertEqual((True, 1), lpsolve.position_of_auxiliary_variable_in_basis(d))
+
+    def test_pivot_perturbation(self):
+        # Started at the initial dictionary the perturbation is the coefficients of the slack variables (with the
+        # opposite sign), and the unit vector of the row of a basic slack variable
+        c, a, b = example1()
+        n = c.shape[0]
+        for dtype in [Fraction, int, np.float64]:
+            d = Dictionary(c, a, b, dtype)
+            perturbation = initial_perturbation(d)
+            for entering, leaving in [(0, 1), (2, 2), (1, 0)]:
+                perturbation = pivot_perturbation(d, perturbation, entering, leaving)
+                d.pivot(entering, leaving)
+            scale = d.lastpivot if dtype == int else 1
+            for i in range(b.shape[0]):
+                expected = np.zeros(b.shape[0])
+                if n + 1 + i in d.B:
+                    expected[np.flatnonzero(d.B == n + 1 + i)[0]] = scale
+                else:
+                    expected = -d.C[1:, np.flatnonzero(d.N == n + 1 + i)[0] + 1]
+                self.assertTrue(np.allclose(expected.astype(float), perturbation[:, i].astype(float)))
+
+    def test_float_first(self):
+        # The result must be the exact result, and the optimal bases found with np.float64 are certified
+        np.random.seed(10)
+        for dtype in [Fraction, int]:
+            for i in range(20):
+                n = np.random.randint(1, 15)
+                m = np.random.randint(1, 15)
+                c, a, b = random_lp_including_negative_b_values(n, m)
+                res, d = lp_solve(c, a, b, dtype)
+                statistics = dict()
+                res_float_first, d_float_first = lp_solve(c, a, b, dtype, float_first=True, statistics=statistics)
+                self.assertEqual(res, res_float_first)
+                if res == LPResult.OPTIMAL:
+                    self.assertEqual(d.value(), d_float_first.value())
+                    self.assertTrue(statistics['certified_first_try'])
+                    self.assertTrue(isinstance(d_float_first.value(), Fraction))
+                else:
+                    self.assertFalse(statistics['certified_first_try'])
+
+    def test_pivot_to_basis(self):
+        c, a, b = example1()
+        res, d = lp_solve(c, a, b)
+        d_basis = Dictionary(c, a, b)
+        self.assertEqual(len(set(d.B) - set(d_basis.B)), pivot_to_basis(d_basis, d.B))
+        self.assertEqual(set(d.B), set(d_basis.B))
+        self.assertEqual(d.value(), d_basis.value())
+        self.assertTrue((d.basic_solution() == d_basis.basic_solution()).all())
+        # The columns of x1 and x2 are linearly dependent
+        d_singular = Dictionary(np.array([1, 1]), np.array([[1, 2], [2, 4]]), np.array([1, 1]))
+        self.assertIsNone(pivot_to_basis(d_singular, np.array([1, 2])))
+
+    def test_float_first_not_certified(self):
+        # With a large eps the np.float64 solve stops at the origin, and the exact simplex method continues from there
+        c, a, b = example1()
+        float_first_eps = lpsolve.FLOAT_FIRST_EPS
+        lpsolve.FLOAT_FIRST_EPS = 5
+        try:
+            statistics = dict()
+            res, d = lp_solve(c, a, b, pivotrule=lambda d, eps: bland(d, eps), float_first=True, statistics=statistics)
+        finally:
+            lpsolve.FLOAT_FIRST_EPS = float_first_eps
+        self.assertEqual(LPResult.OPTIMAL, res)
+        self.assertEqual(13, d.value())
+        self.assertFalse(statistics['certified_first_try'])
+        self.assertEqual(0, statistics['float_statistics']['pivots'])
+        self.assertTrue(statistics['pivots'] > 0)
+
+    def test_float_first_primal_infeasible(self):
+        # A basis which is not primal feasible is continued with exact pivots instead of solving the LP from scratch:
+        # the dual simplex method if it is dual feasible, and the composite method otherwise
+        c, a, b = example1()
+        for dtype in [Fraction, int, RationalRows]:
+            for basis, pivots, dual_pivots in [([1, 3, 4], 1, 1), ([1, 2, 4], 3, 2)]:
+                statistics = dict()
+                with mock.patch('lpsolve.original_basis', return_value=np.array(basis)):
+                    res, d = lp_solve(c, a, b, dtype, float_first=True, statistics=statistics)
+                self.assertEqual(LPResult.OPTIMAL, res)
+                self.assertEqual(13, d.value())
+                self.assertFalse(statistics['certified_first_try'])
+                self.assertEqual(pivots, statistics['pivots'])
+                self.assertEqual(dual_pivots, statistics['dual_pivots'])
+
+    def test_rational_rows(self):
+        # Same results as Fraction, also with the lexicographic anti-cycle mode and after removing the auxiliary variable
+        np.random.seed(11)
+        for i in range(20):
+            n = np.random.randint(1, 15)
+            m = np.random.randint(1, 15)
+            c, a, b = random_lp_including_negative_b_values(n, m)
+            res, d = lp_solve(c, a, b, Fraction, pivotrule=lambda d, eps: largest_coefficient(d, eps))
+            res_rational, d_rational = lp_solve(c, a, b, RationalRows,
+                                                pivotrule=lambda d, eps: largest_coefficient(d, eps))
+            self.assertEqual(res, res_rational)
+            if res == LPResult.OPTIMAL:
+                self.assertEqual(d.__str__(), d_rational.__str__())
+                self.assertTrue((d.basic_solution() == d_rational.basic_solution()).all())
+        c, a, b = cycling_example()
+        for anticycling in ['bland', 'lexicographic']:
+            statistics = dict()
+            res, d = lp_solve(c, a, b, RationalRows, pivotrule=lambda d, eps: largest_coefficient(d, eps),
+                              anticycling=anticycling, statistics=statistics)
+            self.assertEqual(LPResult.OPTIMAL, res)
+            self.assertEqual(1, d.value())
+            self.assertEqual(1, statistics['cycles_detected'])
+
+    def test_auto_dtype(self):
+        c, a, b = example1()
+        self.assertEqual(int, auto_dtype(c, a, b)[0])
+        self.assertEqual(0, input_decimals(c, a * 1.0, b))
+        self.assertEqual(2, input_decimals(c, a * 0.01, b))
+        self.assertEqual(None, input_decimals(c / 3, a, b))
+        self.assertEqual(np.float64, auto_dtype(c, a, b, exact=False)[0])
+        dtype, decimals, c_auto, a_auto, b_auto = auto_dtype(np.array([0.5, 0.4, 0.3]), a, b * 0.25)
+        self.assertEqual((int, 2), (dtype, decimals))
+        self.assertEqual([50, 40, 30], list(c_auto))
+        self.assertEqual(200, a_auto[0, 0])
+        self.assertEqual(275, b_auto[1])
+        self.assertEqual(np.int64, c_auto.dtype)
+        self.assertEqual(RationalRows, auto_dtype(c / 3, a, b)[0])
+        self.assertEqual(Fraction, auto_dtype(c / 3, scipy.sparse.csr_matrix(a), b)[0])
+
+    def test_lp_solve_auto_sparse(self):
+        # Sparse decimal data is scaled to integers like dense data, and gives the same solution
+        np.random.seed(16)
+        for i in range(10):
+            n = np.random.randint(1, 15)
+            m = np.random.randint(1, 15)
+            c = np.round(np.random.randn(n), 2)
+            a = np.vstack([np.round(np.random.randn(m, n), 2) * (np.random.rand(m, n) < 0.4), np.ones(n)])
+            b = np.round(np.random.randn(m + 1), 3)
+            statistics = dict()
+            res, d = lp_solve(c, a, b, 'auto')
+            res_sparse, d_sparse = lp_solve(c, scipy.sparse.csr_matrix(a), b, 'auto', statistics=statistics)
+            self.assertEqual((int, 3), (statistics['dtype'], statistics['decimals']))
+            self.assertEqual(res, res_sparse)
+            if res == LPResult.OPTIMAL:
+                self.assertEqual(int, d_sparse.chosen_dtype)
+                self.assertEqual(d.value(), d_sparse.value())
+                self.assertEqual(list(d.basic_solution()), list(d_sparse.basic_solution()))
+                self.assertEqual(Fraction, d_sparse.dtype)
+
+    def test_lp_solve_auto(self):
+        # Decimal data is solved exactly as the decimals it represents
+        np.random.seed(15)
+        for i in range(10):
+            n = np.random.randint(1, 15)
+            m = np.random.randint(1, 15)
+            c = np.round(np.random.randn(n), 2)
+            a = np.vstack([np.round(np.random.randn(m, n), 2), np.ones(n)])
+            b = np.round(np.random.randn(m + 1), 3)
+            statistics = dict()
+            res, d = lp_solve(c, a, b, 'auto', pivotrule=lambda d, eps: largest_coefficient(d, eps),
+                              statistics=statistics)
+            self.assertEqual((int, 3), (statistics['dtype'], statistics['decimals']))
+            decimal = [np.vectorize(lambda value: Fraction(str(value)), otypes=[object])(values) for values in [c, a, b]]
+            res_decimal, d_decimal = lp_solve(*decimal, pivotrule=lambda d, eps: largest_coefficient(d, eps))
+            self.assertEqual(res_decimal, res)
+            if res == LPResult.OPTIMAL:
+                self.assertEqual(int, d.chosen_dtype)
+                self.assertEqual(RationalRows, d.dtype)
+                self.assertEqual(d_decimal.value(), d.value())
+                self.assertEqual(list(d_decimal.basic_solution()), list(d.basic_solution()))
+                everything = slice(None), slice(None)
+                self.assertTrue((d_decimal.entry_values(*everything) == d.entry_values(*everything)).all())
+                statistics = dict()
+                res_float, d_float = lp_solve(c, a, b, 'auto', pivotrule=lambda d, eps: largest_coefficient(d, eps),
+                                              statistics=statistics, exact=False)
+                self.assertEqual(np.float64, statistics['dtype'])
+                self.assertAlmostEqual(float(d.value()), d_float.value())
+        c, a, b = example1()
+        statistics = dict()
+        res, d = simple_simplex(c, a, b, 'auto', pivotrule=lambda d, eps: largest_coefficient(d, eps),
+                                statistics=statistics)
+        self.assertEqual(13, d.value())
+        self.assertEqual(int, statistics['dtype'])
+        self.assertEqual(int, d.chosen_dtype)
+        self.assertEqual(np.int64, d.C.dtype)
+        res, d = simple_simplex(c, a, b)
+        self.assertEqual(13, d.value())
+
+    def test_large_objective_int64(self):
+        # The auxiliary dictionary is stored as np.int64 without looking at c, so the OF of phase two must promote it
+        c, a, b = exercise2_5()
+        for c_large in [np.array([1e20, 3.0]), np.array([2 ** 63 + 5, 3], dtype=object)]:
+            res_fraction, d_fraction = lp_solve(c_large, a, b, Fraction, phase_one='auxiliary')
+            for phase_one in ['auxiliary', 'dual']:
+                res, d = lp_solve(c_large, a, b, int, phase_one=phase_one)
+                self.assertEqual(LPResult.OPTIMAL, res)
+                self.assertEqual(d_fraction.value(), d.value())
+        # A large change of the OF of an np.int64 dictionary is promoted in the same way
+        res, d = lp_solve(c, a, b, int)
+        self.assertEqual(np.int64, d.C.dtype)
+        d.change_objective([0], [Fraction(10 ** 20)])
+        res, d = reoptimize(d)
+        self.assertEqual(lp_solve(np.array([10 ** 20 + 1, 3], dtype=object), a, b)[1].value(), d.value())
+
+    def test_dual_simplex(self):
+        # Example 2 is dual feasible, and the dual simplex method finds the optimal dictionary of the two-phase method
+        c, a, b = example2()
+        statistics = dict()
+        res, d = dual_simplex(Dictionary(c, a, b), statistics=statistics)
+        self.assertEqual(LPResult.OPTIMAL, res)
+        self.assertEqual(-3, d.value())
+        self.assertEqual({1, 2, 5}, set(d.B))
+        self.assertEqual(statistics['pivots'], statistics['dual_pivots'])
+        res, d = dual_simplex(Dictionary(c, a, b), dualrule=lambda d, eps: dual_bland(d, eps))
+        self.assertEqual(-3, d.value())
+        res, d = dual_simplex(Dictionary(np.array([-1]), np.array([[1]]), np.array([-1])))
+        self.assertEqual(LPResult.INFEASIBLE, res)
+        with self.assertRaises(ValueError):
+            dual_simplex(Dictionary(*example1()))
+
+    def test_composite_simplex(self):
+        # Example 2 maximizing 2x1 + x2 with x1 <= 3
+        c, a, b = example2()
+        c, a, b = -c, np.vstack([a, [1, 0]]), np.append(b, 3)
+        res, d = composite_simplex(Dictionary(c, a, b, int), c)
+        self.assertEqual(LPResult.OPTIMAL, res)
+        self.assertEqual(7, d.value())
+        res_auxiliary, d_auxiliary = lp_solve(c, a, b, int, phase_one='auxiliary')
+        self.assertEqual(res_auxiliary, res)
+        self.assertEqual(d_auxiliary.value(), d.value())
+        self.assertTrue((d_auxiliary.basic_solution() == d.basic_solution()).all())
+
+    def test_lp_solve_phase_one(self):
+        np.random.seed(16)
+        for dtype in [Fraction, int, RationalRows, np.float64]:
+            for i in range(15):
+                n = np.random.randint(1, 15)
+                m = np.random.randint(1, 15)
+                c, a, b = random_lp_including_negative_b_values(n, m)
+                if i % 3 == 0:
+                    c = -np.abs(c)
+                eps = 1e-9 if dtype == np.float64 else 0
+                pivotrule = lambda d, eps: bland(d, eps)
+                res, d = lp_solve(c, a, b, dtype, eps, pivotrule, phase_one='auxiliary')
+                statistics = dict()
+                res_dual, d_dual = lp_solve(c, a, b, dtype, eps, pivotrule, statistics=statistics)
+                if (b < 0).any():
+                    self.assertEqual('dual' if (c <= 0).all() else 'composite', statistics['phase_one'])
+                self.assertEqual(res, res_dual)
+                if dtype == np.float64:
+                    # Rounding errors in the OF of the optimal auxiliary dictionary must not make it unbounded
+                    res_sparse, d_sparse = lp_solve(c, scipy.sparse.csr_matrix(a), b, dtype, eps, pivotrule)
+                    self.assertEqual(res, res_sparse)
+                    if res == LPResult.OPTIMAL:
+                        self.assertAlmostEqual(d.value(), d_dual.value())
+                        self.assertAlmostEqual(d.value(), d_sparse.value())
+                elif res == LPResult.OPTIMAL:
+                    self.assertEqual(d.value(), d_dual.value())
+        # The OF of the optimal auxiliary dictionary of this LP has a coefficient of about 1e-17 with np.float64
+        c = np.array([-5, 4, -12, -13, -14, -16])
+        a = np.array([[-18, 9, -4, 0, 11, 4], [1, -12, -17, -8, -6, 0], [-15, -5, -15, 2, 9, 12],
+                      [-2, 11, -12, 3, -12, -16]])
+        b = np.array([-14, 7, -1, -2])
+        res_fraction, d_fraction = lp_solve(c, a, b)
+        for a_float in [a, scipy.sparse.csr_matrix(a)]:
+            res, d = lp_solve(c, a_float, b, np.float64, phase_one='auxiliary')
+            self.assertEqual(LPResult.OPTIMAL, res)
+            self.assertAlmostEqual(float(d_fraction.value()), d.value())
+        c, a, b = example2()
+        statistics = dict()
+        lp_solve(c, scipy.sparse.csr_matrix(a), b, statistics=statistics)
+        self.assertEqual('auxiliary', statistics['phase_one'])
+        with self.assertRaises(ValueError):
+            lp_solve(c, scipy.sparse.csr_matrix(a), b, phase_one='dual')
+        with self.assertRaises(ValueError):
+            lp_solve(c, a, b, phase_one='two-phase')
+
+    def test_reoptimize(self):
+        # Cuts off the optimal solution and adds columns, and compares with solving the changed LP from scratch
+        np.random.seed(17)
+        for dtype in [Fraction, int, RationalRows]:
+            n, m = 8, 6
+            c = np.round(10 * np.random.rand(n))
+            a = np.vstack([np.round(10 * np.random.rand(m - 1, n)), np.ones(n)])
+            b = np.append(np.round(100 * np.random.rand(m - 1)), 50)
+            res, d = lp_solve(c, a, b, dtype, pivotrule=lambda d, eps: largest_coefficient(d, eps))
+            for i in range(4):
+                row = np.round(10 * np.random.rand(a.shape[1]))
+                rhs = np.floor(row @ d.basic_solution().astype(np.float64) * 0.9)
+                violated = row @ d.basic_solution() > rhs
+                d.add_constraint(row, rhs)
+                a, b = np.vstack([a, row]), np.append(b, rhs)
+                statistics = dict()
+                res, d = reoptimize(d, pivotrule=lambda d, eps: largest_coefficient(d, eps), statistics=statistics)
+                self.assertEqual('dual' if violated else 'primal', statistics['reoptimization'])
+                res_expected, d_expected = lp_solve(c, a, b, dtype)
+                self.assertEqual(res_expected, res)
+                self.assertEqual(d_expected.value(), d.value())
+                self.assertTrue((d_expected.basic_solution() == d.basic_solution()).all())
+                column, cost = np.round(10 * np.random.rand(a.shape[0])) + 1, 20
+                d.add_column(cost, column)
+                c, a = np.append(c, cost), np.hstack([a, column[:, np.newaxis]])
+                statistics = dict()
+                res, d = reoptimize(d, pivotrule=lambda d, eps: largest_coefficient(d, eps), statistics=statistics)
+                self.assertEqual('primal', statistics['reoptimization'])
+                res_expected, d_expected = lp_solve(c, a, b, dtype)
+                self.assertEqual(res_expected, res)
+                self.assertEqual(d_expected.value(), d.value())
+        d = Dictionary(np.array([1]), np.array([[1]]), np.array([-1]))
+        with self.assertRaises(ValueError):
+            reoptimize(d)
+
+    def test_solve_scenarios(self):
+        # The scenarios are solved like the changed LPs from scratch
+        np.random.seed(18)
+        n, m = 8, 6
+        c = np.round(10 * np.random.randn(n))
+        a = np.vstack([np.round(10 * np.random.randn(m - 1, n)), np.ones(n)])
+        b = np.append(np.round(100 * np.random.rand(m - 1)), 50)
+        scenarios = [dict(), {'b': {5: 40, 0: b[0] - 30}}, {'c': {1: Fraction(7, 2), 2: -1}},
+                     {'b': {2: b[2] + 5}, 'c': {0: c[0] + 20}}, {'b': {5: -1}}]
+        for dtype in [Fraction, int, RationalRows, np.float64]:
+            eps = 1e-9 if dtype == np.float64 else 0
+            c_scenario = c.astype(np.float64) if dtype in [int, np.float64] else c
+            scenarios[2]['c'][1] = {int: 3, np.float64: 3.5}.get(dtype, Fraction(7, 2))
+            statistics = dict()
+            solutions = solve_scenarios(c_scenario, a, b, scenarios, dtype, eps, statistics=statistics)
+            self.assertEqual(len(scenarios), len(statistics['scenario_pivots']))
+            self.assertEqual(0, statistics['scenario_pivots'][0])
+            for scenario, (res, value, x) in zip(scenarios, solutions):
+                c_expected = c_scenario.astype(object)
+                b_expected = b.astype(object)
+                for values, changes in [(c_expected, scenario.get('c', dict())), (b_expected, scenario.get('b', dict()))]:
+                    for index, change in changes.items():
+                        values[index] = change
+                res_expected, d_expected = lp_solve(c_expected, a, b_expected, dtype, eps)
+                self.assertEqual(res_expected, res)
+                if res == LPResult.OPTIMAL:
+                    self.assertAlmostEqual(float(d_expected.value()), float(value))
+                    if dtype != np.float64:
+                        self.assertEqual(d_expected.value(), value)
+                        self.assertTrue((d_expected.basic_solution() == x).all())
+            self.assertEqual(LPResult.INFEASIBLE, solutions[-1][0])
+        # The LP is infeasible, so the scenarios are solved from scratch
+        solutions = solve_scenarios(c, a, np.append(b[:-1], -1), [dict(), {'b': {5: 1}}])
+        self.assertEqual([LPResult.INFEASIBLE, LPResult.OPTIMAL], [res for res, value, x in solutions])
+
+    def test_change_rhs_auxiliary(self):
+        # The slack variables of a dictionary from the auxiliary dictionary are numbered after x0
+        c, a, b = example2()
+        c = np.array([-1, 1])
+        res, d = lp_solve(c, a, b, phase_one='auxiliary')
+        self.assertTrue(d.variables[2])
+        d.change_rhs([0, 2], [-2, 2])
+        res, d = reoptimize(d)
+        d.change_objective([1], [2])
+        res, d = reoptimize(d)
+        res_expected, d_expected = lp_solve(np.array([-1, 3]), a, b + np.array([-2, 0, 2]))
+        self.assertEqual(LPResult.OPTIMAL, res)
+        self.assertEqual(d_expected.value(), d.value())
+        self.assertTrue((d_expected.basic_solution() == d.basic_solution()).all())
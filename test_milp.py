@@ -0,0 +1,97 @@
+from fractions import Fraction
+from unittest import TestCase
+
+import numpy as np
+from scipy.optimize import milp, LinearConstraint
+
+from dictionary import RationalRows
+from lpresult import LPResult
+from lpsolve import lp_solve, dual_simplex
+from milp import milp_solve, branching_variable
+
+
+def random_milp(n, m):
+    # Random LP which is bounded by the last constraint
+    a = np.vstack([np.random.randint(-5, 10, (m, n)), np.ones(n, dtype=int)])
+    b = np.append(np.random.randint(5, 40, m), 30)
+    return np.random.randint(-3, 10, n), a, b
+
+
+def scipy_milp(c, a, b, integrality):
+    return milp(-c, constraints=LinearConstraint(a, ub=b), integrality=integrality)
+
+
+class TestMilp(TestCase):
+    def test_knapsack(self):
+        c, a, b = np.array([5, 4, 3]), np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]]), np.array([5, 11, 8])
+        for dtype in [Fraction, int, RationalRows, np.float64]:
+            statistics = dict()
+            res, value, x = milp_solve(c, a, b, dtype=dtype, statistics=statistics)
+            self.assertEqual(LPResult.OPTIMAL, res)
+            self.assertEqual(13, value)
+            self.assertEqual(13, c @ x)
+            self.assertTrue((a @ x <= b).all())
+            self.assertEqual(0, statistics['gap'])
+            self.assertEqual(statistics['nodes'], statistics['progress'][-1]['nodes'])
+
+    def test_random(self):
+        np.random.seed(1)
+        for i in range(15):
+            c, a, b = random_milp(np.random.randint(2, 8), np.random.randint(2, 8))
+            integrality = np.random.randint(0, 2, len(c)) if i % 3 == 0 else np.ones(len(c))
+            expected = scipy_milp(c, a, b, integrality)
+            for dtype in [Fraction, int, RationalRows, np.float64]:
+                res, value, x = milp_solve(c, a, b, integrality, dtype=dtype)
+                if expected.status == 2:
+                    self.assertEqual(LPResult.INFEASIBLE, res)
+                    continue
+                self.assertEqual(LPResult.OPTIMAL, res)
+                self.assertAlmostEqual(-expected.fun, float(value), 6)
+                self.assertTrue((a @ x.astype(np.float64) <= b + 1e-9).all())
+                if dtype != np.float64:
+                    self.assertTrue(all(value.denominator == 1 for value in x[integrality != 0]))
+
+    def test_processes(self):
+        np.random.seed(2)
+        for i in range(4):
+            c, a, b = random_milp(np.random.randint(3, 8), np.random.randint(3, 8))
+            statistics = dict()
+            expected = milp_solve(c, a, b)
+            res, value, x = milp_solve(c, a, b, processes=2, statistics=statistics)
+            self.assertEqual(expected[0], res)
+            self.assertEqual(expected[1], value)
+            if res == LPResult.OPTIMAL:
+                self.assertEqual(value, c @ x)
+                self.assertEqual(0, statistics['gap'])
+
+    def test_infeasible_and_unbounded(self):
+        # The only solution of the LP relaxation is x=1/2
+        res, value, x = milp_solve(np.array([1]), np.array([[2], [-2]]), np.array([1, -1]))
+        self.assertEqual((LPResult.INFEASIBLE, None, None), (res, value, x))
+        res, value, x = milp_solve(np.array([1, 1]), np.array([[1, -1]]), np.array([1]))
+        self.assertEqual(LPResult.UNBOUNDED, res)
+
+    def test_warm_start(self):
+        # The nodes are re-optimized from the dictionary of their parent, with fewer pivots than solving them
+        np.random.seed(3)
+        c, a, b = np.random.randint(5, 40, 12), np.random.randint(1, 30, (8, 12)), np.random.randint(50, 150, 8)
+        statistics = dict()
+        res, value, x = milp_solve(c, a, b, statistics=statistics)
+        self.assertAlmostEqual(-scipy_milp(c, a, b, np.ones(12)).fun, float(value), 6)
+        self.assertLess(statistics['node_pivots'], statistics['nodes'] * statistics['root_statistics']['pivots'])
+
+    def test_cutoff(self):
+        c, a, b = np.array([5, 4, 3]), np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]]), np.array([5, 11, 8])
+        res, d = lp_solve(c, a, b)
+        d.add_constraint(np.array([1, 0, 0]), 1)
+        statistics = dict()
+        self.assertEqual((LPResult.INFEASIBLE, None), dual_simplex(d.copy(), cutoff=13, statistics=statistics))
+        self.assertTrue(statistics['cut_off'])
+        self.assertEqual(LPResult.OPTIMAL, dual_simplex(d.copy(), cutoff=10)[0])
+
+    def test_branching_variable(self):
+        x = np.array([Fraction(1), Fraction(5, 2), Fraction(7, 3), Fraction(9, 2)], dtype=object)
+        self.assertEqual(1, branching_variable(x, np.ones(4, dtype=bool), True))
+        self.assertEqual(3, branching_variable(x, np.array([True, False, True, True]), True))
+        self.assertIsNone(branching_variable(x, np.array([True, False, False, False]), True))
+        self.assertIsNone(branching_variable(np.array([1.0, 2 + 1e-9]), np.ones(2, dtype=bool), False))
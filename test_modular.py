@@ -0,0 +1,124 @@
+from fractions import Fraction
+from unittest import TestCase
+
+import numpy as np
+
+from dictionary import Dictionary
+from experiments import random_lp_including_negative_b_values
+from lpresult import LPResult
+from lpsolve import lp_solve
+from modular import word_primes, chinese_remainder, modular_dictionaries, modular_lp_solve, pivot_sequence, \
+    consistent_dictionary
+from pivotrules import largest_coefficient
+
+
+def example1():
+    return np.array([5, 4, 3]), np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]]), np.array([5, 11, 8])
+
+
+def feasible_lp(n, m, sigma=10):
+    # Feasible LP (with negative b-values) which is bounded by the last constraint
+    a = np.round(sigma * np.random.randn(m, n))
+    x = np.round(sigma * np.random.rand(n))
+    b = a @ x + np.round(sigma * np.random.rand(m))
+    return np.round(sigma * np.random.randn(n)), np.vstack([a, np.ones(n)]), np.append(b, x.sum() + sigma)
+
+
+class TestModular(TestCase):
+    def test_word_primes(self):
+        primes = word_primes()
+        first = [next(primes) for _ in range(5)]
+        self.assertEqual(2 ** 31 - 1, first[0])
+        self.assertEqual(sorted(first, reverse=True), first)
+        for p in first:
+            self.assertTrue(all(p % q != 0 for q in range(3, 50000, 2)))
+        self.assertFalse(any(all(q % r != 0 for r in range(3, 50000, 2)) for q in range(first[1] + 2, first[0], 2)))
+
+    def test_chinese_remainder(self):
+        primes = word_primes()
+        expected = np.array([-3 ** 40, 0, 7, 2 ** 70 + 1], dtype=object)
+        values = np.zeros(4, dtype=object)
+        modulus = 1
+        for _ in range(3):
+            p = next(primes)
+            values, modulus = chinese_remainder(values, modulus, np.array(expected % p, dtype=np.int64), p)
+        self.assertTrue((expected == values).all())
+
+    def test_modular_dictionaries(self):
+        # The residues are those of the integer dictionary with the same pivots, and the determinant is -5
+        c, a, b = example1()
+        pivots = [(0, 0), (2, 2), (1, 1)]
+        d = Dictionary(c, a, b, int)
+        d_integer = Dictionary(c, a, b, int)
+        for entering, leaving in pivots:
+            d_integer.pivot(entering, leaving)
+        primes = word_primes()
+        primes = [next(primes), next(primes), 5]
+        residues, determinants, lucky = modular_dictionaries(d.C, pivots, primes)
+        # A pivot coefficient is 0 modulo 5
+        self.assertEqual([True, True, False], list(lucky))
+        for p, prime_residues, determinant in list(zip(primes, residues, determinants))[:2]:
+            self.assertEqual(p - 5, determinant)
+            expected = np.array([-value % p for value in d_integer.C.ravel()]).reshape(d_integer.C.shape)
+            self.assertTrue((expected == prime_residues).all())
+
+    def test_pivot_sequence(self):
+        c, a, b = example1()
+        res, d = lp_solve(c, a, b)
+        d_pilot = Dictionary(c, a, b, np.float64)
+        pivots = pivot_sequence(d_pilot, d.B)
+        self.assertEqual(set(d.B), set(d_pilot.B))
+        d_singular = Dictionary(np.array([1, 1]), np.array([[1, 2], [2, 4]]), np.array([1, 1]), np.float64)
+        self.assertIsNone(pivot_sequence(d_singular, np.array([1, 2]), 1e-7))
+        self.assertEqual(len(set(d.B) - {4, 5, 6}), len(pivots))
+
+    def test_modular_lp_solve(self):
+        np.random.seed(12)
+        for pilot_dtype in [np.float64, int]:
+            for i in range(15):
+                n = np.random.randint(1, 20)
+                m = np.random.randint(1, 20)
+                c, a, b = feasible_lp(n, m)
+                res, d = lp_solve(c, a, b, int, pivotrule=lambda d, eps: largest_coefficient(d, eps))
+                statistics = dict()
+                res_modular, d_modular = modular_lp_solve(c, a, b, pivotrule=lambda d, eps: largest_coefficient(d, eps),
+                                                          statistics=statistics, pilot_dtype=pilot_dtype)
+                self.assertEqual(LPResult.OPTIMAL, res_modular)
+                self.assertEqual(d.value(), d_modular.value())
+                self.assertTrue((d.basic_solution() == d_modular.basic_solution()).all())
+                self.assertTrue(statistics['certified'])
+                self.assertTrue(consistent_dictionary(c, a, b, d_modular))
+                # Every entry is the entry of the dictionary multiplied by the last pivot coefficient
+                d_fraction = Dictionary(c, a, b, Fraction)
+                pivot_sequence(d_fraction, d_modular.B)
+                rows = [0] + [np.flatnonzero(d_fraction.B == variable)[0] + 1 for variable in d_modular.B]
+                columns = [0] + [np.flatnonzero(d_fraction.N == variable)[0] + 1 for variable in d_modular.N]
+                self.assertTrue((d_modular.C == d_fraction.C[np.ix_(rows, columns)] * d_modular.lastpivot).all())
+
+    def test_modular_lp_solve_infeasible_unbounded(self):
+        np.random.seed(13)
+        for i in range(20):
+            n = np.random.randint(1, 15)
+            m = np.random.randint(1, 15)
+            c, a, b = random_lp_including_negative_b_values(n, m)
+            res, d = lp_solve(c, a, b, int)
+            res_modular, d_modular = modular_lp_solve(c, a, b)
+            self.assertEqual(res, res_modular)
+            if res == LPResult.OPTIMAL:
+                self.assertEqual(d.value(), d_modular.value())
+
+    def test_unlucky_prime(self):
+        # The pivot coefficient is 0 modulo the first prime
+        p = 2 ** 31 - 1
+        statistics = dict()
+        res, d = modular_lp_solve(np.array([1]), np.array([[p]]), np.array([2]), statistics=statistics)
+        self.assertEqual(LPResult.OPTIMAL, res)
+        self.assertEqual(Fraction(2, p), d.value())
+        self.assertEqual(1, statistics['unlucky_primes'])
+
+    def test_consistent_dictionary(self):
+        c, a, b = example1()
+        res, d = lp_solve(c, a, b, int)
+        self.assertTrue(consistent_dictionary(c, a, b, d))
+        d.C[1, 0] += 1
+        self.assertFalse(consistent_dictionary(c, a, b, d))
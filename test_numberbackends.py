@@ -0,0 +1,77 @@
+from fractions import Fraction
+from unittest import TestCase, skipIf
+
+import numpy as np
+
+import numberbackends
+from dictionary import Dictionary
+from experiments import random_lp_including_negative_b_values
+from lpresult import LPResult
+from lpsolve import lp_solve
+from numberbackends import number_backend, PYTHON, GMPY2
+from pivotrules import largest_coefficient
+
+
+def example1():
+    return np.array([5, 4, 3]), np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]]), np.array([5, 11, 8])
+
+
+class TestNumberBackends(TestCase):
+    def test_number_backend(self):
+        self.assertIs(PYTHON, number_backend('python'))
+        self.assertIs(PYTHON, number_backend(PYTHON))
+        self.assertRaises(ValueError, number_backend, 'mpmath')
+        gmpy2_backend = numberbackends.GMPY2
+        numberbackends.GMPY2 = None
+        try:
+            self.assertIs(PYTHON, number_backend('gmpy2'))
+        finally:
+            numberbackends.GMPY2 = gmpy2_backend
+
+    @skipIf(GMPY2 is None, "gmpy2 is not installed")
+    def test_gmpy2_dictionary(self):
+        c, a, b = example1()
+        for dtype in [Fraction, int]:
+            d = Dictionary(c, a, b, dtype)
+            d_gmpy2 = Dictionary(c, a, b, dtype, backend='gmpy2')
+            for entering, leaving in [(0, 0), (2, 2), (1, 1)]:
+                d.pivot(entering, leaving)
+                d_gmpy2.pivot(entering, leaving)
+                self.assertEqual(d.__str__(), d_gmpy2.__str__())
+                self.assertEqual(d.value(), d_gmpy2.value())
+                self.assertEqual(Fraction, type(d_gmpy2.value()))
+                self.assertTrue((d.basic_solution() == d_gmpy2.basic_solution()).all())
+        d = Dictionary(c, a, b, Fraction, backend='gmpy2')
+        self.assertTrue(all(type(entry) == GMPY2.rational for entry in d.C.ravel()))
+
+    @skipIf(GMPY2 is None, "gmpy2 is not installed")
+    def test_gmpy2_integer_promotion(self):
+        c = np.array([5, 2])
+        a = np.array([[3, 1],
+                      [2, 5]]) * 2 ** 40
+        b = np.array([7, 5]) * 2 ** 40
+        d = Dictionary(c, a, b, int, backend='gmpy2')
+        d.pivot(0, 0)
+        self.assertEqual(GMPY2.integer, type(d.C[0, 0]))
+        d.pivot(1, 1)
+        d_python = Dictionary(c, a, b, int)
+        d_python.pivot(0, 0)
+        d_python.pivot(1, 1)
+        self.assertEqual(d_python.value(), d.value())
+        self.assertTrue((d.C == d_python.C).all())
+
+    @skipIf(GMPY2 is None, "gmpy2 is not installed")
+    def test_gmpy2_lp_solve(self):
+        np.random.seed(14)
+        for dtype in [Fraction, int]:
+            for i in range(20):
+                n = np.random.randint(1, 15)
+                m = np.random.randint(1, 15)
+                c, a, b = random_lp_including_negative_b_values(n, m)
+                res, d = lp_solve(c, a, b, dtype, pivotrule=lambda d, eps: largest_coefficient(d, eps))
+                res_gmpy2, d_gmpy2 = lp_solve(c, a, b, dtype, pivotrule=lambda d, eps: largest_coefficient(d, eps),
+                                              backend='gmpy2')
+                self.assertEqual(res, res_gmpy2)
+                if res == LPResult.OPTIMAL:
+                    self.assertEqual(d.__str__(), d_gmpy2.__str__())
+                    self.assertTrue((d.basic_solution() == d_gmpy2.basic_solution()).all())
@@ -7,14 +7,16 @@ from numpy import random
 from scipy.optimize import linprog
 
 import dictionary
-from dictionary import Dictionary
+from dictionary import Dictionary, RationalRows
 from experiments import random_lp_including_negative_b_values, random_lp_only_none_negative_b_values
 from lpresult import LPResult
 from lpsolve import lp_solve
 from pivotrules import leaving_variable
-from pivotrules import bland
+from pivotrules import bland, smallest_subscript
 from pivotrules import largest_coefficient
 from pivotrules import largest_increase
+from pivotrules import steepest_edge, devex, float_entries, partial_pricing, eps_correction, eps_correction_array, \
+    dual_bland, dual_largest_infeasibility, dual_entering_variable, float_quotient
 
 
 class Test(TestCase):
@@ -386,6 +388,180 @@ class Test(TestCase):
                                                      lambda d, eps: largest_coefficient(d, eps), 0.0000001))
         self.assertTrue(iterative_results_comparison(2, 20, False, lp_solve, dtype=int,
                                                      pivotrule=lambda d, eps: largest_coefficient(d, eps), eps=0.0000001))
+    def test_allowing_negative_b_steepest_edge(self):
+        self.assertTrue(iterative_results_comparison(1, 20, False, lp_solve, np.float64,
+                                                     lambda d, eps: steepest_edge(d, eps), 0.0000001))
+        self.assertTrue(iterative_results_comparison(1, 20, False, lp_solve, Fraction,
+                                                     lambda d, eps: steepest_edge(d, eps), 0.0000001))
+        self.assertTrue(
+            iterative_results_comparison(1, 20, False, lp_solve, int, lambda d, eps: steepest_edge(d, eps),
+                                         0.0000001))
+
+    def test_allowing_negative_b_devex(self):
+        self.assertTrue(iterative_results_comparison(1, 20, False, lp_solve, np.float64,
+                                                     lambda d, eps: devex(d, eps), 0.0000001))
+        self.assertTrue(iterative_results_comparison(1, 20, False, lp_solve, Fraction,
+                                                     lambda d, eps: devex(d, eps), 0.0000001))
+        self.assertTrue(
+            iterative_results_comparison(1, 20, False, lp_solve, int, lambda d, eps: devex(d, eps), 0.0000001))
+
+    def test_steepest_edge_weights(self):
+        # The incrementally updated weights must be the lengths of the edges of the pivoted dictionary
+        random.seed(11)
+        for dtype in [Fraction, int, np.float64]:
+            c, a, b = random_lp_only_none_negative_b_values(8, 6)
+            d = Dictionary(c, a, b, dtype)
+            entering, leaving = steepest_edge(d, 0)
+            while entering is not None and leaving is not None:
+                d.pivot(entering, leaving)
+                entering, leaving = steepest_edge(d, 0)
+                state = d.pricing_state['steepest_edge']
+                self.assertTrue((state['N'] == d.N).all())
+                exact = 1 + (float_entries(d, d.C[1:, 1:]) ** 2).sum(axis=0)
+                self.assertTrue(np.allclose(exact, state['weights']))
+        # Pivots made without the rule reset the weights
+        d = Dictionary(c, a, b)
+        devex(d, 0)
+        d.pivot(0, 0)
+        devex(d, 0)
+        self.assertTrue((d.pricing_state['devex']['weights'] == 1).all())
+
+    def test_weighted_pricing_large_entries(self):
+        # Entries beyond the range of np.float64 are converted exactly, and weights which overflow are reset to 1
+        c = np.array([3, 2, 4], dtype=object) * 2 ** 1200
+        a = np.array([[1, 1, 2], [2, 0, 3], [2, 1, 3]], dtype=object) * 2 ** 1100
+        b = np.array([4, 5, 7], dtype=object) * 2 ** 1150
+        self.assertEqual(2.0 ** 1000, float_quotient(2 ** 1100, 2 ** 100))
+        self.assertEqual(-math.inf, float_quotient(-2 ** 1100, 3))
+        expected = lp_solve(c, a, b)[1].value()
+        for rule in [steepest_edge, devex]:
+            for dtype in [Fraction, int, RationalRows]:
+                with np.errstate(all='raise'):
+                    res, d = lp_solve(c, a, b, dtype, pivotrule=lambda d, eps: rule(d, eps))
+                self.assertEqual(LPResult.OPTIMAL, res)
+                self.assertEqual(expected, d.value())
+                self.assertTrue(np.isfinite(d.pricing_state[rule.__name__]['weights']).all())
+
+    def test_allowing_negative_b_partial_pricing(self):
+        self.assertTrue(iterative_results_comparison(1, 20, False, lp_solve, np.float64,
+                                                     lambda d, eps: partial_pricing(d, eps, 5, 3), 0.0000001))
+        self.assertTrue(iterative_results_comparison(1, 20, False, lp_solve, Fraction,
+                                                     lambda d, eps: partial_pricing(d, eps, 5, 3), 0.0000001))
+        self.assertTrue(
+            iterative_results_comparison(1, 20, False, lp_solve, int, lambda d, eps: partial_pricing(d, eps, 1, 1),
+                                         0.0000001))
+
+    def test_partial_pricing_wide(self):
+        random.seed(12)
+        n, m = 400, 8
+        c = np.round(10 * random.randn(n))
+        a = np.round(10 * np.abs(random.randn(m, n))) + 1
+        b = np.round(100 * np.abs(random.randn(m))) + 1
+        res_linprog = linprog(-c, a, b, method="highs")
+        for dtype in [Fraction, np.float64]:
+            res, d = lp_solve(c, a, b, dtype, pivotrule=lambda d, eps: partial_pricing(d, eps, 50, 4))
+            self.assertEqual(LPResult.OPTIMAL, res)
+            self.assertAlmostEqual(-res_linprog.fun, float(d.value()))
+            state = d.pricing_state['partial_pricing']
+            self.assertEqual(1, state['full_rescans'])
+            self.assertTrue(state['full_rescans'] < state['refills'])
+            self.assertTrue(state['candidates'][0].size <= 4)
+
+    def test_harris_ratio_test(self):
+        # The textbook ratio test picks the tiny pivot coefficient, Harris' ratio test the large one with nearly the
+        # same ratio
+        d = Dictionary(np.array([1]), np.array([[1e-6], [1]]), np.array([0, 1e-12]), np.float64)
+        self.assertEqual(0, leaving_variable(d, 0, 0)[0])
+        self.assertEqual(1, leaving_variable(d, 0, 0, ratio_test='harris')[0])
+        self.assertEqual((0, 1), largest_increase(d, 0, ratio_test='harris'))
+        # Pivot coefficients below the relative pivot tolerance are treated as 0
+        d = Dictionary(np.array([1]), np.array([[1e-12], [1]]), np.array([0, 1]), np.float64)
+        self.assertEqual(1, leaving_variable(d, 0, 0, ratio_test='harris')[0])
+        d = Dictionary(np.array([1]), np.array([[1e-12], [-1]]), np.array([0, 1]), np.float64)
+        self.assertEqual((None, -math.inf), leaving_variable(d, 0, 0, ratio_test='harris'))
+        # Exact dtypes pick the largest pivot coefficient among exactly tied ratios
+        for dtype in [Fraction, int]:
+            d = Dictionary(np.array([1]), np.array([[1], [2], [3]]), np.array([1, 2, 6]), dtype)
+            self.assertEqual(0, leaving_variable(d, 0, 0)[0])
+            self.assertEqual(1, leaving_variable(d, 0, 0, ratio_test='harris')[0])
+            self.assertEqual(1, leaving_variable(d, 0, 0, ratio_test='harris')[1])
+        with self.assertRaises(ValueError):
+            leaving_variable(d, 0, 0, ratio_test='random')
+
+    def test_allowing_negative_b_harris(self):
+        for pivotrule in [bland, largest_coefficient, largest_increase]:
+            self.assertTrue(iterative_results_comparison(1, 20, False, lp_solve, np.float64,
+                                                         lambda d, eps: pivotrule(d, 1e-9, ratio_test='harris'),
+                                                         0.0000001))
+            self.assertTrue(iterative_results_comparison(1, 10, False, lp_solve, Fraction,
+                                                         lambda d, eps: pivotrule(d, eps, ratio_test='harris'),
+                                                         0.0000001))
+
+    def test_bland_first_position(self):
+        # bland picks the first position in N with a positive coefficient and the first of the tied rows, whatever the
+        # indices of the variables are
+        d = Dictionary(np.array([1, 1]), np.array([[1, 1], [1, 1]]), np.array([1, 1]))
+        d.N = np.array([2, 1])
+        d.B = np.array([4, 3])
+        self.assertEqual((0, 0), bland(d, 0))
+
+    def test_smallest_subscript(self):
+        # Bland's rule picks the entering and the leaving variable with the lowest index among the candidates
+        d = Dictionary(np.array([1, 1]), np.array([[1, 1], [1, 1]]), np.array([1, 1]))
+        d.N = np.array([2, 1])
+        d.B = np.array([4, 3])
+        self.assertEqual((1, 1), smallest_subscript(d, 0))
+        self.assertEqual((None, None), smallest_subscript(Dictionary(np.array([-1]), np.array([[1]]), np.array([1])), 0))
+        self.assertEqual((0, None), smallest_subscript(Dictionary(np.array([1]), np.array([[-1]]), np.array([1])), 0))
+
+    def test_eps_correction(self):
+        for dtype in [np.float64, Fraction]:
+            self.assertEqual(0, eps_correction(dtype(1) / 10 ** 12, 1e-9, dtype))
+            self.assertTrue((eps_correction_array(np.array([1e-12, -1e-12, 1]), 1e-9, dtype) == [0, 0, 1]).all())
+        self.assertEqual(1e-12, eps_correction(1e-12, 0, np.float64))
+
+    def test_dual_rules(self):
+        # z = -2x1 - 3x2, w1 = -4 + x1 + 2x2, w2 = -1 + 3x1 - x2
+        c = np.array([-2, -3])
+        a = np.array([[-1, -2], [-3, 1]])
+        b = np.array([-4, -1])
+        for dtype in [Fraction, int, np.float64]:
+            d = Dictionary(c, a, b, dtype)
+            # Most negative constant is w1, whose ratios are 2/1 and 3/2
+            self.assertEqual((1, 0), dual_largest_infeasibility(d, 0))
+            # Lowest basic index with a negative constant is w1 (x3)
+            self.assertEqual((1, 0), dual_bland(d, 0))
+            # Only x1 increases w2
+            self.assertEqual(0, dual_entering_variable(d, 0, 1)[0])
+        # Ties are broken by the lowest index of the non-basic variables for 'dual_bland'
+        d = Dictionary(np.array([-1, -1]), np.array([[-1, -1]]), np.array([-1]))
+        d.N = np.array([2, 1])
+        self.assertEqual((1, 0), dual_bland(d, 0))
+        self.assertEqual((0, 0), dual_largest_infeasibility(d, 0))
+        # No positive coefficient in the row with a negative constant: the LP is infeasible
+        d = Dictionary(np.array([-1]), np.array([[1]]), np.array([-1]))
+        self.assertEqual((None, 0), dual_largest_infeasibility(d, 0))
+        # Primal feasible: optimal
+        d = Dictionary(np.array([-1]), np.array([[1]]), np.array([1]))
+        self.assertEqual((None, None), dual_bland(d, 0))
+
+    def test_dual_largest_infeasibility_big(self):
+        # The constants are compared exactly, also beyond the range of np.float64: x1 >= 2^1100, x2 >= 2^1100 + 1
+        c = np.array([-1, -1])
+        a = np.array([[-1, 0], [0, -1]])
+        b = np.array([-2 ** 1100, -2 ** 1100 - 1], dtype=object)
+        for dtype in [Fraction, int, RationalRows, 'auto']:
+            if dtype != 'auto':
+                self.assertEqual((1, 1), dual_largest_infeasibility(Dictionary(c, a, b, dtype), 0))
+            res, d = lp_solve(c, a, b, dtype)
+            self.assertEqual(LPResult.OPTIMAL, res)
+            self.assertEqual(-2 ** 1101 - 1, d.value())
+        # The rows of 'RationalRows' have different denominators: -(3 * 2^1100 + 1)/2 is the most negative constant
+        b = np.array([Fraction(-3 * 2 ** 1100 - 1, 2), -2 ** 1100 - 1], dtype=object)
+        d = Dictionary(c, a, b, RationalRows)
+        self.assertEqual(2, d.denominators[1])
+        self.assertEqual((0, 0), dual_largest_infeasibility(d, 0))
+
 
 def iterative_results_comparison(seed, iterations, only_none_negative_b_values, our_simplex, dtype, pivotrule=None,
                                  eps=0):
@@ -0,0 +1,110 @@
+from fractions import Fraction
+from unittest import TestCase
+
+import numpy as np
+from numpy import random
+from scipy.optimize import linprog
+
+from dictionary import Dictionary
+from experiments import random_lp_including_negative_b_values, random_lp_only_none_negative_b_values
+from lpresult import LPResult
+from lpsolve import lp_solve
+from pivotrules import bland, largest_coefficient, largest_increase
+from revisedsimplex import RevisedDictionary, revised_lp_solve
+
+
+def example1():
+    return np.array([5, 4, 3]), np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]]), np.array([5, 11, 8])
+
+
+def exercise2_6():
+    return np.array([1, 3]), np.array([[-1, -1], [-1, 1], [1, 2]]), np.array([-3, -1, 2])
+
+
+def exercise2_7():
+    return np.array([1, 3]), np.array([[-1, -1], [-1, 1], [-1, 2]]), np.array([-3, -1, 2])
+
+
+class Test(TestCase):
+    def test_revised_pivot(self):
+        # The entries of the revised dictionary must be those of the full dictionary after the same pivots
+        c, a, b = example1()
+        d = RevisedDictionary(c, a, b, refactor_frequency=2)
+        d_full = Dictionary(c, a, b, np.float64)
+        for entering, leaving in [(0, 0), (2, 2), (1, 1)]:
+            d.pivot(entering, leaving)
+            d_full.pivot(entering, leaving)
+            self.assertTrue(np.allclose(d_full.C, d.to_dictionary().C))
+            self.assertTrue((d_full.B == d.B).all())
+            self.assertTrue((d_full.N == d.N).all())
+        d = RevisedDictionary(c, a, b)
+        d.pivot(0, 0)
+        d.pivot(2, 2)
+        self.assertAlmostEqual(13, d.value())
+        self.assertTrue(np.allclose([2, 0, 1], d.basic_solution()))
+
+    def test_revised_lp_solve(self):
+        c, a, b = example1()
+        res, d = revised_lp_solve(c, a, b)
+        self.assertEqual(LPResult.OPTIMAL, res)
+        self.assertAlmostEqual(13, d.value())
+
+    def test_revised_lp_solve_infeasible(self):
+        c, a, b = exercise2_6()
+        res, d = revised_lp_solve(c, a, b)
+        self.assertEqual(LPResult.INFEASIBLE, res)
+
+    def test_revised_lp_solve_auxiliary_unbounded(self):
+        # A rounding residue in the OF of the optimal auxiliary dictionary makes 'simplex' report the auxiliary LP
+        # unbounded without a pivot. The rule below does that once, and phase two must continue from the dictionary.
+        reported = []
+
+        def residue_rule(d, eps):
+            entering, leaving = bland(d, eps)
+            if entering is None and len(reported) == 0:
+                reported.append(d.value())
+                return 0, None
+            return entering, leaving
+        c, a, b = exercise2_6()
+        b = b + np.array([0, 0, 2])
+        res, d = revised_lp_solve(c, a, b, pivotrule=residue_rule)
+        self.assertEqual([0], reported)
+        self.assertEqual(LPResult.OPTIMAL, res)
+        self.assertAlmostEqual(float(lp_solve(c, a, b)[1].value()), d.value())
+        reported.clear()
+        res, d = revised_lp_solve(*exercise2_6(), pivotrule=residue_rule)
+        self.assertEqual(LPResult.INFEASIBLE, res)
+
+    def test_revised_lp_solve_unbounded(self):
+        c, a, b = exercise2_7()
+        res, d = revised_lp_solve(c, a, b)
+        self.assertEqual(LPResult.UNBOUNDED, res)
+
+    def test_revised_same_pivots_as_dictionary(self):
+        # With the same pivot rule the revised and the full dictionary must end in the same basis
+        random.seed(3)
+        for i in range(20):
+            n = random.randint(1, 30)
+            m = random.randint(1, 30)
+            c, a, b = random_lp_only_none_negative_b_values(n, m)
+            res, d = lp_solve(c, a, b, Fraction, pivotrule=lambda d, eps: bland(d, eps))
+            res_revised, d_revised = revised_lp_solve(c, a, b, pivotrule=lambda d, eps: bland(d, eps),
+                                                      refactor_frequency=5)
+            self.assertEqual(res, res_revised)
+            if res == LPResult.OPTIMAL:
+                self.assertTrue((d.B == d_revised.B).all())
+                self.assertAlmostEqual(float(d.value()), d_revised.value())
+
+    def test_revised_compared_to_linprog(self):
+        random.seed(4)
+        eps = 0.0000001
+        for pivotrule in [bland, largest_coefficient, largest_increase]:
+            for i in range(20):
+                n = random.randint(1, 30)
+                m = random.randint(1, 30)
+                c, a, b = random_lp_including_negative_b_values(n, m)
+                res_linprog = linprog(-c, a, b, method="highs")
+                res, d = revised_lp_solve(c, a, b, pivotrule=lambda d, eps: pivotrule(d, eps))
+                self.assertEqual(res_linprog.status == 0, res == LPResult.OPTIMAL)
+                if res == LPResult.OPTIMAL:
+                    self.assertTrue(d.value() - eps <= -res_linprog.fun <= d.value() + eps)
@@ -0,0 +1,96 @@
+import math
+from fractions import Fraction
+from unittest import TestCase
+
+import numpy as np
+from scipy.optimize import linprog
+
+from dictionary import RationalRows
+from lpresult import LPResult
+from lpsolve import lp_solve
+from revisedsimplex import revised_lp_solve
+from pivotrules import infeasible_coefficients, infeasible_constants
+from sensitivity import sensitivity
+
+
+def example1():
+    return np.array([5, 4, 3]), np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]]), np.array([5, 11, 8])
+
+
+def feasible_lp(n, m, sigma=10):
+    # Feasible LP (with negative b-values) which is bounded by the last constraint
+    a = np.round(sigma * np.random.randn(m, n))
+    x = np.round(sigma * np.random.rand(n))
+    b = a @ x + np.round(sigma * np.random.rand(m))
+    c = np.round(sigma * np.random.randn(n))
+    return c.astype(int), np.vstack([a, np.ones(n)]).astype(int), np.append(b, x.sum() + sigma).astype(int)
+
+
+class TestSensitivity(TestCase):
+    def test_example(self):
+        c, a, b = example1()
+        for dtype in [Fraction, int, RationalRows, np.float64]:
+            res, d = lp_solve(c, a, b, dtype)
+            report = sensitivity(d)
+            self.assertEqual([2, 0, 1], list(report['x']))
+            self.assertEqual([0, 1, 0], list(report['slacks']))
+            self.assertEqual([1, 0, 1], list(report['shadow_prices']))
+            self.assertEqual([0, -3, 0], list(report['reduced_costs']))
+            self.assertEqual([Fraction(-1, 2), -math.inf, Fraction(-1, 2)], list(report['cost_ranges'][0]))
+            self.assertEqual([1, 3], list(report['cost_ranges'][1][:2]))
+            self.assertAlmostEqual(1 / 3, report['cost_ranges'][1][2])
+            self.assertEqual([-1, -1, Fraction(-1, 2)], list(report['rhs_ranges'][0]))
+            self.assertAlmostEqual(1 / 3, report['rhs_ranges'][1][0])
+            self.assertEqual([math.inf, 2], list(report['rhs_ranges'][1][1:]))
+            if dtype != np.float64:
+                self.assertTrue(all(type(value) == Fraction for value in report['shadow_prices']))
+
+    def test_shadow_prices(self):
+        # The shadow prices are the dual values, and the optimal value is b y
+        np.random.seed(19)
+        for i in range(10):
+            c, a, b = feasible_lp(np.random.randint(1, 12), np.random.randint(1, 12))
+            res, d = lp_solve(c, a, b, Fraction)
+            report = sensitivity(d)
+            self.assertEqual(d.value(), b @ report['shadow_prices'])
+            self.assertTrue((c - report['shadow_prices'] @ a == report['reduced_costs']).all())
+            self.assertTrue((a @ report['x'] + report['slacks'] == b).all())
+            res_float, d_float = lp_solve(c, a, b, np.float64, 1e-9)
+            report_float = sensitivity(d_float)
+            self.assertTrue(np.allclose(-linprog(-c, a, b, method='highs').ineqlin.marginals,
+                                        report_float['shadow_prices'].astype(np.float64)))
+
+    def test_ranges(self):
+        # The basis stays optimal at the bounds of the ranges, and not beyond them
+        np.random.seed(20)
+        for dtype in [Fraction, int, RationalRows]:
+            for i in range(8):
+                c, a, b = feasible_lp(np.random.randint(1, 10), np.random.randint(1, 10))
+                res, d = lp_solve(c, a, b, dtype)
+                self.assertEqual(LPResult.OPTIMAL, res)
+                report = sensitivity(d)
+                for ranges, change, infeasible in [(report['cost_ranges'], 'change_objective', infeasible_coefficients),
+                                                   (report['rhs_ranges'], 'change_rhs', infeasible_constants)]:
+                    for index, (lower, upper) in enumerate(zip(*ranges)):
+                        for bound, beyond in [(lower, Fraction(-1, 100)), (upper, Fraction(1, 100))]:
+                            if abs(bound) == math.inf:
+                                continue
+                            for delta, optimal in [(bound, True), (bound + beyond, False)]:
+                                if dtype == int and delta.denominator != 1:
+                                    continue
+                                d_changed = d.copy()
+                                getattr(d_changed, change)([index], [delta])
+                                self.assertEqual(optimal, not infeasible(d_changed, 0).any())
+
+    def test_revised_dictionary(self):
+        # A 'RevisedDictionary' is analysed after 'to_dictionary', also after the auxiliary phase one
+        np.random.seed(21)
+        for i in range(5):
+            c, a, b = feasible_lp(np.random.randint(1, 8), np.random.randint(1, 8))
+            res, d = lp_solve(c, a, b, np.float64, 1e-9)
+            res_revised, d_revised = revised_lp_solve(c, a, b, 1e-9)
+            self.assertEqual(res, res_revised)
+            report = sensitivity(d)
+            report_revised = sensitivity(d_revised.to_dictionary())
+            for key in ['x', 'slacks', 'shadow_prices', 'reduced_costs']:
+                self.assertTrue(np.allclose(report[key].astype(np.float64), report_revised[key].astype(np.float64)))
@@ -0,0 +1,118 @@
+from fractions import Fraction
+from unittest import TestCase
+
+import numpy as np
+import scipy.sparse
+from numpy import random
+from scipy.optimize import linprog
+
+from dictionary import Dictionary, RationalRows
+from lpresult import LPResult
+from lpsolve import lp_solve
+from pivotrules import largest_coefficient
+from sparsedictionary import SparseDictionary
+
+
+def example1():
+    return np.array([5, 4, 3]), np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]]), np.array([5, 11, 8])
+
+
+def exercise2_5():
+    return np.array([1, 3]), np.array([[-1, -1], [-1, 1], [1, 2]]), np.array([-3, -1, 4])
+
+
+def random_sparse_lp(n, m, density=0.3, sigma=10):
+    a = np.round(sigma * random.randn(m, n)) * (random.rand(m, n) < density)
+    return np.round(sigma * random.randn(n)), scipy.sparse.csr_matrix(a), np.round(sigma * random.randn(m))
+
+
+class TestSparseDictionary(TestCase):
+    def test_sparse_pivot(self):
+        c, a, b = example1()
+        for dtype in [Fraction, int, np.float64]:
+            d = Dictionary(c, a, b, dtype)
+            d_sparse = SparseDictionary(c, scipy.sparse.csr_matrix(a), b, dtype)
+            self.assertEqual(d.__str__(), d_sparse.__str__())
+            for entering, leaving in [(0, 0), (2, 2), (1, 1)]:
+                d.pivot(entering, leaving)
+                d_sparse.pivot(entering, leaving)
+                self.assertEqual(d.__str__(), d_sparse.__str__())
+                self.assertEqual(d.value(), d_sparse.value())
+                self.assertTrue((d.basic_solution() == d_sparse.basic_solution()).all())
+
+    def test_sparse_rational_rows(self):
+        # A sparse 'a' with RationalRows is solved with Fraction
+        c, a, b = example1()
+        with self.assertRaises(ValueError):
+            SparseDictionary(c, scipy.sparse.csr_matrix(a), b, RationalRows)
+        # The second LP has the constraint x1 >= 1 with a negative constant, and is solved with the auxiliary dictionary
+        for a, b in [(a, b), (np.vstack([a, [-1, 0, 0]]), np.append(b, -1))]:
+            res, d = lp_solve(c, scipy.sparse.csr_matrix(a), b, RationalRows)
+            self.assertEqual(LPResult.OPTIMAL, res)
+            self.assertEqual(Fraction, d.dtype)
+            self.assertEqual(13, d.value())
+
+    def test_sparse_indexing(self):
+        c, a, b = example1()
+        d = Dictionary(c, a, b)
+        d_sparse = SparseDictionary(c, a, b)
+        self.assertEqual(d.C.shape, d_sparse.C.shape)
+        self.assertTrue((d.C[0, 1:] == d_sparse.C[0, 1:]).all())
+        self.assertTrue((d.C[1:, 2] == d_sparse.C[1:, 2]).all())
+        self.assertTrue((d.C[1:, [1, 3]] == d_sparse.C[1:, [1, 3]]).all())
+        self.assertEqual(d.C[2, 0], d_sparse.C[2, 0])
+
+    def test_fill_in_statistics(self):
+        c = np.array([1, 1, 1])
+        a = scipy.sparse.csr_matrix(np.array([[1, 0, 0], [0, 1, 0], [1, 1, 1]]))
+        b = np.array([1, 1, 3])
+        d = SparseDictionary(c, a, b)
+        statistics = d.fill_in_statistics()
+        self.assertEqual(11, statistics['initial_nonzeros'])
+        self.assertEqual(0, statistics['fill_in'])
+        d.pivot(0, 0)
+        statistics = d.fill_in_statistics()
+        self.assertEqual(1, statistics['pivots'])
+        self.assertEqual(sum(len(row) for row in d.rows), statistics['nonzeros'])
+        self.assertEqual(statistics['nonzeros'] - 11, statistics['fill_in'])
+        self.assertEqual(statistics['nonzeros'] / 16, statistics['density'])
+
+    def test_lp_solve_fill_in_statistics(self):
+        # The fill-in is reported in the statistics of lp_solve, also for LPs which are not optimal
+        c, a, b = exercise2_5()
+        for c, b, expected in [(c, b, LPResult.OPTIMAL), (c, np.array([-3, -1, 2]), LPResult.INFEASIBLE),
+                               (np.array([1, 1]), np.array([1, 1, 4]), LPResult.OPTIMAL)]:
+            statistics = dict()
+            res, d = lp_solve(c, scipy.sparse.csr_matrix(a), b, Fraction, statistics=statistics)
+            self.assertEqual(expected, res)
+            for key in ['initial_nonzeros', 'nonzeros', 'peak_nonzeros', 'fill_in', 'density']:
+                self.assertIn(key, statistics)
+            if d is not None:
+                self.assertEqual(d.fill_in_statistics()['fill_in'], statistics['fill_in'])
+        statistics = dict()
+        res, d = lp_solve(np.array([1, 1]), scipy.sparse.csr_matrix(np.array([[1, -1]])), np.array([1]),
+                          statistics=statistics)
+        self.assertEqual(LPResult.UNBOUNDED, res)
+        self.assertIn('fill_in', statistics)
+
+    def test_lp_solve_sparse(self):
+        c, a, b = exercise2_5()
+        for dtype in [Fraction, int, np.float64]:
+            res, d = lp_solve(c, scipy.sparse.csr_matrix(a), b, dtype)
+            self.assertEqual(LPResult.OPTIMAL, res)
+            self.assertTrue(isinstance(d, SparseDictionary))
+            self.assertEqual(5, d.value())
+
+    def test_lp_solve_sparse_compared_to_linprog(self):
+        random.seed(5)
+        eps = 0.0000001
+        for dtype in [Fraction, int, np.float64]:
+            for i in range(20):
+                n = random.randint(1, 30)
+                m = random.randint(1, 30)
+                c, a, b = random_sparse_lp(n, m)
+                res_linprog = linprog(-c, a.toarray(), b, method="highs")
+                res, d = lp_solve(c, a, b, dtype, pivotrule=lambda d, eps: largest_coefficient(d, eps))
+                self.assertEqual(res_linprog.status == 0, res == LPResult.OPTIMAL)
+                if res == LPResult.OPTIMAL:
+                    self.assertTrue(d.value() - eps <= -res_linprog.fun <= d.value() + eps)